@@ -1,6 +1,6 @@
 from fastapi import FastAPI, UploadFile, HTTPException, Form, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi import Request
 import logging
 import asyncio
@@ -8,9 +8,11 @@ import numpy as np
 import cv2
 import mediapipe as mp
 import io
+import json
 import tempfile
 import os
 import uvicorn
+from typing import Optional
 
 from .models.face_analysis import FaceAnalyzer
 from .models.eye_tracking import EyeTracker
@@ -18,6 +20,11 @@ from .models.tremor_analysis import TremorAnalyzer
 from .models.neck_mobility import NeckMobilityAnalyzer
 from .utils.image_processing import read_image_file
 from .utils.serialization import convert_numpy_types
+from .utils.video_processing import get_sampling_step, iter_frames, prefetch
+from .utils.data_validation import EyeQualityMonitor, eye_quality_stats
+from .utils import dsp
+from .utils.imu import parse_imu_json, parse_imu_binary
+from .utils.audio_decoding import decode_stats
 from .models.speech_pattern import SpeechPatternAnalyzer
 
 # Configure logging
@@ -80,7 +87,7 @@ face_analyzer = FaceAnalyzer()
 eye_tracker = EyeTracker()
 tremor_analyzer = TremorAnalyzer()
 neck_mobility_analyzer = NeckMobilityAnalyzer()
-speech_analyzer = SpeechPatternAnalyzer()
+speech_analyzer = SpeechPatternAnalyzer(pitch_engine=os.environ.get("SPEECH_PITCH_ENGINE", "piptrack"))
 
 @app.get("/")
 async def root():
@@ -95,7 +102,10 @@ async def health_check():
         "services": {
             "eye_tracking": True,
             "video_processing": True
-        }
+        },
+        "eye_quality_gate": eye_quality_stats.snapshot(),
+        "dsp_cache": dsp.cache_info(),
+        "audio_decoding": decode_stats.snapshot()
     }
 
 @app.post("/analyze/face")
@@ -118,8 +128,9 @@ async def analyze_face(file: UploadFile):
             
         logger.info(f"Image shape: {image.shape}")
         
-        # Process image
-        results = face_analyzer.analyze_symmetry(image)
+        # Process image, keeping the landmarks so the mesh can be fetched by id
+        mesh_id = face_analyzer.upload_digest(contents)
+        results = face_analyzer.analyze_symmetry(image, cache_key=mesh_id)
         logger.info(f"Analysis results: {results}")
         
         if not results["success"]:
@@ -128,12 +139,117 @@ async def analyze_face(file: UploadFile):
                 "error": results.get("error", "Face analysis failed")
             }
             
+        results["mesh_id"] = mesh_id
         return results
         
     except Exception as e:
         logger.error(f"Error analyzing face: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _mesh_response(mesh: dict, mesh_id: str) -> Response:
+    """Packed float32 mesh points with their layout described in headers."""
+    points = np.ascontiguousarray(mesh["mesh_points"], dtype='<f4')
+    return Response(
+        content=points.tobytes(),
+        media_type="application/octet-stream",
+        headers={
+            "X-Mesh-Id": mesh_id,
+            "X-Mesh-Shape": f"{points.shape[0]},{points.shape[1]}",
+            "X-Mesh-Dtype": "float32-le",
+            "X-Image-Size": f"{mesh['width']},{mesh['height']}",
+            "X-Mesh-Topology-ETag": mesh["topology_etag"]
+        }
+    )
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header lists etag (weak comparison) or is "*"."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:].strip()
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+@app.get("/analyze/face/mesh/topology")
+async def get_face_mesh_topology(request: Request):
+    """Face Mesh tessellation as packed uint16 edge pairs, served as a cacheable asset."""
+    packed, etag, edge_count = FaceAnalyzer.get_mesh_topology()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "X-Mesh-Edge-Count": str(edge_count),
+        "X-Mesh-Dtype": "uint16-le"
+    }
+    
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=packed, media_type="application/octet-stream", headers=headers)
+
+@app.get("/analyze/face/mesh/{mesh_id}")
+async def get_face_mesh(mesh_id: str):
+    """Mesh points for an image already sent to /analyze/face."""
+    mesh = face_analyzer.get_mesh_coordinates(cache_key=mesh_id)
+    if mesh is None:
+        raise HTTPException(status_code=404, detail="Mesh not found, upload the image again")
+    return _mesh_response(mesh, mesh_id)
+
+@app.post("/analyze/face/mesh")
+async def analyze_face_mesh(file: UploadFile = File(...)):
+    """Mesh points for an uploaded image, reusing landmarks from a prior analysis."""
+    contents = await file.read()
+    mesh_id = face_analyzer.upload_digest(contents)
+    
+    mesh = face_analyzer.get_mesh_coordinates(cache_key=mesh_id)
+    if mesh is None:
+        # Not analyzed before: decode and run Face Mesh once
+        image = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise HTTPException(status_code=400, detail="Invalid image format")
+        mesh = face_analyzer.get_mesh_coordinates(image, cache_key=mesh_id)
+    
+    if mesh is None:
+        raise HTTPException(status_code=422, detail="No face detected")
+    return _mesh_response(mesh, mesh_id)
+
+@app.post("/analyze/face/video")
+async def analyze_face_video(file: UploadFile = File(...)):
+    """Analyze facial symmetry and expressivity over a video clip."""
+    video_path = None
+    try:
+        contents = await file.read()
+
+        file_extension = ".webm"
+        if file.filename and file.filename.endswith(".mp4"):
+            file_extension = ".mp4"
+        video_path = save_video_to_temp(contents, file_extension)
+
+        step, effective_fps = get_sampling_step(video_path, target_fps=15)
+        logger.info(f"Analyzing face video every {step} frame(s) (~{effective_fps:.1f} fps)")
+
+        # Decode on a background thread while Face Mesh tracks the previous frames
+        frames = prefetch(iter_frames(video_path, step=step, max_frames=300))
+        results = face_analyzer.analyze_video(frames, fps=effective_fps)
+
+        if not results["success"]:
+            return JSONResponse(
+                status_code=422,
+                content=convert_numpy_types(results)
+            )
+
+        return JSONResponse(content=convert_numpy_types(results))
+
+    except Exception as e:
+        logger.error(f"Error analyzing face video: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if video_path and os.path.exists(video_path):
+            try:
+                os.unlink(video_path)
+            except Exception as e:
+                logger.error(f"Error cleaning up temp file: {str(e)}")
+
 def save_video_to_temp(contents: bytes, extension: str = ".webm") -> str:
     """Save video bytes to a temporary file."""
     try:
@@ -143,78 +259,25 @@ def save_video_to_temp(contents: bytes, extension: str = ".webm") -> str:
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Failed to save video: {str(e)}")
 
-# Update the extract_frames function
+@app.post("/analyze/eyes")
+async def analyze_eyes(
+    file: UploadFile = File(...),
+    phase: str = Form(...),
+    tracking: str = Form("mesh"),
+    fidelity: str = Form("standard")
+):
+    """Analyze eye movement.
 
-def extract_frames(video_path: str):
-    """Extract frames from video file with good density."""
-    try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise HTTPException(status_code=422, detail="Could not open video file")
-            
-        frames = []
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        logger.info(f"Video properties: {frame_count} frames, {fps} FPS")
-        
-        # Calculate how many frames to sample to get approximately 10 fps
-        # This ensures we have enough frames for analysis without processing every frame
-        if frame_count > 0 and fps > 0:
-            # Aim for 10-15 fps for analysis (enough for tremor detection)
-            target_fps = min(15, fps)
-            step = max(1, round(fps / target_fps))
-            logger.info(f"Sampling every {step} frame(s) to get ~{fps/step:.1f} fps")
-        else:
-            step = 1
-        
-        frame_idx = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # Only keep every nth frame
-            if frame_idx % step == 0:
-                frames.append(frame)
-                
-            frame_idx += 1
-            
-            # Limit to 300 frames max (10 seconds at 30fps) to prevent memory issues
-            if len(frames) >= 300:
-                logger.info(f"Reached frame limit (300), stopping extraction")
-                break
-                
-        cap.release()
-        
-        if not frames:
-            logger.warning("No frames extracted from video")
-            raise HTTPException(status_code=422, detail="No frames could be extracted from video")
-            
-        logger.info(f"Successfully extracted {len(frames)} frames")
-        return frames
-        
-    except Exception as e:
-        logger.error(f"Error extracting frames: {str(e)}", exc_info=True)
-        # Clean up temp file
-        try:
-            if os.path.exists(video_path):
-                os.unlink(video_path)
-        except:
-            pass
-        raise HTTPException(status_code=422, detail=f"Failed to extract frames: {str(e)}")
-    
-    finally:
-        # Clean up temp file
-        try:
-            if os.path.exists(video_path):
-                os.unlink(video_path)
-        except:
-            pass
+    tracking="hybrid" runs Face Mesh on keyframes only and follows the eye
+    points with optical flow in between. fidelity="high" analyzes every native
+    frame, splitting the video across worker processes, so short saccades are
+    not lost to frame sampling.
+    """
+    if tracking not in EyeTracker.TRACKING_MODES:
+        raise HTTPException(status_code=422, detail=f"Unknown tracking mode: {tracking}")
+    if fidelity not in ("standard", "high"):
+        raise HTTPException(status_code=422, detail=f"Unknown fidelity: {fidelity}")
 
-@app.post("/analyze/eyes")
-async def analyze_eyes(file: UploadFile = File(...), phase: str = Form(...)):
-    """Analyze eye movement."""
     try:
         # Read the file content
         contents = await file.read()
@@ -225,25 +288,49 @@ async def analyze_eyes(file: UploadFile = File(...), phase: str = Form(...)):
             file_extension = ".mp4"
         
         video_path = save_video_to_temp(contents, file_extension)
-        
-        # Extract frames from the video file
-        frames = extract_frames(video_path)
-        
-        if not frames:
+        eye_tracker = EyeTracker(tracking_mode=tracking)
+        quality_monitor = EyeQualityMonitor()
+
+        try:
+            if fidelity == "high":
+                # Workers decode the file themselves; wait for them off the event loop
+                analysis_results = await asyncio.get_running_loop().run_in_executor(
+                    None, eye_tracker.analyze_eye_video, video_path, None, quality_monitor
+                )
+            else:
+                # Stream frames so a failed quality gate stops decoding as well
+                step, effective_fps = get_sampling_step(video_path, target_fps=15)
+                # Velocities and latencies are per analysed frame, not per native frame
+                eye_tracker.fps = effective_fps
+                frames = prefetch(iter_frames(video_path, step=step, max_frames=300))
+                try:
+                    analysis_results = eye_tracker.analyze_eye_movement_sequence(frames, quality_monitor)
+                finally:
+                    frames.close()
+        finally:
+            if os.path.exists(video_path):
+                os.unlink(video_path)
+
+        if quality_monitor.result is not None:
+            eye_quality_stats.record(quality_monitor.result)
+
+        if not analysis_results.get('success'):
             return JSONResponse(
                 status_code=422,
-                content={
+                content=convert_numpy_types({
                     "success": False,
-                    "detail": "No frames extracted from video"
-                }
+                    "retake": analysis_results.get('retake', False),
+                    "detail": analysis_results.get('error', "No frames extracted from video"),
+                    "quality": analysis_results.get('quality')
+                })
             )
-
-        eye_tracker = EyeTracker()
-        analysis_results = eye_tracker.analyze_eye_movement_sequence(frames)
         
         # Convert numpy types before returning
         processed_results = convert_numpy_types({
             "success": True,
+            "fidelity": fidelity,
+            "fps": eye_tracker.fps,
+            "quality": analysis_results.get('quality'),
             "metrics": {
                 "summary": analysis_results.get('summary', {}),
                 "temporal": analysis_results.get('temporal_metrics', {})
@@ -279,31 +366,24 @@ async def analyze_eyes_options():
     )
 
 @app.post("/analyze/tremor")
-async def analyze_tremor(file: UploadFile = File(...)):
-    """Analyze tremor from video."""
+async def analyze_tremor(file: UploadFile = File(...), include_action_band: bool = Form(False)):
+    """Analyze tremor from video.
+
+    Frames are decoded at the lowest rate that resolves the tremor bands (up to
+    12 Hz, or 20 Hz with include_action_band) and only for as long as the
+    spectrum needs.
+    """
+    temp_file = None
     try:
         # Save the uploaded video to a temporary file
         temp_file = save_video_to_temp(await file.read())
         logger.info(f"Video saved to temporary file: {temp_file}")
         
-        # Extract frames from the video
-        frames = extract_frames(temp_file)
-        logger.info(f"Extracted {len(frames)} frames from video")
-        
         # Initialize the tremor analyzer
         analyzer = TremorAnalyzer()
         
-        # Process each frame to get hand positions
-        hand_positions = []
-        for frame in frames:
-            position = analyzer.process_frame(frame)
-            if position:
-                hand_positions.append(position)
-                
-        logger.info(f"Detected hand in {len(hand_positions)} frames")
-        
-        # If we have enough frames with hand detections, analyze the tremor
-        metrics = analyzer.analyze_tremor(hand_positions)
+        # Decode, track the hand and analyze the tremor
+        metrics = analyzer.analyze_video(temp_file, include_action_band=include_action_band)
         logger.info(f"Analysis complete. Metrics: {metrics}")
         
         return {
@@ -313,6 +393,46 @@ async def analyze_tremor(file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error analyzing tremor: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to analyze tremor: {str(e)}")
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            try:
+                os.unlink(temp_file)
+            except Exception as e:
+                logger.error(f"Error cleaning up temp file: {str(e)}")
+
+@app.post("/analyze/tremor/imu")
+async def analyze_tremor_imu(request: Request, timestamp_unit: str = 'ms', accel_unit: str = 'ms2', gyro: bool = False):
+    """Analyze tremor from phone accelerometer (and optional gyroscope) samples.
+
+    Accepts either a JSON body with 'timestamps', 'accelerometer' and optional
+    'gyroscope' arrays, or a binary body of packed little-endian records (float64
+    timestamp, float32 accelerometer x/y/z, plus float32 gyroscope x/y/z when
+    gyro=true). Units default to milliseconds and m/s^2 (accel_unit=g for
+    readings in g). The metrics use the same schema as /analyze/tremor.
+    """
+    try:
+        body = await request.body()
+        if request.headers.get('content-type', '').startswith('application/json'):
+            recording = parse_imu_json(json.loads(body), timestamp_unit, accel_unit)
+        else:
+            recording = parse_imu_binary(body, gyro, timestamp_unit, accel_unit)
+    except ValueError as e:
+        # json.JSONDecodeError is a ValueError too
+        return JSONResponse(status_code=422, content={"success": False, "error": str(e)})
+
+    try:
+        metrics = TremorAnalyzer().analyze_imu(recording)
+        logger.info(f"IMU analysis complete. Metrics: {metrics}")
+        
+        return {
+            "success": True,
+            "metrics": metrics
+        }
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"success": False, "error": str(e)})
+    except Exception as e:
+        logger.error(f"Error analyzing IMU tremor: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to analyze tremor: {str(e)}")
 
 @app.post("/analyze/neck/set-neutral")
 async def set_neutral_position(frame: UploadFile = File(...)):
@@ -373,21 +493,50 @@ async def get_results():
         return {"success": False, "error": str(e)}
 
 @app.post("/analyze/speech")
-async def analyze_speech(file: UploadFile = File(...)):
-    """Analyze speech patterns."""
-    temp_path = None
+async def analyze_speech(
+    file: UploadFile = File(...),
+    profile: str = Form("standard"),
+    streaming: Optional[bool] = Form(None),
+    detail: Optional[str] = Form(None),
+    time_series_points: Optional[int] = Form(None)
+):
+    """Analyze speech patterns.
+
+    profile selects how much is computed: "triage" (fast, frame-decimated
+    approximations), "standard" (exact core metrics) or "full" (adds voice
+    quality, clinical indicators and time series). Triage and standard
+    compute spectral features on the voiced segments only; the response
+    summarizes them under "voice_activity".
+
+    streaming analyses the recording block by block in bounded memory; by
+    default long recordings are streamed when the profile allows it.
+
+    detail adds report sections to any profile, as a comma-separated list
+    of "voice_quality", "clinical_indicators", "time_series" and "report"
+    (or "all"). Only the requested sections are computed, and a detailed
+    analysis is never streamed.
+
+    time_series_points sets how many points each time series curve is
+    reduced to (500 by default). The reduction keeps the minimum and maximum
+    of every bucket, so brief pitch breaks and volume spikes stay visible at
+    any budget.
+
+    The upload is decoded from memory; its container (WAV, FLAC, OGG, webm,
+    ...) is sniffed from the first bytes, not taken from the filename.
+    Invalid options are rejected by the analyzer before anything is decoded.
+    """
+    contents = await file.read()
+    if not contents:
+        raise HTTPException(status_code=422, detail="Empty audio upload")
+
     try:
         logger.info("Starting speech pattern analysis")
         
-        # Save audio file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp:
-            temp_path = tmp.name
-            contents = await file.read()
-            tmp.write(contents)
-            tmp.flush()  # Ensure all data is written
-        
-        # Process audio file
-        analysis_results = speech_analyzer.analyze_speech_pattern(temp_path)
+        # Process audio from memory
+        analysis_results = speech_analyzer.analyze_speech_pattern(
+            contents, profile=profile, streaming=streaming, detail=detail,
+            time_series_points=time_series_points
+        )
         
         if not analysis_results["success"]:
             return JSONResponse(
@@ -412,13 +561,6 @@ async def analyze_speech(file: UploadFile = File(...)):
                 "error": str(e)
             }
         )
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except Exception as e:
-                logger.error(f"Error cleaning up temp file: {str(e)}")
 
 @app.options("/analyze/speech")
 async def analyze_speech_options():
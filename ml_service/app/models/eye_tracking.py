@@ -1,15 +1,27 @@
+import cv2
 import mediapipe as mp
 import numpy as np  # Changed from "import numpy np"
 from ..utils.image_processing import convert_to_rgb
+from ..utils.roi import FaceRegionDetector, expand_box, box_from_landmarks, box_contains, crop, map_landmarks_to_frame
+from ..utils.video_processing import get_video_info, plan_chunks, get_process_pool, discard_process_pool, iter_frames
+from ..utils.dsp import savgol_smooth
+from concurrent.futures.process import BrokenProcessPool
 from collections import deque
-from scipy.signal import savgol_filter
+from numpy.lib.stride_tricks import sliding_window_view
 import logging
+import os
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 class EyeTracker:
-    def __init__(self):
+    TRACKING_MODES = ("mesh", "hybrid")
+
+    def __init__(self, tracking_mode: str = "mesh", fps: float = 30.0):
+        if tracking_mode not in self.TRACKING_MODES:
+            raise ValueError(f"Unknown tracking mode: {tracking_mode}")
+        self.tracking_mode = tracking_mode
+        self.fps = fps  # Frame rate of the analysed frames, used for velocities and latencies
         self.mp_face_mesh = mp.solutions.face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             static_image_mode=False,
@@ -20,6 +32,14 @@ class EyeTracker:
         # Buffer for temporal analysis
         self.movement_buffer = deque(maxlen=30)  # 1 second at 30fps
         self.previous_landmarks = None
+
+        # Face detector gating Face Mesh; the face region is carried between
+        # frames and only re-detected when tracking is lost
+        self.face_detector = FaceRegionDetector(min_detection_confidence=0.5)
+        self.roi = None
+        self.ROI_DETECTION_EXPANSION = (1.8, 1.0, 0.9)   # width, above, below (detector box)
+        self.ROI_LANDMARK_EXPANSION = (1.4, 0.75, 0.75)  # width, above, below (landmark box)
+        self.ROI_RECENTER_MARGIN = 0.1
         
         # Constants
         self.SACCADE_VELOCITY_THRESHOLD = 100  # Reduced from 200 for better sensitivity
@@ -27,6 +47,31 @@ class EyeTracker:
         self.PURSUIT_VELOCITY_THRESHOLD = 50   # New threshold for pursuit movements
         self.BLINK_THRESHOLD = 0.25  # Adjusted for better blink detection
 
+        # Hybrid tracking: Face Mesh on keyframes, Lucas-Kanade optical flow on
+        # the eye region in between
+        self.flow_state = None
+        self.FLOW = {
+            'KEYFRAME_INTERVAL': 5,       # Max frames carried by optical flow between keyframes
+            'FB_ERROR_THRESHOLD': 1.0,    # Max forward-backward error in pixels before re-keying
+            'REGION_MARGIN': 0.6,         # Eye region padding as a share of its width
+            'WIN_SIZE': (15, 15),
+            'MAX_LEVEL': 2,
+            'CRITERIA': (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        }
+
+        # Full-frame-rate analysis: each chunk is read from CHUNK_OVERLAP frames
+        # early to warm up tracking and to align it with the previous chunk
+        self.CHUNK = {
+            'OVERLAP': 8,
+            'MAX_SHIFT': 2,          # Max frame offset corrected when aligning chunks
+            'CHUNKS_PER_WORKER': 2   # Smaller chunks balance load across workers
+        }
+
+        # MediaPipe indices for eye landmarks
+        self.LEFT_EYE = [33, 246, 161, 160, 159, 158, 157, 173, 133, 155, 154, 153, 145, 144, 163, 7]
+        self.RIGHT_EYE = [362, 398, 384, 385, 386, 387, 388, 466, 263, 249, 390, 373, 374, 380, 381, 382]
+        self.EYE_POINTS = self.LEFT_EYE + self.RIGHT_EYE
+
         # Additional metrics for neurological assessment
         self.METRICS = {
             'SACCADE_LATENCY_THRESHOLD': 200,  # ms
@@ -37,27 +82,113 @@ class EyeTracker:
 
     def get_eye_landmarks(self, image):
         """Extract eye landmarks from the image."""
-        rgb_image = convert_to_rgb(image)
+        eye_points = self.get_eye_points(image)
+        if eye_points is None:
+            return None
+
+        split = len(self.LEFT_EYE)
+        return {
+            "left_eye": [tuple(point) for point in eye_points[:split].tolist()],
+            "right_eye": [tuple(point) for point in eye_points[split:].tolist()]
+        }
+
+    def get_eye_points(self, image):
+        """Eye landmarks as a (K, 2) pixel array, left eye first, or None if no face is found."""
+        height, width = image.shape[:2]
+
+        # Only run the face detector when there is no face region from the previous frame
+        if self.roi is None:
+            box = self.face_detector.detect(image)
+            if box is None:
+                return None
+            self.roi = expand_box(box, width, height, *self.ROI_DETECTION_EXPANSION)
+            if self.roi is None:
+                return None
+
+        rgb_image = convert_to_rgb(crop(image, self.roi))
         results = self.face_mesh.process(rgb_image)
         
         if not results.multi_face_landmarks:
+            self.roi = None
             return None
 
-        landmarks = results.multi_face_landmarks[0].landmark
-        
-        # MediaPipe indices for eye landmarks
-        LEFT_EYE = [33, 246, 161, 160, 159, 158, 157, 173, 133, 155, 154, 153, 145, 144, 163, 7]
-        RIGHT_EYE = [362, 398, 384, 385, 386, 387, 388, 466, 263, 249, 390, 373, 374, 380, 381, 382]
+        landmarks = map_landmarks_to_frame(results.multi_face_landmarks[0].landmark, self.roi, width, height)
 
-        height, width = image.shape[:2]
+        # Re-centre the region when the face drifts towards its edge
+        face_box = box_from_landmarks(landmarks, width, height)
+        if face_box is not None and not box_contains(self.roi, face_box, self.ROI_RECENTER_MARGIN):
+            self.roi = expand_box(face_box, width, height, *self.ROI_LANDMARK_EXPANSION)
         
-        left_eye_points = [(landmarks[i].x * width, landmarks[i].y * height) for i in LEFT_EYE]
-        right_eye_points = [(landmarks[i].x * width, landmarks[i].y * height) for i in RIGHT_EYE]
+        
+        return np.array([(landmarks[i].x, landmarks[i].y) for i in self.EYE_POINTS]) * (width, height)
+
+    def track_eye_points(self, image):
+        """
+        Eye landmarks for the next frame of a sequence.
+
+        In "mesh" mode this is get_eye_points. In "hybrid" mode Face Mesh only
+        runs on keyframes; in between, the points are carried forward with
+        pyramidal Lucas-Kanade flow on a grayscale crop of the eye region. A new
+        keyframe is forced every KEYFRAME_INTERVAL frames, or as soon as any point
+        is lost or fails the forward-backward consistency check (e.g. on blinks).
+        """
+        if self.tracking_mode != "hybrid":
+            return self.get_eye_points(image)
+
+        state = self.flow_state
+        if state is not None and state['age'] < self.FLOW['KEYFRAME_INTERVAL']:
+            points = self.flow_eye_points(image, state)
+            if points is not None:
+                return points
+
+        # Keyframe
+        points = self.get_eye_points(image)
+        if points is None:
+            self.flow_state = None
+            return None
 
-        return {
-            "left_eye": left_eye_points,
-            "right_eye": right_eye_points
+        height, width = image.shape[:2]
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        pad = (x1 - x0) * self.FLOW['REGION_MARGIN']
+        box = (max(0, int(x0 - pad)), max(0, int(y0 - pad)),
+               min(width, int(np.ceil(x1 + pad))), min(height, int(np.ceil(y1 + pad))))
+        self.flow_state = {
+            'box': box,
+            'gray': cv2.cvtColor(crop(image, box), cv2.COLOR_BGR2GRAY),
+            'points': (points - box[:2]).astype(np.float32).reshape(-1, 1, 2),
+            'age': 0
         }
+        return points
+
+    def flow_eye_points(self, image, state):
+        """Carry the eye points of the previous frame forward with optical flow, or None."""
+        box = state['box']
+        gray = cv2.cvtColor(crop(image, box), cv2.COLOR_BGR2GRAY)
+        if gray.shape != state['gray'].shape:
+            return None
+
+        lk_params = dict(winSize=self.FLOW['WIN_SIZE'], maxLevel=self.FLOW['MAX_LEVEL'],
+                         criteria=self.FLOW['CRITERIA'])
+        forward, status, _ = cv2.calcOpticalFlowPyrLK(state['gray'], gray, state['points'], None, **lk_params)
+        if forward is None or not status.all():
+            return None
+        backward, status, _ = cv2.calcOpticalFlowPyrLK(gray, state['gray'], forward, None, **lk_params)
+        if backward is None or not status.all():
+            return None
+
+        fb_error = np.linalg.norm((backward - state['points']).reshape(-1, 2), axis=1)
+        if fb_error.max() > self.FLOW['FB_ERROR_THRESHOLD']:
+            return None
+
+        # Points drifting out of the eye region mean the region is stale
+        region_height, region_width = gray.shape
+        tracked = forward.reshape(-1, 2)
+        if (tracked < 0).any() or (tracked[:, 0] >= region_width).any() or (tracked[:, 1] >= region_height).any():
+            return None
+
+        state.update(gray=gray, points=forward, age=state['age'] + 1)
+        return tracked.astype(np.float64) + box[:2]
 
     def analyze_eye_movement(self, image):
         """Analyze eye movement and position."""
@@ -97,107 +228,281 @@ class EyeTracker:
             np.array(current_points) - np.array(previous_points),
             axis=1
         ))
-        return displacement * 30  # Assuming 30fps
+        return displacement * self.fps
 
     def detect_saccades(self, velocities):
         """Enhanced saccade detection with temporal windowing."""
-        if not velocities:
+        if len(velocities) == 0:
             return []
             
-        velocities = np.array(velocities)
-        saccades = []
-        window_size = 3  # Look at 3 frames at a time
+        velocities = np.asarray(velocities, dtype=float)
+        window_size = 3  # Look at 3 frames on each side
         
-        for i in range(len(velocities)):
-            # Get window of velocities
-            start = max(0, i - window_size)
-            end = min(len(velocities), i + window_size + 1)
-            window = velocities[start:end]
-            
-            # Detect saccade if:
-            # 1. Current velocity exceeds threshold OR
-            # 2. Sudden velocity change in window OR
-            # 3. Peak velocity in window is high
-            is_saccade = (
-                velocities[i] > self.SACCADE_VELOCITY_THRESHOLD or
-                (np.max(window) - np.min(window)) > self.SACCADE_VELOCITY_THRESHOLD/2 or
-                np.max(window) > self.SACCADE_VELOCITY_THRESHOLD * 1.5
-            )
-            saccades.append(bool(is_saccade))
+        # Windows clipped at the sequence ends: pad so the padding never wins max/min
+        window_max = sliding_window_view(
+            np.pad(velocities, window_size, constant_values=-np.inf), 2 * window_size + 1
+        ).max(axis=1)
+        window_min = sliding_window_view(
+            np.pad(velocities, window_size, constant_values=np.inf), 2 * window_size + 1
+        ).min(axis=1)
+        
+        # Detect saccade if:
+        # 1. Current velocity exceeds threshold OR
+        # 2. Sudden velocity change in window OR
+        # 3. Peak velocity in window is high
+        saccades = (
+            (velocities > self.SACCADE_VELOCITY_THRESHOLD) |
+            ((window_max - window_min) > self.SACCADE_VELOCITY_THRESHOLD/2) |
+            (window_max > self.SACCADE_VELOCITY_THRESHOLD * 1.5)
+        )
             
-        return saccades
-
-    def analyze_eye_movement_sequence(self, frames):
-        """Enhanced eye movement analysis."""
-        temporal_metrics = {
-            'velocities': [],
-            'positions': [],
-            'ears': [],
-            'saccades': [],
-            'fixations': [],
-            'blinks': [],
-            'pursuit_quality': []
+        return saccades.tolist()
+
+    def analyze_eye_movement_sequence(self, frames, quality_monitor=None):
+        """
+        Enhanced eye movement analysis.
+
+        Args:
+            frames: Sequence or iterator of BGR frames
+            quality_monitor: Optional EyeQualityMonitor; when its gate fails the
+                remaining frames are not processed and a "retake" result is returned
+        """
+        previous = self.get_previous_points()
+        points, quality = self.collect_eye_points(frames, quality_monitor, previous)
+        if quality is not None and not quality['passed']:
+            return self.retake_result(quality)
+
+        temporal_metrics = self.calculate_temporal_metrics(points, previous)
+        if len(points):
+            split = len(self.LEFT_EYE)
+            self.previous_landmarks = {
+                "left_eye": [tuple(point) for point in points[-1, :split].tolist()],
+                "right_eye": [tuple(point) for point in points[-1, split:].tolist()]
+            }
+
+        result = {
+            'success': True,
+            'temporal_metrics': temporal_metrics,
+            'summary': self.calculate_summary_metrics(temporal_metrics)
+        }
+        if quality is not None:
+            result['quality'] = quality
+        return result
+
+    @staticmethod
+    def retake_result(quality):
+        """Structured response for recordings rejected by the quality gate."""
+        return {
+            'success': False,
+            'retake': True,
+            'error': 'Recording quality too low, please retake the test',
+            'quality': quality
         }
 
-        prev_velocity = 0
+    def collect_eye_points(self, frames, quality_monitor=None, previous=None):
+        """
+        Track the eye landmarks of every frame with a face into one (T, K, 2) array.
+
+        With a quality monitor, the gate is evaluated on the metrics collected so
+        far as soon as it is due, and collection stops when it fails.
+
+        Returns:
+            Tuple of (points, gate result or None)
+        """
+        capacity = len(frames) if hasattr(frames, '__len__') else 64
+        points = np.empty((max(1, capacity), len(self.EYE_POINTS), 2))
+        count = 0
+
+        self.roi = None
+        self.flow_state = None
         for frame in frames:
-            landmarks = self.get_eye_landmarks(frame)
-            if not landmarks:
+            eye_points = self.track_eye_points(frame)
+            if eye_points is not None:
+                if count == len(points):
+                    points = np.concatenate([points, np.empty_like(points)])
+                points[count] = eye_points
+                count += 1
+
+            if quality_monitor is not None:
+                quality_monitor.update(eye_points is not None)
+                if quality_monitor.due():
+                    quality = quality_monitor.evaluate(self.calculate_temporal_metrics(points[:count], previous))
+                    if not quality['passed']:
+                        return points[:count], quality
+
+        points = points[:count]
+        if quality_monitor is not None and quality_monitor.result is None:
+            # Recording shorter than the gate window
+            quality_monitor.evaluate(self.calculate_temporal_metrics(points, previous))
+        return points, (quality_monitor.result if quality_monitor is not None else None)
+
+    def analyze_eye_video(self, video_path, workers=None, quality_monitor=None):
+        """
+        Analyze every native frame of a video using parallel worker processes.
+
+        The video is split into overlapping time chunks, each tracked in its own
+        process with its own Face Mesh instance. The landmark tracks are stitched
+        back together on the overlapping frames and analysed as one sequence at
+        the video's native frame rate.
+
+        Args:
+            video_path: Path to the video file
+            workers: Number of worker processes (defaults to the CPU count)
+            quality_monitor: Optional EyeQualityMonitor, screened on the first
+                frames in this process before any worker is started
+
+        Returns:
+            Same structure as analyze_eye_movement_sequence, plus frame statistics
+        """
+        frame_count, fps = get_video_info(video_path)
+        if frame_count == 0:
+            return {"success": False, "error": "No frames could be read from video"}
+
+        quality = None
+        if quality_monitor is not None:
+            self.fps = fps
+            _, quality = self.collect_eye_points(
+                iter_frames(video_path, max_frames=quality_monitor.window), quality_monitor
+            )
+            if not quality['passed']:
+                return self.retake_result(quality)
+
+        workers = workers or os.cpu_count() or 1
+        chunks = plan_chunks(frame_count, workers * self.CHUNK['CHUNKS_PER_WORKER'], self.CHUNK['OVERLAP'])
+        logger.info(f"Tracking {frame_count} frames at {fps:.1f} fps in {len(chunks)} chunks on {workers} workers")
+
+        pool = get_process_pool(workers)
+        futures = [
+            pool.submit(track_video_chunk, video_path, read_start, stop, self.tracking_mode)
+            for read_start, _, stop in chunks
+        ]
+        try:
+            tracks = [future.result() for future in futures]
+        except BrokenProcessPool:
+            discard_process_pool()
+            raise
+
+        points = self.stitch_tracks(chunks, tracks, frame_count)
+        detected = ~np.isnan(points[:, 0, 0])
+
+        self.fps = fps
+        self.previous_landmarks = None
+        temporal_metrics = self.calculate_temporal_metrics(points[detected])
+        result = {
+            'success': True,
+            'fps': fps,
+            'frames_total': frame_count,
+            'frames_analyzed': int(detected.sum()),
+            'temporal_metrics': temporal_metrics,
+            'summary': self.calculate_summary_metrics(temporal_metrics)
+        }
+        if quality is not None:
+            result['quality'] = quality
+        return result
+
+    def stitch_tracks(self, chunks, tracks, frame_count):
+        """
+        Join per-chunk landmark tracks into one (frame_count, K, 2) array.
+
+        Each chunk owns frames [start, stop). Its warm-up frames overlap the
+        previous chunk and are used to detect a small frame offset (inexact
+        seeking in some containers) before its own frames are placed.
+        """
+        points = np.full((frame_count, len(self.EYE_POINTS), 2), np.nan)
+        for (read_start, start, stop), track in zip(chunks, tracks):
+            shift = self.chunk_offset(points, track, read_start, start) if start > read_start else 0
+            if shift:
+                logger.info(f"Chunk at frame {start} realigned by {shift} frame(s)")
+
+            # track[j] shows frame read_start + j + shift
+            first = max(start, read_start + shift)
+            last = min(stop, read_start + shift + len(track))
+            if last > first:
+                points[first:last] = track[first - read_start - shift:last - read_start - shift]
+        return points
+
+    def chunk_offset(self, points, track, read_start, start):
+        """Frame offset that best aligns a chunk's warm-up frames with the stitched track."""
+        warmup = start - read_start
+        errors = {}
+        for shift in range(-self.CHUNK['MAX_SHIFT'], self.CHUNK['MAX_SHIFT'] + 1):
+            lo = max(0, -(read_start + shift))
+            hi = min(warmup, start - read_start - shift)
+            if hi - lo < 2:
                 continue
+            reference = points[read_start + shift + lo:read_start + shift + hi]
+            distances = np.linalg.norm(track[lo:hi] - reference, axis=2).mean(axis=1)
+            distances = distances[~np.isnan(distances)]
+            if len(distances) >= 2:
+                errors[shift] = np.median(distances)
 
-            # Enhanced blink detection
-            left_ear = self.eye_aspect_ratio(landmarks["left_eye"])
-            right_ear = self.eye_aspect_ratio(landmarks["right_eye"])
-            avg_ear = (left_ear + right_ear) / 2
-            is_blink = avg_ear < self.BLINK_THRESHOLD
-
-            # Velocity calculation with blink consideration
-            if self.previous_landmarks and not is_blink:
-                left_velocity = self.calculate_velocity(
-                    landmarks["left_eye"],
-                    self.previous_landmarks["left_eye"]
-                )
-                right_velocity = self.calculate_velocity(
-                    landmarks["right_eye"],
-                    self.previous_landmarks["right_eye"]
-                )
-                avg_velocity = (left_velocity + right_velocity) / 2
-                
-                # Calculate acceleration for better saccade detection
-                acceleration = avg_velocity - prev_velocity
-                prev_velocity = avg_velocity
+        if 0 not in errors:
+            return 0
+        best = min(errors, key=errors.get)
+        # Prefer no shift unless another alignment is clearly better
+        return best if errors[best] < 0.5 * errors[0] else 0
+
+    def get_previous_points(self):
+        """Landmarks carried over from the previous sequence as a (K, 2) array, if any."""
+        if not self.previous_landmarks:
+            return None
+        return np.array(self.previous_landmarks["left_eye"] + self.previous_landmarks["right_eye"])
+
+    def calculate_temporal_metrics(self, points, previous=None):
+        """
+        Per-frame metrics for a sequence of eye landmarks.
+
+        Args:
+            points: (T, K, 2) eye landmarks in pixels, left eye first
+            previous: Optional (K, 2) landmarks of the frame before the sequence
+
+        Returns:
+            Dictionary of per-frame lists (velocities, positions, ears, blinks,
+            saccades, fixations, pursuit_quality)
+        """
+        split = len(self.LEFT_EYE)
+
+        # Enhanced blink detection
+        ears = (self.batch_eye_aspect_ratio(points[:, :split]) +
+                self.batch_eye_aspect_ratio(points[:, split:])) / 2
+        blinks = ears < self.BLINK_THRESHOLD
+
+        # Velocity against the previous detected frame, zero during blinks
+        velocities = np.zeros(len(points))
+        if len(points):
+            previous_points = np.empty_like(points)
+            previous_points[1:] = points[:-1]
+            has_previous = np.ones(len(points), dtype=bool)
+            if previous is None:
+                previous_points[0] = 0
+                has_previous[0] = False
             else:
-                avg_velocity = 0
-                acceleration = 0
+                previous_points[0] = previous
 
-            # Store metrics
-            temporal_metrics['velocities'].append(avg_velocity)
-            temporal_metrics['ears'].append(avg_ear)
-            temporal_metrics['blinks'].append(is_blink)
-            
-            # Store position for pursuit analysis
-            center_position = np.mean(landmarks["left_eye"] + landmarks["right_eye"], axis=0)
-            temporal_metrics['positions'].append(center_position)
-            
-            self.previous_landmarks = landmarks
-
-        # Post-process with enhanced detection
-        temporal_metrics['saccades'] = self.detect_saccades(temporal_metrics['velocities'])
-        temporal_metrics['fixations'] = self.detect_fixations(temporal_metrics['velocities'])
-        temporal_metrics['pursuit_quality'] = self.calculate_pursuit_quality(
-            temporal_metrics['positions'],
-            temporal_metrics['velocities']
-        )
+            displacement = np.linalg.norm(points - previous_points, axis=2)
+            left_velocity = displacement[:, :split].mean(axis=1) * self.fps
+            right_velocity = displacement[:, split:].mean(axis=1) * self.fps
+            moving = has_previous & ~blinks
+            velocities[moving] = ((left_velocity + right_velocity) / 2)[moving]
 
+        # Position for pursuit analysis
+        positions = points.mean(axis=1)
+
+        velocity_list = velocities.tolist()
+        position_list = list(positions)
         return {
-            'success': True,
-            'temporal_metrics': temporal_metrics,
-            'summary': self.calculate_summary_metrics(temporal_metrics)
+            'velocities': velocity_list,
+            'positions': position_list,
+            'ears': ears.tolist(),
+            'saccades': self.detect_saccades(velocities),
+            'fixations': self.detect_fixations(velocities),
+            'blinks': blinks.tolist(),
+            'pursuit_quality': self.calculate_pursuit_quality(position_list, velocity_list)
         }
 
     def detect_fixations(self, velocities):
         """Detect periods of stable gaze (fixations)."""
-        return [v < self.SACCADE_VELOCITY_THRESHOLD/10 for v in velocities]
+        return (np.asarray(velocities, dtype=float) < self.SACCADE_VELOCITY_THRESHOLD/10).tolist()
 
     def calculate_summary_metrics(self, temporal_metrics):
         """Enhanced summary statistics calculation."""
@@ -223,17 +528,11 @@ class EyeTracker:
             }
 
         # Apply Savitzky-Golay filter for smooth metrics
-        smoothed_velocities = savgol_filter(valid_velocities, min(5, len(valid_velocities)), 2)
+        smoothed_velocities = savgol_smooth(valid_velocities, min(5, len(valid_velocities)), 2)
         
-        # Count saccades more accurately
-        saccade_count = 0
-        in_saccade = False
-        for is_saccade in temporal_metrics['saccades']:
-            if is_saccade and not in_saccade:
-                saccade_count += 1
-                in_saccade = True
-            elif not is_saccade:
-                in_saccade = False
+        # Count saccades as onsets of consecutive saccade runs
+        saccades = np.asarray(temporal_metrics['saccades'], dtype=bool)
+        saccade_count = int(np.count_nonzero(saccades[1:] & ~saccades[:-1]) + saccades[:1].sum())
                 
         # Calculate accuracy based on fixation stability and target proximity
         positions = np.array(temporal_metrics['positions'])
@@ -285,6 +584,19 @@ class EyeTracker:
             'accuracy': float(accuracy)  # Use the calculated accuracy value
         }
 
+    @staticmethod
+    def batch_eye_aspect_ratio(eye_points):
+        """Eye aspect ratio for a (T, N, 2) array of single-eye landmarks."""
+        def distance(a, b):
+            # Row-wise dot product via matmul rounds like np.linalg.norm on a single vector
+            d = a - b
+            return np.sqrt((d[:, None, :] @ d[:, :, None])[:, 0, 0])
+
+        vertical_dist1 = distance(eye_points[:, 1], eye_points[:, 5])
+        vertical_dist2 = distance(eye_points[:, 2], eye_points[:, 4])
+        horizontal_dist = distance(eye_points[:, 0], eye_points[:, 3])
+        return (vertical_dist1 + vertical_dist2) / (2.0 * horizontal_dist)
+
     def eye_aspect_ratio(self, eye_points):
         """Calculate the eye aspect ratio."""
         vertical_dist1 = np.linalg.norm(np.array(eye_points[1]) - np.array(eye_points[5]))
@@ -367,8 +679,8 @@ class EyeTracker:
             if len(saccade_indices) < 2:
                 return None
                 
-            # Calculate time differences between consecutive saccades (assuming 30fps)
-            latencies = np.diff(saccade_indices) * (1000/30)  # Convert to milliseconds
+            # Calculate time differences between consecutive saccades
+            latencies = np.diff(saccade_indices) * (1000/self.fps)  # Convert to milliseconds
             return latencies.tolist()
             
         except Exception as e:
@@ -383,7 +695,7 @@ class EyeTracker:
                 
             vel_array = np.array(velocities)
             # Apply Savitzky-Golay filter to smooth the velocity profile
-            smoothed = savgol_filter(vel_array, 5, 2)
+            smoothed = savgol_smooth(vel_array, 5, 2)
             
             # Calculate smoothness as 1 - (std(velocity) / mean(velocity))
             smoothness = 1 - (np.std(smoothed) / (np.mean(np.abs(smoothed)) + 1e-6))
@@ -395,26 +707,26 @@ class EyeTracker:
 
     def calculate_pursuit_quality(self, positions, velocities):
         """Calculate smooth pursuit quality."""
-        if not positions or len(positions) < 2:
+        if len(positions) < 2:
             return []
             
-        quality_scores = []
         window_size = 5
+        window_count = len(positions) - window_size
+        if window_count <= 0:
+            return []
+
+        positions = np.asarray(positions, dtype=float)
+        velocities = np.asarray(velocities, dtype=float)
+
+        # Calculate position smoothness (mean step length within each window)
+        steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+        position_smoothness = sliding_window_view(steps, window_size - 1)[:window_count].mean(axis=1)
         
-        for i in range(len(positions) - window_size):
-            window_positions = np.array(positions[i:i+window_size])
-            window_velocities = np.array(velocities[i:i+window_size])
-            
-            # Calculate position smoothness
-            position_diff = np.diff(window_positions, axis=0)
-            position_smoothness = np.mean(np.linalg.norm(position_diff, axis=1))
+        # Calculate velocity consistency
+        window_velocities = sliding_window_view(velocities, window_size)[:window_count]
+        velocity_smoothness = 1 - (window_velocities.std(axis=1) / (window_velocities.mean(axis=1) + 1e-6))
             
-            # Calculate velocity consistency
-            velocity_smoothness = 1 - (np.std(window_velocities) / (np.mean(window_velocities) + 1e-6))
-            
-            quality_scores.append((position_smoothness + velocity_smoothness) / 2)
-            
-        return quality_scores
+        return ((position_smoothness + velocity_smoothness) / 2).tolist()
 
     def detect_nystagmus(self, positions):
         """Detect nystagmus-like eye movements characterized by rapid oscillations."""
@@ -438,4 +750,24 @@ class EyeTracker:
             
         except Exception as e:
             logger.error(f"Error detecting nystagmus: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+
+def track_video_chunk(video_path, read_start, stop, tracking_mode="mesh"):
+    """
+    Worker entry point: eye landmarks for frames [read_start, stop) of a video.
+
+    Runs in a separate process with its own tracker. Returns a
+    (stop - read_start, K, 2) array with NaN rows where no face was found.
+    """
+    tracker = EyeTracker(tracking_mode=tracking_mode)
+    points = np.full((stop - read_start, len(tracker.EYE_POINTS), 2), np.nan)
+    try:
+        for index, frame in enumerate(iter_frames(video_path, start=read_start, max_frames=stop - read_start)):
+            eye_points = tracker.track_eye_points(frame)
+            if eye_points is not None:
+                points[index] = eye_points
+    finally:
+        tracker.face_mesh.close()
+        tracker.face_detector.close()
+    return points
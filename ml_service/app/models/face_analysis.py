@@ -2,11 +2,21 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Any, Optional
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Any, Optional, Iterable
+from ..utils.roi import (FaceRegionDetector, expand_box, box_from_landmarks, box_contains,
+                         crop, crop_is_worthwhile, map_landmarks_to_frame)
 
 logger = logging.getLogger(__name__)
 
 class FaceAnalyzer:
+    # Number of Face Mesh points covered by FACEMESH_TESSELATION (iris points excluded)
+    MESH_POINT_COUNT = 468
+
+    # Packed tessellation, built once per process: (bytes, etag, edge_count)
+    _mesh_topology = None
+
     def __init__(self):
         # Use higher confidence thresholds and enable 3D landmarks
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -18,6 +28,15 @@ class FaceAnalyzer:
             min_tracking_confidence=0.6
         )
         
+        # Cheap face detector run before Face Mesh: frames without a face are
+        # rejected early and Face Mesh only sees the region around the face
+        self.face_detector = FaceRegionDetector(min_detection_confidence=0.5)
+        self.ROI = {
+            'DETECTION_EXPANSION': (1.8, 1.0, 0.9),   # width, above, below (detector box)
+            'LANDMARK_EXPANSION': (1.4, 0.75, 0.75),  # width, above, below (landmark box)
+            'RECENTER_MARGIN': 0.1                    # re-centre when the face nears the crop edge
+        }
+        
         # Define landmark indices for different facial features
         # Using more comprehensive landmark sets
         self.LEFT_EYE = [33, 246, 161, 160, 159, 158, 157, 173, 133, 155, 154, 153, 145, 144, 163, 7]
@@ -41,102 +60,750 @@ class FaceAnalyzer:
             "blink_rate_range": (8, 21)  # Normal blink rate per minute
         }
 
-    def analyze_symmetry(self, image: np.ndarray) -> Dict[str, Any]:
-        """Analyze facial symmetry using MediaPipe Face Mesh with enhanced metrics."""
+        # Video mode: per-frame series that get aggregated over the clip
+        self.VIDEO_SERIES = ["symmetry_score", "eye_symmetry", "mouth_symmetry",
+                             "jaw_symmetry", "eyebrow_symmetry", "face_tilt"]
+        self.MIN_VIDEO_FRAMES = 5
+
+        # Landmarks whose motion over time defines facial expressivity
+        self.EXPRESSION_REGIONS = [
+            ("left_eye", self.LEFT_EYE),
+            ("right_eye", self.RIGHT_EYE),
+            ("mouth", self.MOUTH),
+            ("left_eyebrow", self.LEFT_EYEBROW),
+            ("right_eyebrow", self.RIGHT_EYEBROW)
+        ]
+        self.EXPRESSION_POINTS = [idx for _, indices in self.EXPRESSION_REGIONS for idx in indices]
+
+        # Landmarks of recent uploads, keyed by content digest, so mesh export
+        # can reuse the Face Mesh pass done during symmetry analysis
+        self.LANDMARK_CACHE_SIZE = 64
+        self._landmark_cache = OrderedDict()
+
+    def analyze_symmetry(self, image: np.ndarray, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze facial symmetry using MediaPipe Face Mesh with enhanced metrics.
+
+        When cache_key is given (see upload_digest) the detected landmarks are
+        kept so that get_mesh_coordinates can serve the same upload without
+        running Face Mesh again.
+        """
         try:
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             height, width = image.shape[:2]
             
             logger.info(f"Processing image of size {width}x{height}")
             
-            # Process the image
-            results = self.face_mesh.process(rgb_image)
+            # Detect the face, then run Face Mesh on the face region
+            landmarks = self._find_landmarks(image)
             
-            if not results.multi_face_landmarks:
+            if landmarks is None:
                 logger.warning("No face detected in the image")
                 return {
                     "success": False,
                     "error": "No face detected"
                 }
 
-            landmarks = results.multi_face_landmarks[0].landmark
-            
-            # Process landmarks with 3D coordinates
-            processed_landmarks = {
-                "leftEye": self._process_landmarks_3d(landmarks, self.LEFT_EYE, width, height),
-                "rightEye": self._process_landmarks_3d(landmarks, self.RIGHT_EYE, width, height),
-                "mouth": self._process_landmarks_3d(landmarks, self.MOUTH, width, height),
-                "jawline": self._process_landmarks_3d(landmarks, self.JAWLINE, width, height),
-                "nose": self._process_landmarks_3d(landmarks, self.NOSE, width, height),
-                "leftEyebrow": self._process_landmarks_3d(landmarks, self.LEFT_EYEBROW, width, height),
-                "rightEyebrow": self._process_landmarks_3d(landmarks, self.RIGHT_EYEBROW, width, height)
-            }
-            
-            # Calculate midline of the face
-            midline = self._calculate_face_midline(landmarks, self.MIDLINE_POINTS, width, height)
-            
-            # Calculate symmetry metrics with enhanced algorithms
-            eye_symmetry, eye_metrics = self._calculate_enhanced_eye_symmetry(processed_landmarks, midline)
-            mouth_symmetry, mouth_metrics = self._calculate_enhanced_mouth_symmetry(processed_landmarks, midline)
-            jaw_symmetry, jaw_metrics = self._calculate_enhanced_jaw_symmetry(processed_landmarks, midline)
-            eyebrow_symmetry, eyebrow_metrics = self._calculate_eyebrow_symmetry(processed_landmarks, midline)
-            
-            # Calculate facial tilt and orientation
-            tilt_angle = self._calculate_face_tilt(processed_landmarks)
+            if cache_key is not None:
+                self._cache_landmarks(cache_key, landmarks, width, height)
+
+            return self._score_landmarks(image, landmarks, width, height)
             
-            # Calculate overall symmetry score (0-100) with weighted components
-            # Weight asymmetry of different features based on neurological significance
-            weights = {
-                "eye": 0.35,       # Eyes are significant indicators
-                "mouth": 0.25,     # Mouth asymmetry is important
-                "jaw": 0.2,        # Jawline can show asymmetry 
-                "eyebrow": 0.2     # Eyebrow asymmetry can be significant
+        except Exception as e:
+            logger.error(f"Error in analyze_symmetry: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "error": f"Analysis failed: {str(e)}"
             }
-            
-            symmetry_score = (
-                eye_symmetry * weights["eye"] + 
-                mouth_symmetry * weights["mouth"] + 
-                jaw_symmetry * weights["jaw"] + 
-                eyebrow_symmetry * weights["eyebrow"]
-            ) * 100
-            
-            # Calculate neurological risk indicators
-            neuro_indicators = self._calculate_neurological_indicators(
-                eye_metrics, mouth_metrics, jaw_metrics, eyebrow_metrics
-            )
-            
-            # Generate a visualization of the analysis
-            visualization = self._create_visualization(image, processed_landmarks, midline)
-            
+
+    def _find_landmarks(self, image: np.ndarray):
+        """
+        Two-stage landmark detection for a still image.
+
+        The face detector runs first on a downscaled copy; if it finds nothing
+        the image is rejected without running Face Mesh. Otherwise Face Mesh runs
+        on the expanded face box and the landmarks are mapped back to normalized
+        full-image coordinates.
+        """
+        height, width = image.shape[:2]
+        box = self.face_detector.detect(image)
+        if box is None:
+            return None
+
+        roi = expand_box(box, width, height, *self.ROI['DETECTION_EXPANSION'])
+        if roi is not None and crop_is_worthwhile(roi, width, height):
+            results = self.face_mesh.process(cv2.cvtColor(crop(image, roi), cv2.COLOR_BGR2RGB))
+            if results.multi_face_landmarks:
+                return map_landmarks_to_frame(results.multi_face_landmarks[0].landmark, roi, width, height)
+            logger.info("Face Mesh failed on the face crop, retrying on the full image")
+
+        results = self.face_mesh.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if not results.multi_face_landmarks:
+            return None
+        return results.multi_face_landmarks[0].landmark
+
+    def _track_landmarks(self, frame: np.ndarray, face_mesh, roi):
+        """
+        Landmarks for one video frame using the previous frame's face region.
+
+        The region is kept fixed while the face stays well inside it, so the
+        tracking graph sees a stable crop; it is re-centred from the landmarks
+        when the face nears an edge and re-detected when tracking is lost.
+
+        Returns:
+            Tuple of (landmarks or None, region for the next frame or None)
+        """
+        height, width = frame.shape[:2]
+        if roi is None:
+            box = self.face_detector.detect(frame)
+            if box is None:
+                return None, None
+            roi = expand_box(box, width, height, *self.ROI['DETECTION_EXPANSION'])
+            if roi is None:
+                return None, None
+
+        results = face_mesh.process(cv2.cvtColor(crop(frame, roi), cv2.COLOR_BGR2RGB))
+        if not results.multi_face_landmarks:
+            return None, None
+
+        landmarks = map_landmarks_to_frame(results.multi_face_landmarks[0].landmark, roi, width, height)
+        face_box = box_from_landmarks(landmarks, width, height)
+        if face_box is not None and not box_contains(roi, face_box, self.ROI['RECENTER_MARGIN']):
+            roi = expand_box(face_box, width, height, *self.ROI['LANDMARK_EXPANSION'])
+
+        return landmarks, roi
+
+    def _score_landmarks(self, image, landmarks, width, height) -> Dict[str, Any]:
+        """Compute the symmetry report for one set of Face Mesh landmarks."""
+        # Process landmarks with 3D coordinates
+        processed_landmarks = {
+            "leftEye": self._process_landmarks_3d(landmarks, self.LEFT_EYE, width, height),
+            "rightEye": self._process_landmarks_3d(landmarks, self.RIGHT_EYE, width, height),
+            "mouth": self._process_landmarks_3d(landmarks, self.MOUTH, width, height),
+            "jawline": self._process_landmarks_3d(landmarks, self.JAWLINE, width, height),
+            "nose": self._process_landmarks_3d(landmarks, self.NOSE, width, height),
+            "leftEyebrow": self._process_landmarks_3d(landmarks, self.LEFT_EYEBROW, width, height),
+            "rightEyebrow": self._process_landmarks_3d(landmarks, self.RIGHT_EYEBROW, width, height)
+        }
+        
+        # Calculate midline of the face
+        midline = self._calculate_face_midline(landmarks, self.MIDLINE_POINTS, width, height)
+        
+        # Calculate symmetry metrics with enhanced algorithms
+        eye_symmetry, eye_metrics = self._calculate_enhanced_eye_symmetry(processed_landmarks, midline)
+        mouth_symmetry, mouth_metrics = self._calculate_enhanced_mouth_symmetry(processed_landmarks, midline)
+        jaw_symmetry, jaw_metrics = self._calculate_enhanced_jaw_symmetry(processed_landmarks, midline)
+        eyebrow_symmetry, eyebrow_metrics = self._calculate_eyebrow_symmetry(processed_landmarks, midline)
+        
+        # Calculate facial tilt and orientation
+        tilt_angle = self._calculate_face_tilt(processed_landmarks)
+        
+        # Calculate overall symmetry score (0-100) with weighted components
+        # Weight asymmetry of different features based on neurological significance
+        weights = {
+            "eye": 0.35,       # Eyes are significant indicators
+            "mouth": 0.25,     # Mouth asymmetry is important
+            "jaw": 0.2,        # Jawline can show asymmetry 
+            "eyebrow": 0.2     # Eyebrow asymmetry can be significant
+        }
+        
+        symmetry_score = (
+            eye_symmetry * weights["eye"] + 
+            mouth_symmetry * weights["mouth"] + 
+            jaw_symmetry * weights["jaw"] + 
+            eyebrow_symmetry * weights["eyebrow"]
+        ) * 100
+        
+        # Calculate neurological risk indicators
+        neuro_indicators = self._calculate_neurological_indicators(
+            eye_metrics, mouth_metrics, jaw_metrics, eyebrow_metrics
+        )
+        
+        # Generate a visualization of the analysis
+        visualization = self._create_visualization(image, processed_landmarks, midline)
+        
+        return {
+            "success": True,
+            "symmetry_score": float(symmetry_score),
+            "landmarks": processed_landmarks,
+            "midline": midline,
+            "metrics": {
+                "eye_symmetry": float(eye_symmetry),
+                "mouth_symmetry": float(mouth_symmetry),
+                "jaw_symmetry": float(jaw_symmetry),
+                "eyebrow_symmetry": float(eyebrow_symmetry),
+                "face_tilt": float(tilt_angle),
+                "detailed_metrics": {
+                    "eye": eye_metrics,
+                    "mouth": mouth_metrics,
+                    "jaw": jaw_metrics,
+                    "eyebrow": eyebrow_metrics
+                }
+            },
+            "neurological_indicators": neuro_indicators
+        }
+
+    def analyze_video(self, frames: Iterable[np.ndarray], fps: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Analyze facial symmetry over a video clip.
+
+        Face Mesh runs in tracking mode on the face region carried over from the
+        previous frame, so after the first detection each frame only refines the
+        previous landmarks on a small crop. Every frame is scored with the same metrics as
+        analyze_symmetry and the per-frame values are reduced to robust
+        aggregates, together with expressivity measured from landmark motion.
+
+        Args:
+            frames: BGR frames in temporal order (any iterable, consumed once)
+            fps: Effective frame rate of the sequence, used for the time axis
+
+        Returns:
+            Dictionary containing aggregated symmetry metrics
+        """
+        try:
+            series = {name: [] for name in self.VIDEO_SERIES}
+            risk_scores = {name: [] for name in ("bells_palsy", "stroke", "parkinsons", "overall")}
+            feature_tracks = []
+            timestamps = []
+            total_frames = 0
+
+            # A fresh tracking graph per clip so state never leaks between requests
+            with self.mp_face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.6,
+                min_tracking_confidence=0.6
+            ) as face_mesh:
+                roi = None
+                for frame_idx, frame in enumerate(frames):
+                    total_frames += 1
+                    height, width = frame.shape[:2]
+                    landmarks, roi = self._track_landmarks(frame, face_mesh, roi)
+                    if landmarks is None:
+                        continue
+
+                    frame_result = self._score_landmarks(frame, landmarks, width, height)
+
+                    series["symmetry_score"].append(frame_result["symmetry_score"])
+                    for name in self.VIDEO_SERIES[1:]:
+                        series[name].append(frame_result["metrics"][name])
+                    for name in risk_scores:
+                        risk_scores[name].append(frame_result["neurological_indicators"][name]["score"])
+
+                    feature_tracks.append(self._expression_points(landmarks, width, height))
+                    timestamps.append(frame_idx / fps if fps else float(frame_idx))
+
+            frames_analyzed = len(feature_tracks)
+            logger.info(f"Face detected in {frames_analyzed}/{total_frames} frames")
+
+            if frames_analyzed < self.MIN_VIDEO_FRAMES:
+                return {
+                    "success": False,
+                    "error": "No face detected" if frames_analyzed == 0 else "Face detected in too few frames",
+                    "frames_total": total_frames,
+                    "frames_analyzed": frames_analyzed
+                }
+
+            aggregates = {name: self._robust_summary(values) for name, values in series.items()}
+
+            indicators = {}
+            for name, scores in risk_scores.items():
+                score = float(np.median(scores))
+                indicators[name] = {
+                    "score": score,
+                    "risk": self._risk_level(score),
+                    "p90": float(np.percentile(scores, 90))
+                }
+
             return {
                 "success": True,
-                "symmetry_score": float(symmetry_score),
-                "landmarks": processed_landmarks,
-                "midline": midline,
-                "metrics": {
-                    "eye_symmetry": float(eye_symmetry),
-                    "mouth_symmetry": float(mouth_symmetry),
-                    "jaw_symmetry": float(jaw_symmetry),
-                    "eyebrow_symmetry": float(eyebrow_symmetry),
-                    "face_tilt": float(tilt_angle),
-                    "detailed_metrics": {
-                        "eye": eye_metrics,
-                        "mouth": mouth_metrics,
-                        "jaw": jaw_metrics,
-                        "eyebrow": eyebrow_metrics
-                    }
-                },
-                "neurological_indicators": neuro_indicators
+                "mode": "video",
+                "frames_total": total_frames,
+                "frames_analyzed": frames_analyzed,
+                "detection_rate": float(frames_analyzed / total_frames),
+                "symmetry_score": aggregates["symmetry_score"]["median"],
+                "metrics": {name: aggregates[name]["median"] for name in self.VIDEO_SERIES[1:]},
+                "aggregates": aggregates,
+                "expressivity": self._calculate_expressivity(np.array(feature_tracks)),
+                "neurological_indicators": indicators,
+                "series": {
+                    "timestamps": timestamps,
+                    "symmetry_score": series["symmetry_score"]
+                }
             }
-            
+
         except Exception as e:
-            logger.error(f"Error in analyze_symmetry: {str(e)}", exc_info=True)
+            logger.error(f"Error in analyze_video: {str(e)}", exc_info=True)
             return {
                 "success": False,
-                "error": f"Analysis failed: {str(e)}"
+                "error": f"Video analysis failed: {str(e)}"
             }
 
+    def _expression_points(self, landmarks, width, height) -> np.ndarray:
+        """Pixel coordinates of the expressive regions used for expressivity."""
+        return np.array(
+            [(landmarks[idx].x * width, landmarks[idx].y * height) for idx in self.EXPRESSION_POINTS]
+        )
+
+    def _calculate_expressivity(self, tracks: np.ndarray) -> Dict[str, float]:
+        """
+        Measure how much the expressive regions move over the clip.
+
+        Points are expressed relative to the eye centres and scaled by the
+        inter-ocular distance, so head translation, distance to the camera and
+        image resolution cancel out. Expressivity is the mean temporal standard
+        deviation of those normalized positions (x100).
+        """
+        n_left_eye = len(self.LEFT_EYE)
+        n_eyes = n_left_eye + len(self.RIGHT_EYE)
+        left_eye_center = tracks[:, :n_left_eye].mean(axis=1)
+        right_eye_center = tracks[:, n_left_eye:n_eyes].mean(axis=1)
+
+        origin = (left_eye_center + right_eye_center) / 2
+        scale = np.linalg.norm(right_eye_center - left_eye_center, axis=1)
+        scale[scale == 0] = 1.0
+        normalized = (tracks - origin[:, None, :]) / scale[:, None, None]
+
+        # Per-point motion over time
+        motion = np.linalg.norm(np.std(normalized, axis=0), axis=1) * 100
+
+        regions = {}
+        offset = 0
+        for name, indices in self.EXPRESSION_REGIONS:
+            regions[name] = float(np.mean(motion[offset:offset + len(indices)]))
+            offset += len(indices)
+
+        left = np.mean([regions["left_eye"], regions["left_eyebrow"]])
+        right = np.mean([regions["right_eye"], regions["right_eyebrow"]])
+        side_ratio = min(left, right) / max(left, right) if max(left, right) > 0 else 1.0
+
+        return {
+            "overall": float(np.mean(motion)),
+            "mouth": regions["mouth"],
+            "eyes": float(np.mean([regions["left_eye"], regions["right_eye"]])),
+            "eyebrows": float(np.mean([regions["left_eyebrow"], regions["right_eyebrow"]])),
+            "left": float(left),
+            "right": float(right),
+            "side_symmetry": float(side_ratio)
+        }
+
+    def _robust_summary(self, values) -> Dict[str, float]:
+        """Median, percentiles and spread of a per-frame metric."""
+        values = np.asarray(values, dtype=float)
+        p10, p25, median, p75, p90 = np.percentile(values, [10, 25, 50, 75, 90])
+        return {
+            "median": float(median),
+            "p10": float(p10),
+            "p25": float(p25),
+            "p75": float(p75),
+            "p90": float(p90),
+            "iqr": float(p75 - p25),
+            "mean": float(np.mean(values)),
+            "std": float(np.std(values))
+        }
+
+    def _risk_level(self, score: float) -> str:
+        """Map a neurological indicator score to a risk label."""
+        if score > 0.4:
+            return "high"
+        if score > 0.25:
+            return "moderate"
+        return "low"
+
+    def score_landmark_batch(self, landmarks: np.ndarray, width, height, chunk_size: int = 512) -> Dict[str, Any]:
+        """
+        Score many faces at once from stored Face Mesh landmarks.
+
+        This is the vectorized counterpart of _score_landmarks: it produces every
+        symmetry metric and neurological indicator of analyze_symmetry, but as
+        arrays of length N computed with NumPy over the whole batch.
+
+        Args:
+            landmarks: Normalized Face Mesh landmarks, shape (N, 468 or 478, 3)
+            width: Image width in pixels (scalar or array of shape (N,))
+            height: Image height in pixels (scalar or array of shape (N,))
+            chunk_size: Faces per block for the convex hull step, bounds memory
+
+        Returns:
+            Nested dictionary with the same keys as the per-image result,
+            holding arrays of shape (N,)
+
+        Note:
+            The midline is fitted in closed form rather than with np.polyfit, so
+            a jaw point lying exactly on the midline (only seen on faces a few
+            dozen pixels wide) may be assigned to the other side.
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        if landmarks.ndim != 3 or landmarks.shape[2] < 2:
+            raise ValueError(f"Expected landmarks of shape (N, K, 3), got {landmarks.shape}")
+
+        n = landmarks.shape[0]
+        width = np.broadcast_to(np.asarray(width, dtype=np.float64), (n,))[:, None]
+        height = np.broadcast_to(np.asarray(height, dtype=np.float64), (n,))[:, None]
+
+        # Same integer pixel coordinates as _process_landmarks_3d (int() truncates)
+        px = np.trunc(landmarks[:, :, 0] * width)
+        py = np.trunc(landmarks[:, :, 1] * height)
+        points = np.stack([px, py], axis=-1)
+
+        slope, intercept = self._batch_midline(points[:, self.MIDLINE_POINTS])
+
+        def midline_x(y):
+            # Broadcast the per-face line over any trailing point axes
+            shape = (-1,) + (1,) * (np.ndim(y) - 1)
+            return slope.reshape(shape) * y + intercept.reshape(shape)
+
+        eye_symmetry, eye = self._batch_eye_symmetry(
+            points[:, self.LEFT_EYE], points[:, self.RIGHT_EYE], midline_x, chunk_size)
+        mouth_symmetry, mouth = self._batch_mouth_symmetry(points[:, self.MOUTH], midline_x)
+        jaw_symmetry, jaw = self._batch_jaw_symmetry(points[:, self.JAWLINE], midline_x)
+        eyebrow_symmetry, eyebrow = self._batch_eyebrow_symmetry(
+            points[:, self.LEFT_EYEBROW], points[:, self.RIGHT_EYEBROW], midline_x)
+
+        left_eye = points[:, self.LEFT_EYE].mean(axis=1)
+        right_eye = points[:, self.RIGHT_EYE].mean(axis=1)
+        tilt = np.degrees(np.arctan2(right_eye[:, 1] - left_eye[:, 1], right_eye[:, 0] - left_eye[:, 0]))
+
+        symmetry_score = (
+            eye_symmetry * 0.35 +
+            mouth_symmetry * 0.25 +
+            jaw_symmetry * 0.2 +
+            eyebrow_symmetry * 0.2
+        ) * 100
+
+        return {
+            "symmetry_score": symmetry_score,
+            "metrics": {
+                "eye_symmetry": eye_symmetry,
+                "mouth_symmetry": mouth_symmetry,
+                "jaw_symmetry": jaw_symmetry,
+                "eyebrow_symmetry": eyebrow_symmetry,
+                "face_tilt": tilt,
+                "detailed_metrics": {
+                    "eye": eye,
+                    "mouth": mouth,
+                    "jaw": jaw,
+                    "eyebrow": eyebrow
+                }
+            },
+            "neurological_indicators": self._batch_neurological_indicators(eye, mouth, eyebrow)
+        }
+
+    def _batch_midline(self, midline_points):
+        """Least-squares fit x = slope * y + intercept for each face."""
+        x = midline_points[:, :, 0]
+        y = midline_points[:, :, 1]
+        x_mean = x.mean(axis=1, keepdims=True)
+        y_mean = y.mean(axis=1, keepdims=True)
+        slope = np.sum((y - y_mean) * (x - x_mean), axis=1) / np.sum((y - y_mean) ** 2, axis=1)
+        intercept = x_mean[:, 0] - slope * y_mean[:, 0]
+        return slope, intercept
+
+    def _batch_eye_symmetry(self, left_eye, right_eye, midline_x, chunk_size):
+        """Vectorized _calculate_enhanced_eye_symmetry."""
+        left_centroid = left_eye.mean(axis=1)
+        right_centroid = right_eye.mean(axis=1)
+
+        left_size = self._batch_convex_hull_area(left_eye, chunk_size)
+        right_size = self._batch_convex_hull_area(right_eye, chunk_size)
+
+        left_distance = np.abs(left_centroid[:, 0] - midline_x(left_centroid[:, 1]))
+        right_distance = np.abs(right_centroid[:, 0] - midline_x(right_centroid[:, 1]))
+
+        vertical_alignment = 1 - np.fmin(1, np.abs(left_centroid[:, 1] - right_centroid[:, 1]) /
+                                         ((left_centroid[:, 1] + right_centroid[:, 1]) / 2) * 5)
+        size_ratio = self._batch_ratio(left_size, right_size, 0)
+        distance_ratio = self._batch_ratio(left_distance, right_distance, 0)
+
+        eye_symmetry = 0.4 * vertical_alignment + 0.3 * size_ratio + 0.3 * distance_ratio
+
+        metrics = {
+            "left_eye_position": {"x": left_centroid[:, 0], "y": left_centroid[:, 1]},
+            "right_eye_position": {"x": right_centroid[:, 0], "y": right_centroid[:, 1]},
+            "left_eye_size": left_size,
+            "right_eye_size": right_size,
+            "distance_from_midline": {
+                "left": left_distance,
+                "right": right_distance
+            },
+            "vertical_alignment": vertical_alignment,
+            "size_symmetry": size_ratio,
+            "distance_symmetry": distance_ratio
+        }
+
+        return self._batch_clip01(eye_symmetry), metrics
+
+    def _batch_mouth_symmetry(self, mouth_points, midline_x):
+        """Vectorized _calculate_enhanced_mouth_symmetry."""
+        n = len(mouth_points)
+        rows = np.arange(n)
+        x = mouth_points[:, :, 0]
+        y = mouth_points[:, :, 1]
+        centroid = mouth_points.mean(axis=1)
+
+        midline_x_at_mouth = midline_x(centroid[:, 1])
+        deviation = np.abs(centroid[:, 0] - midline_x_at_mouth)
+        normalized_deviation = deviation / (x.max(axis=1) - x.min(axis=1))
+
+        left_corner = mouth_points[rows, np.argmin(x, axis=1)]
+        right_corner = mouth_points[rows, np.argmax(x, axis=1)]
+
+        corner_vertical_diff = np.abs(left_corner[:, 1] - right_corner[:, 1])
+        corner_horizontal_distance = right_corner[:, 0] - left_corner[:, 0]
+        corner_alignment = 1 - np.fmin(1, corner_vertical_diff / (corner_horizontal_distance / 2))
+
+        left_distance = np.abs(left_corner[:, 0] - midline_x_at_mouth)
+        right_distance = np.abs(right_corner[:, 0] - midline_x_at_mouth)
+        distance_ratio = self._batch_ratio(left_distance, right_distance, 0)
+
+        # Mouth droop: mean height of the points either side of the centroid
+        left_side = x < centroid[:, :1]
+        right_side = x > centroid[:, :1]
+        left_count = left_side.sum(axis=1)
+        right_count = right_side.sum(axis=1)
+        has_sides = (left_count > 0) & (right_count > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            left_avg_y = np.where(left_side, y, 0).sum(axis=1) / left_count
+            right_avg_y = np.where(right_side, y, 0).sum(axis=1) / right_count
+            droop_ratio = np.abs(left_avg_y - right_avg_y) / np.fmax(1, y.max(axis=1) - y.min(axis=1))
+        droop_ratio = np.where(has_sides, droop_ratio, 0.0)
+
+        mouth_symmetry = (
+            (1 - normalized_deviation) * 0.4 +
+            corner_alignment * 0.4 +
+            (1 - droop_ratio) * 0.2
+        )
+
+        metrics = {
+            "center": {"x": centroid[:, 0], "y": centroid[:, 1]},
+            "midline_position": midline_x_at_mouth,
+            "center_deviation": deviation,
+            "normalized_deviation": normalized_deviation,
+            "corner_alignment": corner_alignment,
+            "corners": {
+                "left": {"x": left_corner[:, 0], "y": left_corner[:, 1]},
+                "right": {"x": right_corner[:, 0], "y": right_corner[:, 1]}
+            },
+            "corner_distances": {
+                "left": left_distance,
+                "right": right_distance,
+                "ratio": distance_ratio
+            },
+            "droop_ratio": droop_ratio
+        }
+
+        return self._batch_clip01(mouth_symmetry), metrics
+
+    def _batch_jaw_symmetry(self, jaw_points, midline_x):
+        """Vectorized _calculate_enhanced_jaw_symmetry."""
+        n = len(jaw_points)
+        rows = np.arange(n)
+        x = jaw_points[:, :, 0]
+        y = jaw_points[:, :, 1]
+
+        chin_point = jaw_points[rows, np.argmax(y, axis=1)]
+        midline_x_at_chin = midline_x(chin_point[:, 1])
+        chin_deviation = np.abs(chin_point[:, 0] - midline_x_at_chin)
+
+        # Split the jawline either side of the midline, keeping point order
+        is_left = x < midline_x(y)
+        is_right = ~is_left
+        left_count = is_left.sum(axis=1)
+        right_count = is_right.sum(axis=1)
+
+        def side_extremes(mask):
+            top = jaw_points[rows, np.argmin(np.where(mask, y, np.inf), axis=1)]
+            bottom = jaw_points[rows, np.argmax(np.where(mask, y, -np.inf), axis=1)]
+            return top, bottom
+
+        left_top, left_bottom = side_extremes(is_left)
+        right_top, right_bottom = side_extremes(is_right)
+
+        has_angles = (left_count >= 2) & (right_count >= 2)
+        left_angle = np.where(has_angles, self._batch_angle(left_top, left_bottom), 0.0)
+        right_angle = np.where(has_angles, self._batch_angle(right_top, right_bottom), 0.0)
+        angle_symmetry = np.where(has_angles, 1 - np.fmin(1, np.abs(left_angle - right_angle) / 45), 0.0)
+
+        has_lengths = (left_count > 0) & (right_count > 0)
+        left_length = np.where(has_lengths, self._batch_contour_length(jaw_points, is_left), 0.0)
+        right_length = np.where(has_lengths, self._batch_contour_length(jaw_points, is_right), 0.0)
+        length_ratio = np.where(has_lengths, self._batch_ratio(left_length, right_length, 0), 0.0)
+
+        jaw_symmetry = (
+            0.3 * np.fmax(0, np.fmin(1, 1 - chin_deviation / 50)) +
+            0.4 * angle_symmetry +
+            0.3 * length_ratio
+        )
+        jaw_symmetry = np.where(jaw_symmetry < 0.05, 0.05, jaw_symmetry)
+
+        metrics = {
+            "chin_position": {"x": chin_point[:, 0], "y": chin_point[:, 1]},
+            "midline_position": midline_x_at_chin,
+            "chin_deviation": chin_deviation,
+            "jaw_angles": {
+                "left": left_angle,
+                "right": right_angle,
+                "difference": np.abs(left_angle - right_angle),
+                "symmetry": angle_symmetry
+            },
+            "jaw_lengths": {
+                "left": left_length,
+                "right": right_length,
+                "ratio": length_ratio
+            }
+        }
+
+        return self._batch_clip01(jaw_symmetry), metrics
+
+    def _batch_eyebrow_symmetry(self, left_eyebrow, right_eyebrow, midline_x):
+        """Vectorized _calculate_eyebrow_symmetry."""
+        left_centroid = left_eyebrow.mean(axis=1)
+        right_centroid = right_eyebrow.mean(axis=1)
+
+        left_distance = np.abs(left_centroid[:, 0] - midline_x(left_centroid[:, 1]))
+        right_distance = np.abs(right_centroid[:, 0] - midline_x(right_centroid[:, 1]))
+
+        vertical_diff = np.abs(left_centroid[:, 1] - right_centroid[:, 1])
+        centroid_sum = left_centroid[:, 1] + right_centroid[:, 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            normalized_vertical_diff = np.where(centroid_sum > 0, vertical_diff / (centroid_sum / 2), 0.0)
+        vertical_symmetry = 1 - np.fmin(1, normalized_vertical_diff * 5)
+
+        distance_ratio = self._batch_ratio(left_distance, right_distance, 0)
+
+        left_height = left_eyebrow[:, :, 1].max(axis=1) - left_eyebrow[:, :, 1].min(axis=1)
+        right_height = right_eyebrow[:, :, 1].max(axis=1) - right_eyebrow[:, :, 1].min(axis=1)
+        height_ratio = self._batch_ratio(left_height, right_height, 0)
+
+        eyebrow_symmetry = 0.4 * vertical_symmetry + 0.4 * distance_ratio + 0.2 * height_ratio
+
+        metrics = {
+            "positions": {
+                "left": {"x": left_centroid[:, 0], "y": left_centroid[:, 1]},
+                "right": {"x": right_centroid[:, 0], "y": right_centroid[:, 1]}
+            },
+            "distance_from_midline": {
+                "left": left_distance,
+                "right": right_distance,
+                "ratio": distance_ratio
+            },
+            "vertical_alignment": {
+                "difference": vertical_diff,
+                "symmetry": vertical_symmetry
+            },
+            "heights": {
+                "left": left_height,
+                "right": right_height,
+                "ratio": height_ratio
+            }
+        }
+
+        return self._batch_clip01(eyebrow_symmetry), metrics
+
+    def _batch_neurological_indicators(self, eye_metrics, mouth_metrics, eyebrow_metrics):
+        """Vectorized _calculate_neurological_indicators."""
+        droop_ratio = mouth_metrics["droop_ratio"]
+        eye_size_ratio = self._batch_ratio(eye_metrics["left_eye_size"], eye_metrics["right_eye_size"], 1)
+        mouth_deviation = mouth_metrics["normalized_deviation"]
+        eyebrow_height_ratio = eyebrow_metrics["heights"]["ratio"]
+
+        bells_palsy_score = (droop_ratio * 0.6) + ((1 - eye_size_ratio) * 0.4)
+        stroke_score = (mouth_deviation * 0.4) + ((1 - eyebrow_height_ratio) * 0.3) + ((1 - eye_size_ratio) * 0.3)
+
+        mouth_symmetry = 1 - mouth_metrics["normalized_deviation"]
+        eye_movement = eye_metrics["vertical_alignment"]
+        parkinsons_score = (
+            (0.4 * (1 - mouth_symmetry)) +
+            (0.3 * (1 - eye_movement)) +
+            (0.3 * (1 - eyebrow_height_ratio))
+        ) * 0.7
+
+        risks = {
+            "bells_palsy": self._batch_risk_level(bells_palsy_score),
+            "stroke": self._batch_risk_level(stroke_score),
+            "parkinsons": self._batch_risk_level(parkinsons_score)
+        }
+
+        overall_score = np.max([bells_palsy_score, stroke_score, parkinsons_score], axis=0)
+        overall_risk = self._batch_risk_level(overall_score)
+        any_high = np.any([risk == "high" for risk in risks.values()], axis=0)
+        overall_risk = np.where((overall_risk == "high") & ~any_high, "moderate", overall_risk)
+
+        return {
+            "bells_palsy": {"score": bells_palsy_score, "risk": risks["bells_palsy"]},
+            "stroke": {"score": stroke_score, "risk": risks["stroke"]},
+            "parkinsons": {"score": parkinsons_score, "risk": risks["parkinsons"]},
+            "overall": {"score": overall_score, "risk": overall_risk}
+        }
+
+    def _batch_convex_hull_area(self, points, chunk_size):
+        """
+        Convex hull area of each point set, equal to cv2.contourArea(cv2.convexHull(p)).
+
+        A directed edge i->j lies on the hull when no point is strictly to its
+        right; collinear points strictly inside the edge disqualify it so that
+        every hull side is counted exactly once. The area is then the shoelace
+        sum over the selected edges.
+        """
+        areas = np.empty(len(points))
+        n_points = points.shape[1]
+        not_self = ~np.eye(n_points, dtype=bool)
+
+        for start in range(0, len(points), chunk_size):
+            p = points[start:start + chunk_size]
+
+            # Ignore repeated points (coordinates are integer pixels, so repeats are common)
+            same = np.all(p[:, :, None, :] == p[:, None, :, :], axis=-1)
+            duplicate = np.any(np.tril(same, k=-1), axis=2)
+            usable = ~duplicate
+
+            # edge[n, i, j] = p_j - p_i ; rel[n, i, k] = p_k - p_i
+            edge = p[:, None, :, :] - p[:, :, None, :]
+            cross = (edge[:, :, :, None, 0] * edge[:, :, None, :, 1] -
+                     edge[:, :, :, None, 1] * edge[:, :, None, :, 0])
+            dot = (edge[:, :, :, None, 0] * edge[:, :, None, :, 0] +
+                   edge[:, :, :, None, 1] * edge[:, :, None, :, 1])
+            length_sq = dot[:, :, np.arange(n_points), np.arange(n_points)][:, :, :, None]
+
+            considered = usable[:, None, None, :]
+            right_of_edge = (cross < 0) & considered
+            inside_edge = (cross == 0) & (dot > 0) & (dot < length_sq) & considered
+
+            on_hull = ~np.any(right_of_edge | inside_edge, axis=3)
+            on_hull &= usable[:, :, None] & usable[:, None, :] & not_self
+
+            shoelace = (p[:, :, None, 0] * p[:, None, :, 1] - p[:, None, :, 0] * p[:, :, None, 1])
+            areas[start:start + chunk_size] = np.abs(np.sum(np.where(on_hull, shoelace, 0), axis=(1, 2))) / 2
+
+        return areas
+
+    def _batch_contour_length(self, points, mask):
+        """Length of the polyline through the masked points, in their original order."""
+        rows = np.arange(len(points))[:, None]
+        order = np.argsort(~mask, axis=1, kind='stable')
+        ordered = points[rows, order]
+        segment = np.linalg.norm(np.diff(ordered, axis=1), axis=2)
+        valid = np.arange(1, points.shape[1])[None, :] < mask.sum(axis=1, keepdims=True)
+        return np.sum(np.where(valid, segment, 0), axis=1)
+
+    def _batch_angle(self, p1, p2):
+        """Vectorized _calculate_angle."""
+        return np.abs(np.degrees(np.arctan2(p2[:, 1] - p1[:, 1], p2[:, 0] - p1[:, 0])))
+
+    def _batch_ratio(self, a, b, default):
+        """min(a, b) / max(a, b), or default where the larger value is not positive."""
+        larger = np.maximum(a, b)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(larger > 0, np.minimum(a, b) / larger, default)
+
+    def _batch_clip01(self, values):
+        """Element-wise max(0, min(1, v)) with Python's NaN behaviour."""
+        return np.fmax(0, np.fmin(1, values))
+
+    def _batch_risk_level(self, scores):
+        """Vectorized _risk_level."""
+        return np.where(scores > 0.4, "high", np.where(scores > 0.25, "moderate", "low"))
+
     def _process_landmarks_3d(self, landmarks, indices, width, height):
         """Convert landmark indices to x,y,z coordinates."""
         return [
@@ -610,35 +1277,82 @@ class FaceAnalyzer:
             }
         }
 
-    def get_mesh_coordinates(self, image):
-        """Get complete facial mesh coordinates for 3D visualization."""
+    @staticmethod
+    def upload_digest(contents: bytes) -> str:
+        """Stable identifier for an uploaded image, used as the landmark cache key."""
+        return hashlib.sha256(contents).hexdigest()
+
+    def _cache_landmarks(self, cache_key: str, landmarks, width: int, height: int) -> None:
+        """Store normalized landmarks for an upload, evicting the least recently used."""
+        points = np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+        self._landmark_cache[cache_key] = (points, width, height)
+        self._landmark_cache.move_to_end(cache_key)
+        while len(self._landmark_cache) > self.LANDMARK_CACHE_SIZE:
+            self._landmark_cache.popitem(last=False)
+
+    def _cached_landmarks(self, cache_key: Optional[str]):
+        """Return (points, width, height) for a cached upload, or None."""
+        if cache_key is None or cache_key not in self._landmark_cache:
+            return None
+        self._landmark_cache.move_to_end(cache_key)
+        return self._landmark_cache[cache_key]
+
+    @classmethod
+    def get_mesh_topology(cls) -> Tuple[bytes, str, int]:
+        """
+        Face Mesh tessellation packed as little-endian uint16 (a, b) edge pairs.
+
+        The topology is fixed, so it is built once per process and identified by
+        a content ETag that clients can cache indefinitely.
+
+        Returns:
+            Tuple of (packed edges, etag, edge count)
+        """
+        if cls._mesh_topology is None:
+            edges = np.array(sorted(mp.solutions.face_mesh.FACEMESH_TESSELATION), dtype='<u2')
+            packed = edges.tobytes()
+            etag = '"' + hashlib.sha256(packed).hexdigest()[:32] + '"'
+            cls._mesh_topology = (packed, etag, len(edges))
+        return cls._mesh_topology
+
+    def get_mesh_coordinates(self, image: Optional[np.ndarray] = None, cache_key: Optional[str] = None):
+        """
+        Get complete facial mesh coordinates for 3D visualization.
+
+        Landmarks are taken from the cache when the upload was already analyzed,
+        otherwise Face Mesh runs on the image (and the result is cached).
+
+        Returns:
+            Dictionary with "mesh_points" as a (468, 3) float32 array of pixel
+            x, y and Face Mesh z, the image size and the topology ETag, or None
+            if no face is available
+        """
         try:
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            height, width = image.shape[:2]
-            
-            # Process the image
-            results = self.face_mesh.process(rgb_image)
-            
-            if not results.multi_face_landmarks:
-                return None
-                
-            landmarks = results.multi_face_landmarks[0].landmark
-            
-            # Get all 468 landmarks with 3D coordinates
-            mesh_points = []
-            for i in range(468):  # MediaPipe Face Mesh has 468 landmarks
-                if i < len(landmarks):
-                    mesh_points.append({
-                        "x": landmarks[i].x * width,
-                        "y": landmarks[i].y * height,
-                        "z": landmarks[i].z
-                    })
-            
+            cached = self._cached_landmarks(cache_key)
+            if cached is None:
+                if image is None:
+                    return None
+
+                height, width = image.shape[:2]
+                landmarks = self._find_landmarks(image)
+
+                if landmarks is None:
+                    return None
+
+                points = np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+                if cache_key is not None:
+                    self._cache_landmarks(cache_key, landmarks, width, height)
+            else:
+                points, width, height = cached
+
+            mesh_points = points[:self.MESH_POINT_COUNT] * np.array([width, height, 1], dtype=np.float32)
+
             return {
                 "mesh_points": mesh_points,
-                "connections": mp.solutions.face_mesh.FACEMESH_TESSELATION
+                "width": width,
+                "height": height,
+                "topology_etag": self.get_mesh_topology()[1]
             }
         except Exception as e:
             logger.error(f"Error getting mesh coordinates: {str(e)}")
-            return None
\ No newline at end of file
+            return None
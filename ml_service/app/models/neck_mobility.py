@@ -3,6 +3,8 @@ import numpy as np
 import cv2
 import math
 from typing import Tuple, Dict, Optional
+from ..utils.roi import FaceRegionDetector, box_contains, box_from_landmarks, crop, crop_is_worthwhile, expand_box, \
+    map_landmarks_to_frame
 
 class NeckMobilityAnalyzer:
     def __init__(self):
@@ -15,12 +17,25 @@ class NeckMobilityAnalyzer:
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
+
+        # Pose runs on the head-and-shoulders region, carried between frames from
+        # the previous frame's pose landmarks so Pose's tracking sees a steady
+        # crop. The face detector only seeds the region after tracking is lost;
+        # frames where it finds no face (turned or tilted heads) and frames
+        # where Pose loses the person in the crop are analysed full-frame.
+        self.face_detector = FaceRegionDetector(min_detection_confidence=0.5)
+        self.roi = None
+        self.ROI_DETECTION_EXPANSION = (4.0, 1.5, 4.0)  # width, above, below (face box sizes)
+        self.ROI_LANDMARK_EXPANSION = (1.8, 1.2, 1.2)   # width, above, below (nose-to-shoulders box)
+        self.ROI_RECENTER_MARGIN = 0.1
+        self.HEAD_AND_SHOULDERS = range(self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value + 1)  # face and shoulders
         
         # Initialize angles
         self.reset_measurements()
         
     def reset_measurements(self):
         """Reset all measurements."""
+        self.roi = None
         self.neutral_angle = None
         self.max_flexion = None
         self.max_extension = None
@@ -38,19 +53,43 @@ class NeckMobilityAnalyzer:
 
         height, width = frame.shape[:2]
         
-        # Convert to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb_frame)
-        
         # Create visualization frame
         viz_frame = frame.copy()
+
+        # Seed the region from a face detection only when there is none to carry over
+        full_frame = (0, 0, width, height)
+        if self.roi is None:
+            face_box = self.face_detector.detect(frame)
+            if face_box is not None:
+                self.roi = expand_box(face_box, width, height, *self.ROI_DETECTION_EXPANSION)
+        roi = self.roi or full_frame
+        
+        # Convert to RGB
+        results = self.pose.process(cv2.cvtColor(crop(frame, roi), cv2.COLOR_BGR2RGB))
+        if not results.pose_landmarks and roi != full_frame:
+            # Lost in the crop: retry on the whole frame
+            roi = full_frame
+            results = self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
         
         if not results.pose_landmarks:
+            self.roi = None
             return None, viz_frame
+        x0, y0, x1, y1 = roi
+        
+        # Next frame's region: re-centred on the head and shoulders when they near the crop edge
+        head = map_landmarks_to_frame([results.pose_landmarks.landmark[i] for i in self.HEAD_AND_SHOULDERS],
+                                      roi, width, height)
+        head_box = box_from_landmarks(head, width, height)
+        if head_box is None:
+            self.roi = None
+        elif self.roi is None or roi == full_frame or not box_contains(self.roi, head_box, self.ROI_RECENTER_MARGIN):
+            self.roi = expand_box(head_box, width, height, *self.ROI_LANDMARK_EXPANSION)
+            if self.roi is not None and not crop_is_worthwhile(self.roi, width, height, max_area_ratio=0.9):
+                self.roi = full_frame
             
-        # Draw pose landmarks
+        # Draw pose landmarks (the crop is a view, so this draws on the full frame)
         self.mp_drawing.draw_landmarks(
-            viz_frame,
+            crop(viz_frame, roi),
             results.pose_landmarks,
             self.mp_pose.POSE_CONNECTIONS,
             landmark_drawing_spec=self.mp_drawing_styles.get_default_pose_landmarks_style()
@@ -58,12 +97,16 @@ class NeckMobilityAnalyzer:
         
         # Extract key landmarks
         landmarks = results.pose_landmarks.landmark
+        crop_width, crop_height = x1 - x0, y1 - y0
         landmarks_dict = {
-            'nose': self._to_pixel(landmarks[self.mp_pose.PoseLandmark.NOSE.value], width, height),
-            'left_ear': self._to_pixel(landmarks[self.mp_pose.PoseLandmark.LEFT_EAR.value], width, height),
-            'right_ear': self._to_pixel(landmarks[self.mp_pose.PoseLandmark.RIGHT_EAR.value], width, height),
-            'left_shoulder': self._to_pixel(landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value], width, height),
-            'right_shoulder': self._to_pixel(landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value], width, height)
+            name: self._to_pixel(landmarks[index.value], crop_width, crop_height, x0, y0)
+            for name, index in (
+                ('nose', self.mp_pose.PoseLandmark.NOSE),
+                ('left_ear', self.mp_pose.PoseLandmark.LEFT_EAR),
+                ('right_ear', self.mp_pose.PoseLandmark.RIGHT_EAR),
+                ('left_shoulder', self.mp_pose.PoseLandmark.LEFT_SHOULDER),
+                ('right_shoulder', self.mp_pose.PoseLandmark.RIGHT_SHOULDER)
+            )
         }
         
         # Draw additional visualization
@@ -72,9 +115,9 @@ class NeckMobilityAnalyzer:
         return landmarks_dict, viz_frame
 
     @staticmethod
-    def _to_pixel(landmark, width: int, height: int) -> Tuple[int, int]:
-        """Convert landmark to pixel coordinates."""
-        return (int(landmark.x * width), int(landmark.y * height))
+    def _to_pixel(landmark, width: int, height: int, offset_x: int = 0, offset_y: int = 0) -> Tuple[int, int]:
+        """Convert landmark to pixel coordinates (offsets place crop landmarks in the full frame)."""
+        return (int(landmark.x * width) + offset_x, int(landmark.y * height) + offset_y)
         
     def draw_measurement_visualization(self, frame: np.ndarray, landmarks: Dict) -> None:
         """Draw additional visualization elements."""
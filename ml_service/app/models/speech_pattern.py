@@ -5,12 +5,24 @@ from scipy.signal import savgol_filter
 from collections import deque
 from scipy.stats import kurtosis, skew
 import soundfile as sf
+import soxr
+import os
+import time
+from typing import Optional
+from ..utils import dsp
+from ..utils.pitch_engines import get_pitch_engine
+from ..utils.audio_decoding import SOUNDFILE_CONTAINERS, audio_source, decode_audio, decode_stats
+from ..utils.speech_features import SpeechFeatureStore, VoicedFeatureStore
+from ..utils.speech_stream import BlockFramer, SpeechStreamStatistics, StreamingOnsets
+from ..utils.stage_graph import Stage, get_thread_pool, run_stages
+from ..utils.voice_activity import detect_voice_activity
 
 logger = logging.getLogger(__name__)
 
 class SpeechPatternAnalyzer:
-    def __init__(self):
-        # Add this to your existing constants
+    def __init__(self, analysis_rate: Optional[int] = None, parallel: bool = True,
+                 pitch_engine: str = 'piptrack'):
+        # Framing constants, defined at SAMPLE_RATE and rescaled for the analysis rate
         self.AUDIO = {
             'SAMPLE_RATE': 44100,
             'HOP_LENGTH': 512,
@@ -18,12 +30,49 @@ class SpeechPatternAnalyzer:
             'N_FFT': 2048
         }
         
+        # Audio is resampled once after decode to this rate (None analyses at the
+        # decoded rate with the unscaled constants). 16 kHz covers the speech band
+        # and runs about 2x faster, but it is opt-in: consonant precision and
+        # rolloff clarity are calibrated against the decoded rate's full band and
+        # read low once everything above 8 kHz is cut (consonant precision is
+        # capped at 0.73 for a 44.1 kHz source), so they need recalibrating first
+        self.ANALYSIS_RATE = analysis_rate
+        self.RESAMPLER = 'soxr_hq'
+        
+        # In-memory analysis runs its feature stages as a dependency graph on the
+        # shared thread pool; inline (one after another) when disabled or on one CPU
+        self.PARALLEL_STAGES = parallel and (os.cpu_count() or 1) > 1
+        
+        # Block-wise analysis: long recordings are decoded BLOCK_DURATION seconds at
+        # a time and folded into running statistics instead of being loaded whole
+        self.STREAMING = {
+            'BLOCK_DURATION': 10.0,  # seconds
+            'MIN_DURATION': 60.0     # seconds; shorter recordings are analysed in memory
+        }
+        
+        # Energy/zero-crossing voice activity detection: spectral features are only
+        # computed on the voiced segments, envelope features (volume, rhythm) and
+        # fluency (onsets, pauses, palilalia) on the whole recording
+        self.VOICE_ACTIVITY = {
+            'FLOOR_PERCENTILE': 10,  # frame level taken as the noise floor
+            'ENERGY_MARGIN_DB': 12,  # voiced above floor + margin ...
+            'PEAK_RANGE_DB': 20,     # ... or within this range of the loudest frame
+            'ZCR_MARGIN_DB': 8,      # quieter frames count if their ZCR is high (fricatives)
+            'ZCR_THRESHOLD': 0.3,    # crossings per sample
+            'MIN_SILENCE': 0.4,      # seconds; shorter silences stay in the segment
+            'PADDING': 0.1           # seconds kept around each segment
+        }
+        
         # Constants for speech analysis
         self.PITCH_RANGE = {
             'MIN': 50,  # Hz
             'MAX': 500  # Hz
         }
         
+        # F0 tracker shared by the pitch statistics, pitch contour and stress
+        # contour: 'piptrack', 'yin' or 'autocorrelation' (see utils.pitch_engines)
+        self.PITCH_ENGINE = get_pitch_engine(pitch_engine, self.PITCH_RANGE['MIN'], self.PITCH_RANGE['MAX'])
+        
         self.VOLUME_RANGE = {
             'MIN': -90, # dB
             'MAX': -10  # dB
@@ -48,49 +97,228 @@ class SpeechPatternAnalyzer:
             'VOICE_QUALITY_ISSUES': 0.7,  # Threshold for voice quality issues
             'BREATHING_PATTERN': 0.65,    # Threshold for abnormal breathing
         }
+        
+        # Analysis profiles: which features each computes and which shortcuts it takes.
+        # Frame steps > 1 evaluate a per-frame feature on every n-th STFT frame only
+        # (its metric is a mean over frames, so this subsamples rather than biases it).
+        # Streaming profiles only need running frame statistics, so long recordings
+        # can be analysed block by block.
+        self.PROFILES = {
+            'triage': {
+                'description': 'Core metrics on voiced segments with frame-decimated pitch, contrast and ZCR',
+                'pitch_frame_step': 2,
+                'clarity_frame_step': 4,
+                'palilalia': False,          # repetition score (not part of the core metrics)
+                'voice_quality': False,
+                'clinical_indicators': False,
+                'time_series': False,
+                'report': False,
+                'voice_activity': True,      # spectral features on voiced segments only
+                'streaming': True
+            },
+            'standard': {
+                'description': 'Core metrics computed exactly on voiced segments',
+                'pitch_frame_step': 1,
+                'clarity_frame_step': 1,
+                'palilalia': True,
+                'voice_quality': False,
+                'clinical_indicators': False,
+                'time_series': False,
+                'report': False,
+                'voice_activity': True,      # spectral features on voiced segments only
+                'streaming': True
+            },
+            'full': {
+                'description': 'Core metrics plus HPSS voice quality, neurological indicators, '
+                               'disorder risk scores and time series',
+                'pitch_frame_step': 1,
+                'clarity_frame_step': 1,
+                'palilalia': True,
+                'voice_quality': True,       # harmonic/percussive separation, the most expensive step
+                'clinical_indicators': True,
+                'time_series': True,
+                'report': False,
+                'voice_activity': False,
+                'streaming': False           # HPSS and time series need the whole signal
+            }
+        }
+        self.DEFAULT_PROFILE = 'standard'
+        
+        # Optional report sections: enabled by a profile or requested per call with
+        # detail=, each mapped to the sections it is derived from. Only requested
+        # sections (and what they need) are computed; all of them need the whole
+        # signal, so a detailed analysis is never streamed.
+        self.DETAIL_SECTIONS = {
+            'voice_quality': (),                        # HPSS harmonic/spectral voice features
+            'clinical_indicators': ('voice_quality',),  # neurological indicators, disorder risk scores
+            'time_series': (),                          # pitch/confidence/stress/hesitation curves
+            'report': ('clinical_indicators',)          # schema-shaped summary with overall score
+        }
+        
+        # Time series curves are reduced to a point budget (per curve) with
+        # peak-preserving min/max buckets; clients may pick one in this range
+        self.TIME_SERIES = {
+            'POINTS': 500,
+            'MIN_POINTS': 20,
+            'MAX_POINTS': 5000
+        }
 
-    def analyze_speech_pattern(self, audio_data):
-        """Main analysis function for speech patterns."""
+    def analyze_speech_pattern(self, audio_data, profile: str = None, streaming: Optional[bool] = None,
+                               detail=None, time_series_points: Optional[int] = None):
+        """
+        Main analysis function for speech patterns.
+        
+        Args:
+            audio_data: Path, bytes or seekable file-like object with the recording
+            profile: Key of self.PROFILES (defaults to 'standard')
+            streaming: Analyse block by block with bounded memory. None streams
+                recordings of at least STREAMING['MIN_DURATION'] seconds when the
+                profile supports it; True requires a streaming profile. Only
+                WAV/FLAC/OGG can be streamed, other containers are decoded whole
+            detail: Keys of self.DETAIL_SECTIONS (or 'all'), as a list or a
+                comma-separated string, to report on top of the profile's own sections
+            time_series_points: Points per time series curve, within
+                TIME_SERIES['MIN_POINTS'] and TIME_SERIES['MAX_POINTS'] (defaults to
+                TIME_SERIES['POINTS']); only used when the time series are reported
+            
+        Returns:
+            Dictionary with success flag, profile name, report sections,
+            container format, whether the recording was streamed, the voiced
+            segment summary (None without voice activity detection), metrics,
+            and timings (wall time in ms per analysis stage plus 'total')
+        """
+        profile = profile or self.DEFAULT_PROFILE
+        if profile not in self.PROFILES:
+            return {
+                "success": False,
+                "error": f"Unknown profile '{profile}', expected one of {sorted(self.PROFILES)}"
+            }
+        settings = self.PROFILES[profile]
         try:
-            # Try loading with soundfile first
-            try:
-                y, sr = sf.read(audio_data)
-                # Convert to mono if stereo
-                if len(y.shape) > 1:
-                    y = np.mean(y, axis=1)
-            except Exception as e:
-                logger.warning(f"SoundFile failed, falling back to librosa: {str(e)}")
-                y, sr = librosa.load(audio_data, sr=44100, mono=True)
+            sections = self._detail_sections(settings, detail)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        if time_series_points is not None and not (
+                self.TIME_SERIES['MIN_POINTS'] <= time_series_points <= self.TIME_SERIES['MAX_POINTS']):
+            return {
+                "success": False,
+                "error": f"time_series_points must be between {self.TIME_SERIES['MIN_POINTS']} "
+                         f"and {self.TIME_SERIES['MAX_POINTS']}"
+            }
+        if streaming and not settings['streaming']:
+            return {
+                "success": False,
+                "error": f"Profile '{profile}' needs the whole recording and cannot be streamed"
+            }
+        if streaming and sections:
+            return {
+                "success": False,
+                "error": f"Detail sections {sorted(sections)} need the whole recording and cannot be streamed"
+            }
+        
+        try:
+            # The container (sniffed from the first bytes) picks the decoder
+            source, container = audio_source(audio_data)
+            streamable = container in SOUNDFILE_CONTAINERS
+            if streaming is None:
+                streaming = (settings['streaming'] and not sections and streamable and
+                             self._recording_duration(source) >= self.STREAMING['MIN_DURATION'])
+            elif streaming and not streamable:
+                logger.info(f"{container} recordings cannot be streamed, decoding in memory")
+                streaming = False
+            start = time.perf_counter()
+            if streaming:
+                features, segments, sr = self._analyze_stream(source, container, settings)
+                return {
+                    "success": True,
+                    "profile": profile,
+                    "detail": [],
+                    "format": container,
+                    "streamed": True,
+                    "voice_activity": segments.summary(sr) if segments is not None else None,
+                    "metrics": self._core_metrics(*features),
+                    "timings": {'total': 1000 * (time.perf_counter() - start)}
+                }
             
-            # Extract basic features
-            pitch_features = self._analyze_pitch(y, sr)
-            volume_features = self._analyze_volume(y)
-            rhythm_features = self._analyze_rhythm(y, sr)
-            fluency_features = self._analyze_fluency(y, sr)
-            articulation_features = self._analyze_articulation(y, sr)
+            # Mono float64 at the recording's own rate
+            y, sr = decode_audio(source, container)
+            if len(y) == 0:
+                raise ValueError("Recording contains no samples")
+            
+            source_sr = sr
+            y, sr = self._resample(y, sr)
+            
+            # One STFT per framing, shared by every feature below
+            features = self._feature_store(y, sr, source_sr)
+            
+            # Spectral features only need the voiced segments, whose STFT frames
+            # are taken from the whole recording's (only frames at joins are redone)
+            segments, voiced, vad_ms = None, features, None
+            if settings['voice_activity']:
+                vad_start = time.perf_counter()
+                segments = self._voice_activity(features.rms(), features.zero_crossing_rate(), sr, len(y))
+                if segments.trims:
+                    voiced = VoicedFeatureStore(features, segments)
+                vad_ms = 1000 * (time.perf_counter() - vad_start)
+            
+            # Extract features; independent stages overlap on the thread pool
+            stages, timings = run_stages(
+                self._analysis_stages(y, sr, features, settings, sections, voiced=voiced,
+                                      time_series_points=time_series_points),
+                pool=get_thread_pool() if self.PARALLEL_STAGES else None
+            )
+            if vad_ms is not None:
+                timings = {'voice_activity': vad_ms, **timings}
+            pitch_features = stages['pitch']
+            volume_features = stages['volume']
+            rhythm_features = stages['rhythm']
+            fluency_features = stages['fluency']
+            articulation_features = stages['articulation']
             
             # Calculate metrics
-            metrics = {
-                'clarity': self._calculate_clarity(y, sr),
-                'speech_rate': rhythm_features['words_per_minute'],  # Changed from syllables_per_second * 60
-                'volume_control': volume_features['variation'],
-                'pitch_stability': pitch_features['stability'],
-                'articulation': {  # Add this section
-                    'precision': articulation_features['precision'],
-                    'vowel_formation': articulation_features['vowel_formation'],
-                    'consonant_precision': articulation_features['consonant_precision'],
-                    'slurred_speech': articulation_features['slurred_speech']
-                },
-                'emotion': {
-                    'confidence': self._calculate_confidence_score(volume_features, pitch_features),
-                    'hesitation': self._calculate_hesitation_score(fluency_features),
-                    'stress': self._calculate_stress_score(pitch_features, volume_features)
-                }
-            }
+            metrics = self._core_metrics(
+                stages['clarity'],
+                pitch_features, volume_features, rhythm_features, fluency_features, articulation_features
+            )
             
+            if 'voice_quality' in sections:
+                voice_features = stages['voice_quality']
+                metrics['voice_quality'] = voice_features
+            
+            if 'clinical_indicators' in sections:
+                neuro_indicators = self._analyze_neurological_indicators(
+                    pitch_features, volume_features, rhythm_features,
+                    fluency_features, articulation_features, voice_features
+                )
+                metrics['neurologicalIndicators'] = neuro_indicators
+                metrics['disorderRiskScores'] = self._calculate_disorder_risk_scores(
+                    pitch_features, volume_features, rhythm_features,
+                    fluency_features, articulation_features, voice_features, neuro_indicators
+                )
+            
+            if 'time_series' in sections:
+                metrics['timeSeries'] = self._format_time_series(stages['time_series'])
+            
+            if 'report' in sections:
+                metrics['report'] = self._calculate_metrics(
+                    pitch_features, volume_features, rhythm_features, fluency_features,
+                    articulation_features, voice_features, metrics['neurologicalIndicators'],
+                    metrics['disorderRiskScores'], len(y) / sr, metrics.get('timeSeries')
+                )
+            
+            timings['total'] = 1000 * (time.perf_counter() - start)
             return {
                 "success": True,
-                "metrics": metrics
+                "profile": profile,
+                "detail": sorted(sections),
+                "format": container,
+                "streamed": False,
+                "voice_activity": segments.summary(sr) if segments is not None else None,
+                "metrics": metrics,
+                "timings": timings
             }
             
         except Exception as e:
@@ -100,40 +328,364 @@ class SpeechPatternAnalyzer:
                 "error": str(e)
             }
 
-    def _analyze_pitch(self, y, sr):
-        """Analyze pitch variations and patterns."""
+    def _detail_sections(self, settings, detail):
+        """
+        Report sections to compute: the profile's own plus the requested ones,
+        closed over the sections they are derived from.
+        
+        Args:
+            settings: Entry of self.PROFILES
+            detail: DETAIL_SECTIONS keys or 'all', as an iterable or a
+                comma-separated string (None for none)
+            
+        Returns:
+            Set of section names; raises ValueError for unknown sections
+        """
+        if isinstance(detail, str):
+            detail = [name.strip() for name in detail.split(',') if name.strip()]
+        requested = {name for name in self.DETAIL_SECTIONS if settings[name]}
+        for name in detail or ():
+            if name == 'all':
+                requested.update(self.DETAIL_SECTIONS)
+            elif name in self.DETAIL_SECTIONS:
+                requested.add(name)
+            else:
+                raise ValueError(f"Unknown detail section '{name}', expected one of "
+                                 f"{sorted(self.DETAIL_SECTIONS) + ['all']}")
+        
+        sections = set()
+        while requested:
+            name = requested.pop()
+            if name not in sections:
+                sections.add(name)
+                requested.update(self.DETAIL_SECTIONS[name])
+        return sections
+
+    def _analysis_stages(self, y, sr, features, settings, sections=(), voiced=None, time_series_points=None):
+        """
+        Feature extraction stages of an in-memory analysis as a dependency graph.
+        
+        The shared spectral features (STFT magnitude, RMS, log-mel/MFCC) are
+        stages of their own, so the analyses that reuse them start once they
+        are cached in the feature store instead of racing to compute them.
+        Detail sections only add stages when they are requested, and reuse
+        the same cached features as the base metrics.
+        
+        Args:
+            features: Feature store of the whole recording (envelope and
+                fluency features)
+            voiced: Feature store of the voiced segments (spectral features;
+                defaults to features)
+            time_series_points: Point budget of the time series curves
+        
+        Returns:
+            Dictionary of stage name -> Stage for run_stages
+        """
+        if voiced is None:
+            voiced = features
+        y_voiced = voiced.y
+        stages = {
+            'stft': Stage(voiced.magnitude, ()),
+            'rms': Stage(features.rms, ()),
+            'mfcc': Stage(lambda: voiced.mfcc(n_mfcc=13), ('stft',)),
+            'pitch': Stage(lambda: self._analyze_pitch(y_voiced, sr, voiced, frame_step=settings['pitch_frame_step']),
+                           ('stft',)),
+            'volume': Stage(lambda: self._analyze_volume(y, features), ('rms',)),
+            'rhythm': Stage(lambda: self._analyze_rhythm(y, sr, features), ('rms',)),
+            'fluency': Stage(lambda: self._analyze_fluency(y, sr, features, palilalia=settings['palilalia']),
+                             ('stft', 'rms')),
+            'articulation': Stage(lambda: self._analyze_articulation(y_voiced, sr, voiced), ('mfcc',)),
+            'clarity': Stage(lambda: self._calculate_clarity(y_voiced, sr, voiced,
+                                                             frame_step=settings['clarity_frame_step']),
+                             ('mfcc', 'rms'))
+        }
+        if 'voice_quality' in sections:
+            stages['voice_quality'] = Stage(lambda: self._analyze_voice_quality_librosa(y_voiced, sr, voiced),
+                                            ('stft',))
+        if 'time_series' in sections:
+            stages['time_series'] = Stage(lambda: self._extract_time_series_data(y, sr, features, time_series_points),
+                                          ('stft', 'rms'))
+        return stages
+
+    def _core_metrics(self, clarity, pitch_features, volume_features, rhythm_features,
+                      fluency_features, articulation_features):
+        """Metrics every profile reports."""
+        return {
+            'clarity': clarity,
+            'speech_rate': rhythm_features['words_per_minute'],  # Changed from syllables_per_second * 60
+            'volume_control': volume_features['variation'],
+            'pitch_stability': pitch_features['stability'],
+            'articulation': {  # Add this section
+                'precision': articulation_features['precision'],
+                'vowel_formation': articulation_features['vowel_formation'],
+                'consonant_precision': articulation_features['consonant_precision'],
+                'slurred_speech': articulation_features['slurred_speech']
+            },
+            'emotion': {
+                'confidence': self._calculate_confidence_score(volume_features, pitch_features),
+                'hesitation': self._calculate_hesitation_score(fluency_features),
+                'stress': self._calculate_stress_score(pitch_features, volume_features)
+            }
+        }
+
+    def _voice_activity(self, rms, zcr, sr, n_samples):
+        """Voiced segments of a recording from its frame RMS and ZCR at the analysis framing."""
+        params = self._audio_params(sr)
+        return detect_voice_activity(
+            rms, zcr, sr, params['HOP_LENGTH'], n_samples,
+            floor_percentile=self.VOICE_ACTIVITY['FLOOR_PERCENTILE'],
+            energy_margin_db=self.VOICE_ACTIVITY['ENERGY_MARGIN_DB'],
+            peak_range_db=self.VOICE_ACTIVITY['PEAK_RANGE_DB'],
+            zcr_margin_db=self.VOICE_ACTIVITY['ZCR_MARGIN_DB'],
+            zcr_threshold=self.VOICE_ACTIVITY['ZCR_THRESHOLD'],
+            min_silence=self.VOICE_ACTIVITY['MIN_SILENCE'],
+            padding=self.VOICE_ACTIVITY['PADDING'],
+            # Voiced frames keep their whole STFT window
+            min_padding_frames=-(-(params['N_FFT'] // 2) // params['HOP_LENGTH'])
+        )
+
+    def _recording_duration(self, source):
+        """Duration from the header of a soundfile-readable path or buffer (left at its position)."""
+        return self._recording_info(source).duration
+
+    def _recording_info(self, source):
+        """soundfile header info of a path or buffer (left at its position)."""
+        if isinstance(source, (str, os.PathLike)):
+            return sf.info(source)
+        position = source.tell()
         try:
-            # Use consistent parameters
-            pitches, magnitudes = librosa.piptrack(
-                y=y, 
-                sr=sr,
-                hop_length=self.AUDIO['HOP_LENGTH'],
-                n_fft=self.AUDIO['N_FFT']
-            )
-            pitch_values = []
-            
-            # Get the most prominent pitch for each frame
-            for t in range(pitches.shape[1]):
-                index = magnitudes[:,t].argmax()
-                pitch_values.append(pitches[index,t])
-            
-            pitch_values = np.array(pitch_values)
+            return sf.info(source)
+        finally:
+            source.seek(position)
+
+    def _analyze_stream(self, source, container, settings):
+        """
+        Core features of a recording decoded BLOCK_DURATION seconds at a time.
+        
+        Blocks are mixed to mono, resampled with soxr's streaming resampler (the
+        same samples as the one-shot resampler) and framed with the overlap the
+        STFT needs, so per-frame features equal those of the in-memory analysis
+        and memory is bounded by the block size. The palilalia score, which
+        autocorrelates the whole envelope, is not computed (it is not part of
+        the core metrics).
+        
+        The recording is decoded twice. The first pass collects the frame RMS
+        and ZCR (the voice activity detector's input and the envelope
+        features) and the loudest log-mel value, which the second pass clips
+        log-mel against as librosa does on the whole recording. The second
+        pass folds the frames into the spectral statistics and finds the
+        onsets; with voice activity detection only the voiced samples reach
+        the statistics. The envelope holds two values per frame.
+        
+        Returns:
+            Tuple of ((clarity, pitch, volume, rhythm, fluency, articulation)
+            features, VoicedSegments or None, analysis rate)
+        """
+        source_sr = self._recording_info(source).samplerate
+        sr = self.ANALYSIS_RATE or source_sr
+        hop_length = self._audio_params(sr)['HOP_LENGTH']
+        
+        rms, zcr, mel_peak, n_samples = self._stream_envelope(source, container, sr)
+        if n_samples == 0:
+            raise ValueError("Recording contains no samples")
+        segments = self._voice_activity(rms, zcr, sr, n_samples) if settings['voice_activity'] else None
+        trimming = segments is not None and segments.trims
+        
+        if trimming:
+            stats, onsets = self._stream_statistics(source, container, sr, source_sr, settings, segments,
+                                                    mel_peak=mel_peak)
+            if not stats.mel_clip.exact:
+                # The loudest log-mel frame is not voiced: clip against the voiced frames' own peak
+                stats, _ = self._stream_statistics(source, container, sr, source_sr, settings, segments,
+                                                   mel_peak=stats.mel_clip.peak, onsets=False)
+            # Volume, rhythm and fluency from the whole recording, as without trimming
+            onset_frames = onsets.frames()
+            volume_features = self._envelope_volume(rms)
+            energy_peaks = self._energy_peaks(rms)
+        else:
+            loudness_peak = float(librosa.amplitude_to_db(rms, top_db=None).max()) if len(rms) else None
+            stats, _ = self._stream_statistics(source, container, sr, source_sr, settings,
+                                               mel_peak=mel_peak, loudness_peak=loudness_peak)
+            onset_frames = stats.onset_frames()
+            volume_features = self._volume_features(stats.loudness.mean, stats.loudness.std, *stats.loudness_range)
+            energy_peaks = stats.energy_peaks()
+        
+        duration = n_samples / sr
+        features = (
+            self._clarity_score(stats.mfcc.std, stats.contrast.mean, stats.zcr.mean, stats.rolloff.mean,
+                                stats.rms.std, stats.rms.mean, source_sr),
+            self._pitch_features(stats.pitch.count, stats.pitch.mean, stats.pitch.std),
+            volume_features,
+            self._rhythm_features(energy_peaks, duration, hop_length, sr),
+            self._fluency_features(onset_frames, duration, sr, hop_length),
+            self._articulation_features(stats.mfcc.std, stats.mfcc_magnitude.mean, stats.mfcc_step.mean,
+                                        stats.centroid.mean, source_sr)
+        )
+        return features, segments, sr
+
+    def _stream_statistics(self, source, container, sr, source_sr, settings, segments=None,
+                           mel_peak=None, loudness_peak=None, onsets=True):
+        """
+        Second streaming pass: frame statistics of the recording or of its voiced segments.
+        
+        Args:
+            segments: VoicedSegments the statistics are restricted to (None for
+                the whole recording)
+            mel_peak: Loudest log-mel value of the recording (first pass)
+            loudness_peak: Loudest frame loudness (dB) of the recording
+            onsets: With segments, also find the onsets of the whole recording
+            
+        Returns:
+            Tuple of (SpeechStreamStatistics, StreamingOnsets of the whole
+            recording or None)
+        """
+        params = self._audio_params(sr)
+        framer = BlockFramer(params['N_FFT'], params['HOP_LENGTH'])
+        stats = SpeechStreamStatistics(
+            framer, sr, source_sr,
+            pitch_frame_step=settings['pitch_frame_step'],
+            clarity_frame_step=settings['clarity_frame_step'],
+            mel_peak=mel_peak, loudness_peak=loudness_peak,
+            pitch_engine=self.PITCH_ENGINE
+        )
+        whole_framer = whole_onsets = None
+        if segments is not None and onsets:
+            whole_framer = BlockFramer(params['N_FFT'], params['HOP_LENGTH'])
+            whole_onsets = StreamingOnsets(params['HOP_LENGTH'], mel_peak=mel_peak)
+        
+        offset = 0
+        for y, last in self._stream_blocks(source, container, sr):
+            chunk = framer.push(segments.select(y, offset) if segments is not None else y, last=last)
+            if chunk is not None:
+                stats.update(chunk)
+            if whole_framer is not None:
+                chunk = whole_framer.push(y, last=last)
+                if chunk is not None:
+                    whole_onsets.update(SpeechFeatureStore(
+                        chunk.samples, sr, n_fft=params['N_FFT'], hop_length=params['HOP_LENGTH'],
+                        center=False, first_frame=chunk.first_frame
+                    ).mel_power())
+            offset += len(y)
+        return stats, whole_onsets
+
+    def _stream_blocks(self, source, container, sr):
+        """
+        Mono blocks of a soundfile-readable recording at the analysis rate.
+        
+        Yields (samples, last) pairs; the last block flushes the resampler and
+        pads to the ceil(n * ratio) samples of the one-shot resampler. A buffer
+        source is left at its starting position, so it can be read again.
+        """
+        position = None if isinstance(source, (str, os.PathLike)) else source.tell()
+        decoded = produced = 0
+        decode_seconds = 0.0
+        try:
+            with sf.SoundFile(source) as audio:
+                source_sr = audio.samplerate
+                resampler = None
+                if sr != source_sr:
+                    resampler = soxr.ResampleStream(source_sr, sr, 1, dtype='float64', quality=self.RESAMPLER)
+                
+                blocksize = int(self.STREAMING['BLOCK_DURATION'] * source_sr)
+                blocks = audio.blocks(blocksize=blocksize, dtype='float64', always_2d=True)
+                while True:
+                    start = time.perf_counter()
+                    block = next(blocks, None)
+                    decode_seconds += time.perf_counter() - start
+                    if block is None:
+                        break
+                    y = np.mean(block, axis=1)
+                    decoded += len(y)
+                    if resampler is not None:
+                        y = resampler.resample_chunk(y)
+                    produced += len(y)
+                    yield y, False
+        finally:
+            if position is not None:
+                source.seek(position)
+        
+        decode_stats.record(container, 'soundfile', decode_seconds, decoded / source_sr)
+        tail = np.zeros(0)
+        if resampler is not None and decoded:
+            tail = resampler.resample_chunk(np.zeros(0), last=True)
+            # librosa.resample zero-pads its output to ceil(n * ratio) samples
+            missing = int(np.ceil(decoded * (float(sr) / source_sr))) - produced - len(tail)
+            tail = np.concatenate([tail, np.zeros(max(0, missing))])
+        yield tail, True
+
+    def _stream_envelope(self, source, container, sr):
+        """
+        Frame RMS, ZCR and the loudest log-mel value of a whole recording, decoded block by block.
+        
+        Returns:
+            Tuple of (rms, zcr, loudest log-mel value in dB, number of samples
+            at the analysis rate), the first two equal to the in-memory
+            feature store's
+        """
+        params = self._audio_params(sr)
+        framer = BlockFramer(params['N_FFT'], params['HOP_LENGTH'])
+        rms, zcr = [], []
+        mel_peak = None
+        n_samples = 0
+        for y, last in self._stream_blocks(source, container, sr):
+            n_samples += len(y)
+            chunk = framer.push(y, last=last)
+            if chunk is None:
+                continue
+            features = SpeechFeatureStore(chunk.samples, sr, n_fft=params['N_FFT'], hop_length=params['HOP_LENGTH'],
+                                          center=False, first_frame=chunk.first_frame)
+            rms.append(features.rms())
+            peak = float(librosa.power_to_db(features.mel_power(), top_db=None).max())
+            mel_peak = peak if mel_peak is None else max(mel_peak, peak)
+            zcr.append(dsp.zero_crossing_rate(
+                framer.edge_padded(chunk), frame_length=params['N_FFT'], hop_length=params['HOP_LENGTH'],
+                center=False
+            ))
+        if not rms:
+            return np.zeros(0), np.zeros(0), mel_peak, n_samples
+        return np.concatenate(rms), np.concatenate(zcr), mel_peak, n_samples
+
+    def _resample(self, y, sr):
+        """Resample to the analysis rate (a no-op when it is unset or already matched)."""
+        if not self.ANALYSIS_RATE or sr == self.ANALYSIS_RATE:
+            return y, sr
+        y = librosa.resample(y, orig_sr=sr, target_sr=self.ANALYSIS_RATE, res_type=self.RESAMPLER)
+        return y, self.ANALYSIS_RATE
+
+    def _audio_params(self, sr):
+        """
+        STFT framing for a sample rate.
+        
+        With an analysis rate, the hop and FFT size keep the durations the AUDIO
+        constants have at SAMPLE_RATE (11.6 ms hop, 46 ms window), so frame-based
+        statistics and peak-picking windows mean the same thing at any rate.
+        """
+        if not self.ANALYSIS_RATE:
+            return {'N_FFT': self.AUDIO['N_FFT'], 'HOP_LENGTH': self.AUDIO['HOP_LENGTH']}
+        scale = sr / self.AUDIO['SAMPLE_RATE']
+        return {
+            'N_FFT': dsp.fast_length(int(round(self.AUDIO['N_FFT'] * scale))),
+            'HOP_LENGTH': max(1, int(round(self.AUDIO['HOP_LENGTH'] * scale)))
+        }
+
+    def _feature_store(self, y, sr, source_sr=None):
+        """Per-request feature store using the STFT framing for this rate."""
+        params = self._audio_params(sr)
+        return SpeechFeatureStore(y, sr, n_fft=params['N_FFT'], hop_length=params['HOP_LENGTH'],
+                                  source_sr=source_sr, pitch_engine=self.PITCH_ENGINE)
+
+    def _analyze_pitch(self, y, sr, features=None, frame_step=1):
+        """Analyze pitch variations and patterns (on every frame_step-th frame)."""
+        try:
+            if features is None:
+                features = self._feature_store(y, sr)
+            # Most prominent pitch of each frame
+            pitch_values = features.pitch_track(frame_step=frame_step)
             pitch_values = pitch_values[pitch_values > 0]
             
             if len(pitch_values) == 0:
-                return {
-                    'mean': 0,
-                    'std': 0,
-                    'stability': 0,
-                    'variability': 0
-                }
-            
-            return {
-                'mean': float(np.mean(pitch_values)),
-                'std': float(np.std(pitch_values)),
-                'stability': float(1 - (np.std(pitch_values) / np.mean(pitch_values)) if np.mean(pitch_values) > 0 else 0),
-                'variability': float(np.std(pitch_values) / np.mean(pitch_values) if np.mean(pitch_values) > 0 else 0)
-            }
+                return self._pitch_features(0, 0, 0)
+            return self._pitch_features(len(pitch_values), np.mean(pitch_values), np.std(pitch_values))
         except Exception as e:
             logger.error(f"Error analyzing pitch: {str(e)}")
             return {
@@ -143,29 +695,29 @@ class SpeechPatternAnalyzer:
                 'variability': 0
             }
 
-    def _analyze_volume(self, y):
-        """Analyze volume patterns."""
-        try:
-            rms = librosa.feature.rms(y=y)[0]
-            db = librosa.amplitude_to_db(rms)
-            
-            # Calculate basic volume metrics
-            mean_db = np.mean(db)
-            std_db = np.std(db)
-            
-            # Calculate volume variation
-            db_range = np.max(db) - np.min(db)
-            variation = std_db / db_range if db_range > 0 else 0
-            
+    def _pitch_features(self, count, mean, std):
+        """Pitch summary from the count, mean and std of voiced frame pitches."""
+        if count == 0:
             return {
-                'mean': float(mean_db),
-                'std': float(std_db),
-                'variation': float(variation),
-                'range': {
-                    'min': float(np.min(db)),
-                    'max': float(np.max(db))
-                }
+                'mean': 0,
+                'std': 0,
+                'stability': 0,
+                'variability': 0
             }
+        
+        return {
+            'mean': float(mean),
+            'std': float(std),
+            'stability': float(1 - (std / mean) if mean > 0 else 0),
+            'variability': float(std / mean if mean > 0 else 0)
+        }
+
+    def _analyze_volume(self, y, features=None):
+        """Analyze volume patterns."""
+        try:
+            if features is None:
+                features = self._feature_store(y, self.AUDIO['SAMPLE_RATE'])
+            return self._envelope_volume(features.rms())
         except Exception as e:
             logger.error(f"Error analyzing volume: {str(e)}")
             return {
@@ -175,49 +727,42 @@ class SpeechPatternAnalyzer:
                 'range': {'min': 0, 'max': 0}
             }
 
-    def _analyze_rhythm(self, y, sr):
+    def _envelope_volume(self, rms):
+        """Volume summary of a whole RMS envelope."""
+        db = librosa.amplitude_to_db(rms)
+        return self._volume_features(np.mean(db), np.std(db), np.min(db), np.max(db))
+
+    def _volume_features(self, mean_db, std_db, min_db, max_db):
+        """Volume summary from frame loudness statistics (dB)."""
+        # Calculate volume variation
+        db_range = max_db - min_db
+        variation = std_db / db_range if db_range > 0 else 0
+        
+        return {
+            'mean': float(mean_db),
+            'std': float(std_db),
+            'variation': float(variation),
+            'range': {
+                'min': float(min_db),
+                'max': float(max_db)
+            }
+        }
+
+    def _analyze_rhythm(self, y, sr, features=None):
         """Analyze speech rhythm and timing patterns."""
         try:
+            if features is None:
+                features = self._feature_store(y, sr)
             # Use energy-based syllable detection
             # Get the amplitude envelope
-            hop_length = 512
-            frame_length = 2048
+            hop_length = features.hop_length
+            frame_length = features.n_fft
             
             # Calculate RMS energy for each frame
-            rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+            rms = features.rms(frame_length=frame_length, hop_length=hop_length)
             
             # Find peaks in the energy envelope to detect syllables
-            # Use a simpler peak detection method
-            peaks = []
-            threshold = 0.5 * np.mean(rms)  # Adaptive threshold
-            for i in range(1, len(rms)-1):
-                if rms[i] > threshold and rms[i] > rms[i-1] and rms[i] > rms[i+1]:
-                    peaks.append(i)
-            
-            # Calculate syllables per second
-            duration = len(y) / sr
-            syllable_count = len(peaks)
-            syllables_per_second = syllable_count / duration if duration > 0 else 0
-            
-            # Estimate words per minute (assuming average of 1.5 syllables per word)
-            words_per_minute = (syllable_count / 1.5) * (60 / duration) if duration > 0 else 0
-            
-            # Calculate rhythm regularity
-            if len(peaks) > 1:
-                peak_intervals = np.diff([p * hop_length / sr for p in peaks])
-                rhythm_regularity = 1 - (np.std(peak_intervals) / np.mean(peak_intervals)) if np.mean(peak_intervals) > 0 else 0
-            else:
-                rhythm_regularity = 0
-                
-            return {
-                'tempo': float(syllables_per_second * 60),  # Convert to per minute
-                'beat_consistency': float(1 - rhythm_regularity),
-                'rhythm_regularity': float(rhythm_regularity),
-                'syllables_per_second': float(syllables_per_second),
-                'syllable_count': int(syllable_count),
-                'words_per_minute': float(words_per_minute),
-                'rhythm_variability': float(1 - rhythm_regularity)
-            }
+            return self._rhythm_features(self._energy_peaks(rms), len(y) / sr, hop_length, sr)
             
         except Exception as e:
             logger.error(f"Error analyzing rhythm: {str(e)}")
@@ -231,134 +776,144 @@ class SpeechPatternAnalyzer:
                 'rhythm_variability': 0
             }
 
-    def _analyze_fluency(self, y, sr):
-        """Analyze speech fluency patterns with neuromotor focus."""
+    def _energy_peaks(self, rms):
+        """Syllable candidates: RMS envelope peaks above half the mean RMS (adaptive threshold)."""
+        return dsp.local_maxima(rms, 0.5 * np.mean(rms))
+
+    def _rhythm_features(self, peaks, duration, hop_length, sr):
+        """Rhythm summary from the frames of syllable energy peaks."""
+        # Calculate syllables per second
+        syllable_count = len(peaks)
+        syllables_per_second = syllable_count / duration if duration > 0 else 0
+        
+        # Estimate words per minute (assuming average of 1.5 syllables per word)
+        words_per_minute = (syllable_count / 1.5) * (60 / duration) if duration > 0 else 0
+        
+        # Calculate rhythm regularity
+        if len(peaks) > 1:
+            peak_intervals = np.diff(np.asarray(peaks) * hop_length / sr)
+            rhythm_regularity = 1 - (np.std(peak_intervals) / np.mean(peak_intervals)) if np.mean(peak_intervals) > 0 else 0
+        else:
+            rhythm_regularity = 0
+            
+        return {
+            'tempo': float(syllables_per_second * 60),  # Convert to per minute
+            'beat_consistency': float(1 - rhythm_regularity),
+            'rhythm_regularity': float(rhythm_regularity),
+            'syllables_per_second': float(syllables_per_second),
+            'syllable_count': int(syllable_count),
+            'words_per_minute': float(words_per_minute),
+            'rhythm_variability': float(1 - rhythm_regularity)
+        }
+
+    def _analyze_fluency(self, y, sr, features=None, palilalia=True):
+        """
+        Analyze speech fluency patterns with neuromotor focus (palilalia=False skips the repetition score).
+        
+        Onsets are always found on the whole recording, never on the voiced
+        segments: splicing the segments together creates flux at the joins and
+        shortens the pauses, so fluency would depend on voice activity detection.
+        """
         try:
+            if features is None:
+                features = self._feature_store(y, sr)
             # Get onsets for pause detection
-            oenv = librosa.onset.onset_strength(y=y, sr=sr)
+            oenv = features.onset_envelope()
             onset_frames = librosa.onset.onset_detect(onset_envelope=oenv, backtrack=False)
-            onset_times = librosa.frames_to_time(onset_frames, sr=sr)
+
+            # Repetition is only scored when there are pauses to score
+            palilalia_score = 0
+            if palilalia and len(onset_frames) > 1 and len(y) > sr:  # At least 1 sec
+                palilalia_score = self._palilalia_score(features)
             
-            # Calculate pauses between onsets
-            if len(onset_times) > 1:
-                pause_durations = np.diff(onset_times)
-                
-                # Identify long pauses (potential hesitations)
-                long_pauses = pause_durations[pause_durations > self.FLUENCY['MIN_PAUSE']]
-                
-                # Calculate words per minute (approximation)
-                duration_minutes = len(y) / sr / 60
-                word_count = max(len(onset_frames) // 2, 1)  # Rough approximation: 2 syllables per word
-                words_per_minute = word_count / duration_minutes if duration_minutes > 0 else 0
-                
-                # Calculate variability in pause duration (for neuromotor assessment)
-                pause_variability = np.std(pause_durations) / np.mean(pause_durations) if np.mean(pause_durations) > 0 else 0
-                
-                # Detect palilalia (repetitive speech) - approximation using repeated acoustic patterns
-                palilalia_score = 0
-                try:
-                    # Simple autocorrelation to detect repetitions
-                    if len(y) > sr:  # At least 1 sec
-                        # Downsample for efficiency
-                        hop_length = 512
-                        y_env = librosa.feature.rms(y=y, hop_length=hop_length)[0]
-                        # Get autocorrelation
-                        corr = np.correlate(y_env, y_env, mode='full')
-                        corr = corr[len(corr)//2:]  # Take only positive lags
-                        # Normalize
-                        if corr[0] > 0:
-                            corr = corr / corr[0]
-                        # Look for peaks that indicate repetitions (exclude zero lag)
-                        peaks = librosa.util.peak_pick(
-                            corr[1:],
-                            pre_max=1,
-                            post_max=1,
-                            pre_avg=1,
-                            post_avg=1,
-                            delta=0.5,
-                            wait=0.2
-                        )
-                        if len(peaks) > 0:
-                            # Use strongest peak value as a palilalia score
-                            palilalia_score = max(0, np.max(corr[peaks+1]) - 0.5) * 2  # Scale to [0,1]
-                except Exception as ex:
-                    logger.warning(f"Could not calculate palilalia score: {str(ex)}")
-                
-                return {
-                    'average_pause_duration': float(np.mean(pause_durations)),
-                    'pause_rate': float(len(pause_durations) / (len(y) / sr)),
-                    'long_pause_count': int(len(long_pauses)),
-                    'words_per_minute': float(words_per_minute),
-                    'word_count': int(word_count),
-                    'fluency_score': float(np.clip(1 - (np.mean(pause_durations) / self.FLUENCY['MAX_PAUSE']), 0, 1)),
-                    'pause_variability': float(pause_variability),
-                    'palilalia_score': float(palilalia_score)
-                }
-            else:
-                return {
-                    'average_pause_duration': 0.0,
-                    'pause_rate': 0.0,
-                    'long_pause_count': 0,
-                    'words_per_minute': 0.0,
-                    'word_count': 0,
-                    'fluency_score': 0.0,
-                    'pause_variability': 0.0,
-                    'palilalia_score': 0.0
-                }
+            return self._fluency_features(onset_frames, len(y) / sr, sr, features.hop_length, palilalia_score)
         except Exception as e:
             logger.error(f"Error analyzing fluency: {str(e)}")
-            return {
-                'average_pause_duration': 0.0,
-                'pause_rate': 0.0,
-                'long_pause_count': 0,
-                'words_per_minute': 0.0,
-                'word_count': 0,
-                'fluency_score': 0.0,
-                'pause_variability': 0.0,
-                'palilalia_score': 0.0
-            }
+            return self._fluency_features([], 0, sr, self.AUDIO['HOP_LENGTH'])
 
-    def _analyze_articulation(self, y, sr):
-        """Analyze speech articulation using librosa."""
+    def _palilalia_score(self, features):
+        """Palilalia (repetitive speech) approximation from repeated patterns in the RMS envelope."""
         try:
-            # Extract MFCC features for articulation analysis
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+            # Simple autocorrelation to detect repetitions
+            # Downsample for efficiency
+            y_env = features.rms()
+            # Get autocorrelation (positive lags, through the FFT)
+            corr = dsp.autocorrelation(y_env)
+            # Normalize
+            if corr[0] > 0:
+                corr = corr / corr[0]
+            # Look for peaks that indicate repetitions (exclude zero lag)
+            peaks = librosa.util.peak_pick(
+                corr[1:],
+                pre_max=1,
+                post_max=1,
+                pre_avg=1,
+                post_avg=1,
+                delta=0.5,
+                wait=0.2
+            )
+            if len(peaks) > 0:
+                # Use strongest peak value as a palilalia score
+                return max(0, np.max(corr[peaks+1]) - 0.5) * 2  # Scale to [0,1]
+        except Exception as ex:
+            logger.warning(f"Could not calculate palilalia score: {str(ex)}")
+        return 0
+
+    def _fluency_features(self, onset_frames, duration, sr, hop_length, palilalia_score=0):
+        """Fluency summary from onset frames (pauses are the gaps between onsets)."""
+        if len(onset_frames) > 1 and duration > 0:
+            onset_times = librosa.frames_to_time(onset_frames, sr=sr, hop_length=hop_length)
             
-            # Calculate articulation metrics
-            clarity = np.mean(np.std(mfccs, axis=1))
-            precision = np.mean(np.abs(np.diff(mfccs, axis=1)))
+            # Calculate pauses between onsets
+            pause_durations = np.diff(onset_times)
             
-            # Calculate consonant precision (higher frequency components)
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            consonant_precision = np.mean(spectral_centroid) / (sr/4)
+            # Identify long pauses (potential hesitations)
+            long_pauses = pause_durations[pause_durations > self.FLUENCY['MIN_PAUSE']]
             
-            # Calculate vowel formation using formant-like features
-            vowel_formation = 0.0
-            try:
-                # Use first few MFCCs as formant approximation
-                formant_mfccs = mfccs[:3, :]  # First 3 MFCCs
-                
-                # Calculate stability of these pseudo-formants
-                formant_stability = []
-                for i in range(formant_mfccs.shape[0]):
-                    values = formant_mfccs[i]
-                    if len(values) > 0:
-                        stability = 1 - (np.std(values) / (np.mean(np.abs(values)) + 1e-6))
-                        formant_stability.append(stability)
-                
-                vowel_formation = np.mean(formant_stability) if formant_stability else 0.0
-                
-            except Exception as e:
-                logger.warning(f"Could not calculate vowel formation: {str(e)}")
-                vowel_formation = 0.0
+            # Calculate words per minute (approximation)
+            duration_minutes = duration / 60
+            word_count = max(len(onset_frames) // 2, 1)  # Rough approximation: 2 syllables per word
+            words_per_minute = word_count / duration_minutes if duration_minutes > 0 else 0
+            
+            # Calculate variability in pause duration (for neuromotor assessment)
+            pause_variability = np.std(pause_durations) / np.mean(pause_durations) if np.mean(pause_durations) > 0 else 0
             
             return {
-                'precision': float(np.clip(precision / 10, 0, 1)),
-                'formation': float(np.clip(clarity / 20, 0, 1)),
-                'consonant_precision': float(np.clip(consonant_precision, 0, 1)),
-                'vowel_formation': float(np.clip(vowel_formation, 0, 1)),
-                'slurred_speech': float(1 - np.clip(precision / 15, 0, 1))
+                'average_pause_duration': float(np.mean(pause_durations)),
+                'pause_rate': float(len(pause_durations) / duration),
+                'long_pause_count': int(len(long_pauses)),
+                'words_per_minute': float(words_per_minute),
+                'word_count': int(word_count),
+                'fluency_score': float(np.clip(1 - (np.mean(pause_durations) / self.FLUENCY['MAX_PAUSE']), 0, 1)),
+                'pause_variability': float(pause_variability),
+                'palilalia_score': float(palilalia_score)
             }
+        return {
+            'average_pause_duration': 0.0,
+            'pause_rate': 0.0,
+            'long_pause_count': 0,
+            'words_per_minute': 0.0,
+            'word_count': 0,
+            'fluency_score': 0.0,
+            'pause_variability': 0.0,
+            'palilalia_score': 0.0
+        }
+
+    def _analyze_articulation(self, y, sr, features=None):
+        """Analyze speech articulation using librosa."""
+        try:
+            if features is None:
+                features = self._feature_store(y, sr)
+            # Extract MFCC features for articulation analysis
+            mfccs = features.mfcc(n_mfcc=13)
+            
+            return self._articulation_features(
+                np.std(mfccs, axis=1),
+                np.mean(np.abs(mfccs), axis=1),
+                np.mean(np.abs(np.diff(mfccs, axis=1))),
+                np.mean(features.spectral_centroid()),
+                features.source_sr
+            )
             
         except Exception as e:
             logger.error(f"Error analyzing articulation: {str(e)}")
@@ -370,16 +925,60 @@ class SpeechPatternAnalyzer:
                 'slurred_speech': 0.0
             }
 
-    def _analyze_voice_quality_librosa(self, y, sr):
+    def _articulation_features(self, mfcc_std, mfcc_magnitude, mfcc_step, centroid_mean, source_sr):
+        """
+        Articulation summary from MFCC and spectral centroid statistics.
+        
+        Args:
+            mfcc_std: Per-coefficient std of the MFCCs over frames
+            mfcc_magnitude: Per-coefficient mean of |MFCC| over frames
+            mfcc_step: Mean |MFCC| change between consecutive frames
+            centroid_mean: Mean spectral centroid (Hz)
+            source_sr: Sample rate the recording was decoded at
+        """
+        # Calculate articulation metrics
+        clarity = np.mean(mfcc_std)
+        precision = mfcc_step
+        
+        # Calculate consonant precision (higher frequency components)
+        consonant_precision = centroid_mean / (source_sr/4)
+        
+        # Calculate vowel formation using formant-like features
+        vowel_formation = 0.0
+        try:
+            # Use first few MFCCs as formant approximation (first 3 MFCCs)
+            # Calculate stability of these pseudo-formants
+            formant_stability = [
+                1 - (mfcc_std[i] / (mfcc_magnitude[i] + 1e-6))
+                for i in range(min(3, len(mfcc_std)))
+            ]
+            
+            vowel_formation = np.mean(formant_stability) if formant_stability else 0.0
+            
+        except Exception as e:
+            logger.warning(f"Could not calculate vowel formation: {str(e)}")
+            vowel_formation = 0.0
+        
+        return {
+            'precision': float(np.clip(precision / 10, 0, 1)),
+            'formation': float(np.clip(clarity / 20, 0, 1)),
+            'consonant_precision': float(np.clip(consonant_precision, 0, 1)),
+            'vowel_formation': float(np.clip(vowel_formation, 0, 1)),
+            'slurred_speech': float(1 - np.clip(precision / 15, 0, 1))
+        }
+
+    def _analyze_voice_quality_librosa(self, y, sr, features=None):
         """Analyze voice quality using librosa instead of parselmouth."""
         try:
+            if features is None:
+                features = self._feature_store(y, sr)
             # Spectral features for voice quality
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+            spectral_centroid = features.spectral_centroid()
+            spectral_bandwidth = features.spectral_bandwidth()
+            spectral_rolloff = features.spectral_rolloff()
             
             # Calculate breathiness using spectral flatness
-            breathiness = np.mean(librosa.feature.spectral_flatness(y=y)[0])
+            breathiness = np.mean(features.spectral_flatness())
             
             # Calculate harmonics using harmonic component
             harmonics = librosa.effects.harmonic(y)
@@ -465,27 +1064,40 @@ class SpeechPatternAnalyzer:
                 'spastic': 0
             }
 
-    def _extract_time_series_data(self, y, sr):
-        """Extract time series data for visualization and detailed analysis."""
+    def _extract_time_series_data(self, y, sr, features=None, points=None):
+        """
+        Extract time series data for visualization and detailed analysis.
+        
+        Every curve is computed per STFT frame, then reduced to the point budget
+        with min/max buckets on one shared time axis: each bucket keeps the
+        minimum and maximum of every curve in the order they occur, so short
+        events (pitch breaks, volume spikes, hesitations) survive the reduction.
+        Recordings with fewer frames than the budget are returned per frame.
+        
+        Args:
+            y: Audio signal
+            sr: Sample rate
+            features: Feature store of y
+            points: Points per curve (TIME_SERIES['POINTS'] when None); an odd
+                budget is rounded down to whole buckets of two points
+            
+        Returns:
+            Dictionary of the curves, their timestamps and the speech segments
+        """
         try:
-            # Time axis
-            duration = len(y) / sr
-            times = np.linspace(0, duration, num=min(500, len(y)))
+            if features is None:
+                features = self._feature_store(y, sr)
+            points = points or self.TIME_SERIES['POINTS']
             
-            # For consistent sizing, resample all features to fixed length
+            # Frame time axis
+            rms = features.rms()
+            times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=features.hop_length)
             target_len = len(times)
             
-            # Extract pitch contour using librosa
+            # Extract pitch contour (0 where unvoiced)
             pitch_data = []
             try:
-                pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-                pitch_values = []
-                for t in range(pitches.shape[1]):
-                    index = magnitudes[:,t].argmax()
-                    pitch_values.append(pitches[index,t])
-                
-                pitch_times = np.linspace(0, duration, len(pitch_values))
-                pitch_data = np.interp(times, pitch_times, pitch_values, left=0, right=0)
+                pitch_data = features.pitch_track()
             except Exception as e:
                 logger.warning(f"Could not extract pitch contour: {str(e)}")
                 pitch_data = np.zeros(target_len)
@@ -493,9 +1105,7 @@ class SpeechPatternAnalyzer:
             # Extract intensity contour
             volume_data = []
             try:
-                rms = librosa.feature.rms(y=y)[0]
-                rms_times = np.linspace(0, duration, len(rms))
-                volume_data = np.interp(times, rms_times, librosa.amplitude_to_db(rms), left=-80, right=-80)
+                volume_data = librosa.amplitude_to_db(rms)
             except Exception as e:
                 logger.warning(f"Could not extract volume contour: {str(e)}")
                 volume_data = np.zeros(target_len)
@@ -504,7 +1114,7 @@ class SpeechPatternAnalyzer:
             segments = []
             try:
                 # Simple energy-based segmentation
-                rms = librosa.feature.rms(y=y)[0]
+                rms = features.rms()
                 threshold = 0.1 * np.max(rms)
                 is_speech = rms > threshold
                 
@@ -521,8 +1131,8 @@ class SpeechPatternAnalyzer:
                 
                 # Convert to time
                 for i in range(min(len(onsets), len(offsets))):
-                    onset_time = librosa.frames_to_time(onsets[i], sr=sr)
-                    offset_time = librosa.frames_to_time(offsets[i], sr=sr)
+                    onset_time = librosa.frames_to_time(onsets[i], sr=sr, hop_length=features.hop_length)
+                    offset_time = librosa.frames_to_time(offsets[i], sr=sr, hop_length=features.hop_length)
                     if offset_time > onset_time:
                         segments.append({
                             'start': float(onset_time),
@@ -535,28 +1145,38 @@ class SpeechPatternAnalyzer:
             # Extract formants using MFCC as approximation
             formants = []
             try:
-                mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=3)
-                formant_times = np.linspace(0, duration, mfccs.shape[1])
-                
-                for i in range(mfccs.shape[0]):
-                    formants.append(np.interp(times, formant_times, mfccs[i], left=0, right=0).tolist())
-                    
+                formants = list(features.mfcc(n_mfcc=3))
             except Exception as e:
                 logger.warning(f"Could not extract formants: {str(e)}")
             
             # Extract emotional markers
             emotion = {
-                'confidence': self._extract_confidence_time_series(y, sr, times),
-                'stress': self._extract_stress_time_series(y, sr, times),
-                'hesitation': self._extract_hesitation_time_series(y, sr, times)
+                'confidence': self._extract_confidence_time_series(y, sr, times, features),
+                'stress': self._extract_stress_time_series(y, sr, times, features),
+                'hesitation': self._extract_hesitation_time_series(y, sr, times, features)
             }
             
+            # Reduce every curve to the point budget on shared buckets
+            curves = np.vstack([pitch_data, volume_data, emotion['confidence'], emotion['stress'],
+                                emotion['hesitation']] + formants)
+            n_buckets = points // 2
+            timestamps = times
+            if target_len > 2 * n_buckets:
+                curves, edges = dsp.minmax_buckets(curves, n_buckets)
+                # The two points of a bucket sit at its first and third quarter
+                positions = edges[:-1, None] + np.diff(edges)[:, None] * np.array([0.25, 0.75])
+                timestamps = np.interp(positions.ravel() - 0.5, np.arange(target_len), times)
+            
             return {
-                'pitchData': pitch_data.tolist() if isinstance(pitch_data, np.ndarray) else [],
-                'volumeData': volume_data.tolist() if isinstance(volume_data, np.ndarray) else [],
-                'formants': formants,
-                'emotion': emotion,
-                'timestamps': times.tolist(),
+                'pitchData': curves[0].tolist(),
+                'volumeData': curves[1].tolist(),
+                'formants': [curve.tolist() for curve in curves[5:]],
+                'emotion': {
+                    'confidence': curves[2].tolist(),
+                    'stress': curves[3].tolist(),
+                    'hesitation': curves[4].tolist()
+                },
+                'timestamps': timestamps.tolist(),
                 'speechSegments': segments
             }
         except Exception as e:
@@ -574,12 +1194,28 @@ class SpeechPatternAnalyzer:
                 'speechSegments': []
             }
 
-    def _extract_confidence_time_series(self, y, sr, times):
+    @staticmethod
+    def _format_time_series(time_series):
+        """Flatten _extract_time_series_data output into the shape the frontend charts read."""
+        return {
+            'timestamps': time_series['timestamps'],
+            'pitch': time_series['pitchData'],
+            'volume': time_series['volumeData'],
+            'confidence': time_series['emotion']['confidence'],
+            'stress': time_series['emotion']['stress'],
+            'hesitation': time_series['emotion']['hesitation'],
+            'formants': time_series['formants'],
+            'speechSegments': time_series['speechSegments']
+        }
+
+    def _extract_confidence_time_series(self, y, sr, times, features=None):
         """Extract confidence scores over time."""
         try:
+            if features is None:
+                features = self._feature_store(y, sr)
             # Use volume as a proxy for confidence
-            rms = librosa.feature.rms(y=y)[0]
-            rms_times = np.linspace(0, len(y)/sr, len(rms))
+            rms = features.rms()
+            rms_times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=features.hop_length)
             
             # Normalize RMS values
             normalized_rms = (rms - np.min(rms)) / (np.max(rms) - np.min(rms) + 1e-10)
@@ -592,41 +1228,49 @@ class SpeechPatternAnalyzer:
             logger.warning(f"Could not extract confidence time series: {str(e)}")
             return [0] * len(times)
     
-    def _extract_stress_time_series(self, y, sr, times):
-        """Extract stress indicators over time using librosa."""
+    def _extract_stress_time_series(self, y, sr, times, features=None):
+        """
+        Extract stress indicators over time.
+        
+        Pitch and volume variability are measured in 200 ms windows every 50 ms,
+        using rolling statistics over the whole-signal pitch and RMS tracks (the
+        frames centred inside each window) instead of re-analysing every window.
+        """
         try:
+            if features is None:
+                features = self._feature_store(y, sr)
             window_length = int(sr * 0.2)  # 200ms windows
             hop_length = int(sr * 0.05)  # 50ms hops
             
-            stress_values = []
-            for i in range(0, len(y) - window_length, hop_length):
-                window = y[i:i+window_length]
-                
-                # Calculate local pitch variability using librosa
-                pitches, magnitudes = librosa.piptrack(y=window, sr=sr)
-                pitch_values = []
-                for t in range(pitches.shape[1]):
-                    index = magnitudes[:,t].argmax()
-                    pitch_values.append(pitches[index,t])
-                
-                pitch_values = np.array(pitch_values)
-                pitch_values = pitch_values[pitch_values > 0]
-                
-                if len(pitch_values) > 1:
-                    pitch_var = np.std(pitch_values) / np.mean(pitch_values)
-                else:
-                    pitch_var = 0
-                
-                # Calculate local volume variability
-                rms = librosa.feature.rms(y=window)[0]
-                if len(rms) > 1:
-                    vol_var = np.std(rms) / np.mean(rms)
-                else:
-                    vol_var = 0
-                
-                # Combine indicators with weights
-                stress = 0.6 * pitch_var + 0.4 * vol_var
-                stress_values.append(np.clip(stress, 0, 1))
+            pitch_track = features.pitch_track()
+            rms = features.rms()
+            frame_hop = features.hop_length
+            
+            # (windows, frames per window) indices into the frame tracks
+            starts = np.arange(0, len(y) - window_length, hop_length)
+            frames_per_window = max(1, window_length // frame_hop)
+            first_frame = -(-starts // frame_hop)
+            index = np.minimum(first_frame[:, None] + np.arange(frames_per_window), len(rms) - 1)
+            
+            # Local pitch variability over the voiced frames of each window
+            pitches = pitch_track[index]
+            voiced = pitches > 0
+            counts = voiced.sum(axis=1)
+            pitch_mean = np.where(voiced, pitches, 0).sum(axis=1) / np.maximum(counts, 1)
+            pitch_std = np.sqrt(
+                np.where(voiced, (pitches - pitch_mean[:, None]) ** 2, 0).sum(axis=1) / np.maximum(counts, 1)
+            )
+            pitch_var = np.divide(pitch_std, pitch_mean, out=np.zeros_like(pitch_std),
+                                  where=(counts > 1) & (pitch_mean > 0))
+            
+            # Local volume variability
+            energies = rms[index]
+            energy_mean = energies.mean(axis=1)
+            vol_var = np.divide(energies.std(axis=1), energy_mean, out=np.zeros_like(energy_mean),
+                                where=(energy_mean > 0) & (frames_per_window > 1))
+            
+            # Combine indicators with weights
+            stress_values = np.clip(0.6 * pitch_var + 0.4 * vol_var, 0, 1)
             
             # Get time points for stress values
             stress_times = np.linspace(0, len(y)/sr, len(stress_values))
@@ -639,12 +1283,14 @@ class SpeechPatternAnalyzer:
             logger.warning(f"Could not extract stress time series: {str(e)}")
             return [0] * len(times)
     
-    def _extract_hesitation_time_series(self, y, sr, times):
+    def _extract_hesitation_time_series(self, y, sr, times, features=None):
         """Extract hesitation indicators over time."""
         try:
+            if features is None:
+                features = self._feature_store(y, sr)
             # Calculate energy envelope
-            rms = librosa.feature.rms(y=y)[0]
-            rms_times = np.linspace(0, len(y)/sr, len(rms))
+            rms = features.rms()
+            rms_times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=features.hop_length)
             
             # Detect potential hesitations (low energy regions between speech)
             threshold = 0.2 * np.max(rms)
@@ -845,69 +1491,87 @@ class SpeechPatternAnalyzer:
         ]
         return float(np.mean(scores) * 100)
 
-    def _calculate_clarity(self, y, sr):
-        """Calculate speech clarity score."""
+    def _calculate_clarity(self, y, sr, features=None, frame_step=1):
+        """Calculate speech clarity score (contrast and ZCR on every frame_step-th frame)."""
         try:
-            # Extract MFCC features
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-            
-            # Calculate spectral contrast
-            contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
-            
-            # Calculate clarity metrics
-            mfcc_std = np.std(mfccs, axis=1)
-            mfcc_clarity = np.mean(mfcc_std)
-            
-            # Spectral contrast mean
-            contrast_clarity = np.mean(contrast)
-            
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(y)[0]
-            zcr_clarity = np.mean(zcr)
-            
-            # Calculate spectral rolloff
-            rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-            rolloff_clarity = np.mean(rolloff) / (sr/2)  # Normalize by Nyquist frequency
-            
-            # Calculate temporal envelope
-            env = np.abs(librosa.feature.rms(y=y)[0])
-            env_clarity = np.std(env) / (np.mean(env) + 1e-6)
-            
-            # New weights and normalization factors
-            clarity_components = {
-                'mfcc': np.clip(mfcc_clarity / 15, 0, 1),      # MFCC variation
-                'contrast': np.clip(contrast_clarity / 30, 0, 1),  # Spectral contrast
-                'zcr': np.clip(zcr_clarity * 50, 0, 1),        # Consonant strength
-                'rolloff': rolloff_clarity,                     # High frequency content
-                'envelope': np.clip(env_clarity, 0, 1)          # Amplitude modulation
-            }
-            
-            # Weighted combination
-            weights = {
-                'mfcc': 0.3,
-                'contrast': 0.25,
-                'zcr': 0.2,
-                'rolloff': 0.15,
-                'envelope': 0.1
-            }
-            
-            clarity_score = sum(
-                clarity_components[comp] * weights[comp]
-                for comp in clarity_components
+            if features is None:
+                features = self._feature_store(y, sr)
+            # Temporal envelope
+            env = np.abs(features.rms())
+            
+            return self._clarity_score(
+                np.std(features.mfcc(n_mfcc=13), axis=1),
+                np.mean(features.spectral_contrast(frame_step=frame_step)),
+                np.mean(features.zero_crossing_rate(frame_step=frame_step)),
+                np.mean(features.spectral_rolloff()),
+                np.std(env),
+                np.mean(env),
+                features.source_sr
             )
-            
-            # Apply progressive scaling (make it harder to get very high scores)
-            clarity_score = np.power(clarity_score, 1.2)
-            
-            # Final normalization
-            clarity_score = np.clip(clarity_score, 0, 1)
-            
-            # Debug logging
-            logger.debug(f"Clarity components: {clarity_components}")
-            logger.debug(f"Final clarity score: {clarity_score}")
-            
-            return float(clarity_score)
         
         except Exception as e:
             logger.error(f"Error calculating clarity: {str(e)}")
-            return 0.0
\ No newline at end of file
+            return 0.0
+
+    def _clarity_score(self, mfcc_std, contrast_mean, zcr_mean, rolloff_mean, env_std, env_mean, source_sr):
+        """
+        Clarity score from frame statistics.
+        
+        Args:
+            mfcc_std: Per-coefficient std of the MFCCs over frames
+            contrast_mean: Mean spectral contrast
+            zcr_mean: Mean zero-crossing rate
+            rolloff_mean: Mean spectral rolloff (Hz)
+            env_std: Std of the RMS envelope
+            env_mean: Mean of the RMS envelope
+            source_sr: Sample rate the recording was decoded at
+        """
+        # Calculate clarity metrics
+        mfcc_clarity = np.mean(mfcc_std)
+        
+        # Spectral contrast mean
+        contrast_clarity = contrast_mean
+        
+        # Zero crossing rate
+        zcr_clarity = zcr_mean
+        
+        # Calculate spectral rolloff
+        rolloff_clarity = rolloff_mean / (source_sr/2)  # Normalize by the recording's Nyquist frequency
+        
+        # Calculate temporal envelope
+        env_clarity = env_std / (env_mean + 1e-6)
+        
+        # New weights and normalization factors
+        clarity_components = {
+            'mfcc': np.clip(mfcc_clarity / 15, 0, 1),      # MFCC variation
+            'contrast': np.clip(contrast_clarity / 30, 0, 1),  # Spectral contrast
+            'zcr': np.clip(zcr_clarity * 50, 0, 1),        # Consonant strength
+            'rolloff': rolloff_clarity,                     # High frequency content
+            'envelope': np.clip(env_clarity, 0, 1)          # Amplitude modulation
+        }
+        
+        # Weighted combination
+        weights = {
+            'mfcc': 0.3,
+            'contrast': 0.25,
+            'zcr': 0.2,
+            'rolloff': 0.15,
+            'envelope': 0.1
+        }
+        
+        clarity_score = sum(
+            clarity_components[comp] * weights[comp]
+            for comp in clarity_components
+        )
+        
+        # Apply progressive scaling (make it harder to get very high scores)
+        clarity_score = np.power(clarity_score, 1.2)
+        
+        # Final normalization
+        clarity_score = np.clip(clarity_score, 0, 1)
+        
+        # Debug logging
+        logger.debug(f"Clarity components: {clarity_components}")
+        logger.debug(f"Final clarity score: {clarity_score}")
+        
+        return float(clarity_score)
@@ -1,25 +1,26 @@
 import mediapipe as mp
 import numpy as np
 import cv2
-from scipy.fft import fft
-from scipy.signal import find_peaks, butter, filtfilt, welch
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft
+from scipy.signal import find_peaks, welch
 import logging
+import math
 from typing import List, Dict, Tuple, Union, Optional
+from ..utils.video_processing import get_frame_rate, estimate_frame_rate, iter_frames, prefetch
+from ..utils import dsp
+from ..utils.imu import IMURecording, resample_uniform
 
 logger = logging.getLogger(__name__)
 
 class TremorAnalyzer:
-    def __init__(self):
-        # Initialize MediaPipe hands detector with improved settings
+    def __init__(self, fps: float = 30):
+        # MediaPipe hands detector, created on first use (sensor input never needs it)
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,  # Focus on one hand for better accuracy
-            min_detection_confidence=0.7,  # Increased from 0.5
-            min_tracking_confidence=0.7    # Increased from 0.5
-        )
+        self._hands = None
         self.positions = []
-        self.fps = 30  # Standard webcam frame rate
+        self.fps = fps  # Sample rate of the landmark series (effective decode rate)
+        self.max_frequency = 20.0  # Highest frequency the current sampling plan resolves
         
         # Improved constants for tremor detection
         self.MIN_FRAMES = 10  # Increased minimum frames for better frequency resolution
@@ -30,8 +31,33 @@ class TremorAnalyzer:
         self.MIN_AMPLITUDE_THRESHOLD = 2.0  # Increased to reduce false positives
         self.VELOCITY_SCALE_FACTOR = 1.2  # More accurate amplitude scaling
         
+        # Sampling plan for video input
+        self.NYQUIST_MARGIN = 1.1     # Decode at least this factor above twice the highest band edge
+        self.FREQ_RESOLUTION = 0.2    # Hz; sets how many seconds of signal are decoded
+        self.ACTION_BAND = 'Action/Intention'
+        
+        # Phone accelerometer/gyroscope input
+        self.IMU = {
+            'MIN_DURATION': 2.0,       # seconds of motion needed for a spectrum
+            'MAX_DURATION': 60.0,      # longer recordings are truncated
+            'MIN_ACCEL_RMS': 0.02,     # m/s^2; below this is sensor noise, not tremor
+            'AMPLITUDE_SCALE': 100.0,  # clinical amplitude points per m/s^2 of band-limited RMS
+            'STABILITY_WINDOW': 1.0    # seconds
+        }
+        
         # Tracking multiple landmarks for comprehensive analysis
         self.TRACKED_LANDMARKS = [4, 8, 12, 16, 20]  # Thumb, index, middle, ring, pinky tips
+        self.PRIMARY_LANDMARK = 8  # Index fingertip drives the headline metrics
+        self.HAND_LANDMARK_COUNT = 21
+        
+        # Hand landmark indices of each finger, from knuckle to tip
+        self.FINGERS = {
+            'thumb': [1, 2, 3, 4],
+            'index': [5, 6, 7, 8],
+            'middle': [9, 10, 11, 12],
+            'ring': [13, 14, 15, 16],
+            'pinky': [17, 18, 19, 20]
+        }
         
         # Frequency bands for medical tremor classification (Hz)
         self.FREQ_BANDS = {
@@ -51,11 +77,235 @@ class TremorAnalyzer:
             ('Very Severe', 60, 100)
         ]
         
-    def process_frame(self, frame) -> Optional[Dict[str, Tuple[int, int]]]:
+    def plan_sampling(self, native_fps: float, include_action_band: bool = False) -> Dict:
         """
-        Process a single frame and extract multiple hand landmarks.
-        Returns a dictionary of landmark positions.
+        Choose the lowest decode rate and the frame count the spectrum needs.
+        
+        The decode rate must exceed twice the highest configured band edge (the
+        12-20 Hz action band only when requested), so frames are decimated by the
+        largest step that keeps it there. The number of decoded frames gives a
+        frequency resolution of FREQ_RESOLUTION, bounded below by what the
+        band-pass filter needs.
+        
+        Args:
+            native_fps: Frame rate of the source video
+            include_action_band: Also resolve the Action/Intention band
+            
+        Returns:
+            Dictionary with step, effective_fps, frame_count and max_frequency
+        """
+        bands = [band for name, band in self.FREQ_BANDS.items()
+                 if include_action_band or name != self.ACTION_BAND]
+        band_top = max(high for _, high in bands)
+        min_rate = 2 * band_top * self.NYQUIST_MARGIN
+        
+        step = max(1, int(native_fps // min_rate))
+        effective_fps = native_fps / step
+        max_frequency = min(band_top, effective_fps / 2)
+        if max_frequency < band_top:
+            logger.warning(f"{native_fps:.1f} fps cannot resolve bands up to {band_top} Hz; "
+                           f"analysis limited to {max_frequency:.1f} Hz")
+        
+        # sosfiltfilt needs more than 3 * (filter order * 2 + 1) samples
+        frame_count = max(self.MIN_FRAMES, 3 * 9 + 1, math.ceil(effective_fps / self.FREQ_RESOLUTION))
+        
+        return {
+            'step': step,
+            'effective_fps': effective_fps,
+            'frame_count': frame_count,
+            'max_frequency': max_frequency
+        }
+
+    def analyze_video(self, video_path: str, include_action_band: bool = False) -> Dict:
         """
+        Tremor analysis of a video file decoded according to plan_sampling.
+        
+        The sample rate used for filtering and spectra is measured from the
+        timestamps of the decoded frames.
+        """
+        native_fps = get_frame_rate(video_path)
+        plan = self.plan_sampling(native_fps, include_action_band)
+        logger.info(f"Decoding {plan['frame_count']} frames every {plan['step']} frame(s) "
+                    f"(~{plan['effective_fps']:.1f} fps, bands up to {plan['max_frequency']:.1f} Hz)")
+        
+        timestamps = []
+        def frames():
+            for frame, timestamp in prefetch(iter_frames(video_path, step=plan['step'],
+                                                         max_frames=plan['frame_count'], timestamps=True)):
+                timestamps.append(timestamp)
+                yield frame
+        
+        landmarks = self.collect_landmarks(frames())
+        logger.info(f"Detected hand in {len(landmarks)} of {len(timestamps)} frames")
+        
+        self.fps = estimate_frame_rate(timestamps) or plan['effective_fps']
+        self.max_frequency = min(plan['max_frequency'], self.fps / 2)
+        
+        metrics = self.analyze_tremor(landmarks)
+        metrics['sampling'] = {
+            'fps': float(self.fps),
+            'frames_decoded': len(timestamps),
+            'frames_with_hand': len(landmarks),
+            'max_frequency': float(self.max_frequency)
+        }
+        return metrics
+
+    @property
+    def hands(self):
+        if self._hands is None:
+            self._hands = self.mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=1,  # Focus on one hand for better accuracy
+                min_detection_confidence=0.7,  # Increased from 0.5
+                min_tracking_confidence=0.7    # Increased from 0.5
+            )
+        return self._hands
+
+    def analyze_imu(self, recording: IMURecording) -> Dict:
+        """
+        Tremor analysis of phone motion sensor samples.
+        
+        The recording is resampled onto a uniform grid at its native rate and
+        run through the same band-pass / windowed FFT / Welch pipeline as the
+        landmark path. Axes are combined in the power domain, so the reported
+        frequency is the tremor frequency itself. With a gyroscope, its
+        normalized spectrum is added to the accelerometer's before picking
+        the peak.
+        
+        Args:
+            recording: IMURecording from parse_imu_json / parse_imu_binary
+            
+        Returns:
+            Dictionary with the analyze_tremor metric schema plus 'sampling'
+            and 'imu' sections
+
+        Raises:
+            ValueError: If the timestamps have an implausible span, gap or rate
+        """
+        fs, accel, gyro = resample_uniform(recording, max_duration=self.IMU['MAX_DURATION'])
+        sample_count = accel.shape[1]
+        
+        self.fps = fs
+        self.max_frequency = min(self.FILTER_HIGH, fs / 2)
+        low, high = self._band_edges()
+        sampling = {
+            'fps': float(fs),
+            'samples': int(sample_count),
+            'duration': float(sample_count / fs),
+            'max_frequency': float(self.max_frequency)
+        }
+        logger.info(f"IMU recording: {len(recording.timestamps)} samples resampled to "
+                    f"{sample_count} at {fs:.0f} Hz")
+        
+        def with_sampling(metrics, imu=None):
+            metrics['sampling'] = sampling
+            metrics['imu'] = imu or {'accel_rms': 0.0, 'displacement_mm': 0.0, 'spectral_peak_ratio': 0.0}
+            return metrics
+        
+        if (sample_count < self.IMU['MIN_DURATION'] * fs
+                or sample_count <= dsp.filtfilt_padlen(dsp.butter_bandpass(low, high, fs, 4))):
+            logger.warning(f"IMU recording too short for analysis: {sampling['duration']:.2f} s")
+            return with_sampling(self._get_default_metrics())
+        
+        try:
+            # Gravity and drift sit below the band and are removed by the filter
+            filtered = dsp.bandpass(accel - accel.mean(axis=1, keepdims=True), low, high, fs, order=4)
+            magnitude = np.sqrt((filtered ** 2).sum(axis=0))
+            accel_rms = float(np.sqrt(np.mean(magnitude ** 2)))
+            
+            taper = dsp.window('hann', sample_count, symmetric=True)
+            frequencies = dsp.rfft_frequencies(sample_count, fs)
+            band = (frequencies >= self.FILTER_LOW) & (frequencies <= high)
+            power = (np.abs(rfft(filtered * taper, axis=-1)) ** 2).sum(axis=0)
+            
+            combined = power / (power[band].sum() + 1e-12)
+            gyro_rms = None
+            if gyro is not None:
+                gyro_filtered = dsp.bandpass(gyro - gyro.mean(axis=1, keepdims=True), low, high, fs, order=4)
+                gyro_power = (np.abs(rfft(gyro_filtered * taper, axis=-1)) ** 2).sum(axis=0)
+                combined = combined + gyro_power / (gyro_power[band].sum() + 1e-12)
+                gyro_rms = float(np.sqrt(np.mean((gyro_filtered ** 2).sum(axis=0))))
+            
+            nperseg = min(256, sample_count // 2)
+            freqs_welch, psd_welch = welch(
+                filtered, fs=fs, window=dsp.window('hann', nperseg), nperseg=nperseg,
+                scaling='spectrum', axis=-1
+            )
+            psd_welch = psd_welch.sum(axis=0)[(freqs_welch >= self.FILTER_LOW) & (freqs_welch <= high)]
+            peak_ratio = float(psd_welch.max() / (psd_welch.sum() + 1e-12)) if len(psd_welch) else 0.0
+            
+            if accel_rms < self.IMU['MIN_ACCEL_RMS']:
+                logger.info(f"No tremor detected (band-limited RMS {accel_rms:.4f} m/s^2)")
+                return with_sampling(self._get_default_metrics(),
+                                     {'accel_rms': accel_rms, 'displacement_mm': 0.0, 'spectral_peak_ratio': peak_ratio})
+            
+            band_spectrum = np.where(band, np.sqrt(combined), 0)
+            peaks, _ = find_peaks(
+                band_spectrum,
+                height=np.max(band_spectrum) * self.PEAK_HEIGHT_RATIO,
+                distance=3,
+                prominence=np.max(band_spectrum) * self.PEAK_PROMINENCE_RATIO
+            )
+            tremor_frequency = float(frequencies[np.argmax(band_spectrum)])
+            
+            # Sinusoidal motion: peak displacement = peak acceleration / (2 pi f)^2
+            displacement_mm = accel_rms * np.sqrt(2) / (2 * np.pi * tremor_frequency) ** 2 * 1000
+            tremor_amplitude = min(100.0, accel_rms * self.IMU['AMPLITUDE_SCALE'])
+            
+            tremor_type = self._get_tremor_type(tremor_frequency)
+            severity_modifier = {'Resting': 1.2, 'Very Slow': 0.9}.get(tremor_type, 1.0)
+            severity = self._get_severity(tremor_amplitude * severity_modifier)
+            
+            if len(peaks) > 1:
+                peak_spacings = np.diff(frequencies[peaks])
+                regularity = 1.0 - min(1.0, np.std(peak_spacings) / (np.mean(peak_spacings) + 1e-6))
+            else:
+                regularity = 0.5
+            
+            # Stability: spread of the tremor RMS across half-overlapping windows
+            window_size = int(self.IMU['STABILITY_WINDOW'] * fs)
+            window_rms = np.sqrt(np.mean(
+                sliding_window_view(magnitude ** 2, window_size)[::max(1, window_size // 2)], axis=1
+            ))
+            stability = 1.0 - min(1.0, np.std(window_rms) / (np.mean(window_rms) + 1e-6))
+            
+            confidence = min(1.0, max(0.0,
+                0.2 * min(1.0, sampling['duration'] / 10) +
+                0.3 * min(1.0, 2 * peak_ratio) +
+                0.3 * min(1.0, accel_rms / (5 * self.IMU['MIN_ACCEL_RMS'])) +
+                0.2 * (regularity + stability) / 2
+            ))
+            
+            logger.info(f"IMU tremor analysis complete - Frequency: {tremor_frequency:.2f} Hz, "
+                        f"RMS: {accel_rms:.3f} m/s^2, Type: {tremor_type}, Severity: {severity}")
+            
+            result = {
+                'tremor_frequency': tremor_frequency,
+                'tremor_amplitude': float(tremor_amplitude),
+                'tremor_type': tremor_type,
+                'severity': severity,
+                'peak_count': len(peaks),
+                'regularity': float(regularity),
+                'stability': float(stability),
+                'confidence': float(confidence),
+                'clinical_insight': self._get_clinical_insight(tremor_frequency, tremor_type,
+                                                               tremor_amplitude, severity)
+            }
+            imu = {
+                'accel_rms': accel_rms,
+                'displacement_mm': float(displacement_mm),
+                'spectral_peak_ratio': peak_ratio
+            }
+            if gyro_rms is not None:
+                imu['gyro_rms'] = gyro_rms
+            return with_sampling(result, imu)
+            
+        except Exception as e:
+            logger.error(f"Error in IMU tremor analysis: {str(e)}", exc_info=True)
+            return with_sampling(self._get_default_metrics())
+
+    def _detect_hand(self, frame):
+        """Run the hand model on a frame; returns the MediaPipe results or None."""
         if frame is None:
             logger.warning("Received empty frame")
             return None
@@ -66,6 +316,49 @@ class TremorAnalyzer:
         if not results.multi_hand_landmarks:
             logger.warning("No hand landmarks detected in frame")
             return None
+        return results
+
+    def process_frame_landmarks(self, frame) -> Optional[np.ndarray]:
+        """
+        Process a single frame and return all 21 landmarks of the first detected
+        hand as a (21, 2) array of (unrounded) pixel coordinates.
+        """
+        results = self._detect_hand(frame)
+        if results is None:
+            return None
+            
+        height, width, _ = frame.shape
+        hand_landmarks = results.multi_hand_landmarks[0]
+        return np.array([(landmark.x, landmark.y) for landmark in hand_landmarks.landmark]) * (width, height)
+
+    def collect_landmarks(self, frames) -> np.ndarray:
+        """
+        Track the hand through a sequence of frames.
+        
+        Returns:
+            (T, 21, 2) array of pixel coordinates for the T frames with a hand
+        """
+        capacity = len(frames) if hasattr(frames, '__len__') else 64
+        landmarks = np.empty((max(1, capacity), self.HAND_LANDMARK_COUNT, 2))
+        count = 0
+        for frame in frames:
+            points = self.process_frame_landmarks(frame)
+            if points is None:
+                continue
+            if count == len(landmarks):
+                landmarks = np.concatenate([landmarks, np.empty_like(landmarks)])
+            landmarks[count] = points
+            count += 1
+        return landmarks[:count]
+
+    def process_frame(self, frame) -> Optional[Dict[str, Tuple[int, int]]]:
+        """
+        Process a single frame and extract multiple hand landmarks.
+        Returns a dictionary of landmark positions.
+        """
+        results = self._detect_hand(frame)
+        if results is None:
+            return None
             
         height, width, _ = frame.shape
         landmarks = {}
@@ -92,71 +385,138 @@ class TremorAnalyzer:
 
     def analyze_tremor(self, data) -> Dict:
         """
-        Enhanced tremor analysis using multiple signal processing techniques.
+        Tremor metrics from landmark trajectories, computed in one batched pass.
+        
+        Every landmark runs through the same outlier clipping, band-pass
+        filter, FFT and Welch estimate at once (see _landmark_spectra). The
+        headline metrics are read from the index fingertip's spectrum, the
+        per-finger ones from each finger's landmarks, so both report the
+        tremor frequency on the same scale as analyze_imu.
         
         Args:
-            data: List of landmark positions captured over time
+            data: (T, 21, 2) landmark array from collect_landmarks, or a list of
+                per-frame positions of one point ((x, y) tuples, or dicts with
+                'landmark_8' or another landmark)
             
         Returns:
-            Dictionary containing tremor metrics
+            Dictionary containing tremor metrics; for landmark arrays it also
+            includes per-finger frequency and amplitude under 'fingers'
         """
         logger.info(f"Starting tremor analysis with {len(data)} frames")
         
         if len(data) < self.MIN_FRAMES:
             logger.warning(f"Insufficient frames for analysis: {len(data)} < {self.MIN_FRAMES}")
             return self._get_default_metrics()
+        
+        landmarks = self._as_landmarks(data)
+        if landmarks is None:
+            logger.error("Could not extract valid position data")
+            return self._get_default_metrics()
+        
+        spectra = self._landmark_spectra(landmarks)
+        if spectra is None:
+            logger.warning(f"Too few frames to filter: {len(landmarks)}")
+            return self._get_default_metrics()
+        
+        whole_hand = landmarks.shape[1] == self.HAND_LANDMARK_COUNT
+        result = self._analyze_landmark(spectra, self.PRIMARY_LANDMARK if whole_hand else 0)
+        
+        if whole_hand:
+            fingers = self._analyze_fingers(spectra)
+            if fingers:
+                result['fingers'] = fingers
+        
+        return result
+
+    def _as_landmarks(self, data) -> Optional[np.ndarray]:
+        """(T, L, 2) float array of a landmark array or of a list of per-frame positions (L = 1)."""
+        if isinstance(data, np.ndarray) and data.ndim == 3:
+            return data.astype(np.float64)
+        
+        positions = []
+        for frame_data in data:
+            # Try both direct position tuples and dictionary formats
+            if isinstance(frame_data, tuple) and len(frame_data) >= 2:
+                positions.append(frame_data[:2])
+            elif isinstance(frame_data, dict) and 'landmark_8' in frame_data:
+                # Index finger tip (landmark 8)
+                positions.append(frame_data['landmark_8'])
+            elif isinstance(frame_data, dict) and len(frame_data) > 0:
+                # Take the first available landmark
+                positions.append(next(iter(frame_data.values())))
+        if len(positions) < self.MIN_FRAMES:
+            return None
+        return np.asarray(positions, dtype=np.float64)[:, None, :2]
+
+    def _landmark_spectra(self, landmarks: np.ndarray) -> Optional[Dict]:
+        """
+        Band-passed trajectories and power spectra of every landmark.
+        
+        All landmarks are processed together as 2 * L coordinate channels:
+        outliers are clipped to 3 standard deviations per channel, then the
+        band-pass filter, FFT and Welch estimate each run once along the time
+        axis. x and y are combined in the power domain, as analyze_imu combines
+        its axes, so a landmark's spectrum peaks at the tremor frequency itself
+        (the magnitude of its 2-D displacement would peak at twice that).
+        
+        Args:
+            landmarks: (T, L, 2) landmark pixel coordinates
+            
+        Returns:
+            Dictionary of the clipped ('positions') and band-passed ('filtered')
+            (L, 2, T) coordinates, the per-channel 'std' (L, 2), the FFT
+            'spectrum' (L, F) on rfft bin 'frequencies', the Welch 'psd' on
+            'welch_frequencies' and 'band' / 'welch_band' masks of the tremor
+            band; None if the clip is too short to filter
+        """
+        frame_count, landmark_count = landmarks.shape[:2]
+        low, high = self._band_edges()
+        if frame_count <= dsp.filtfilt_padlen(dsp.butter_bandpass(low, high, self.fps, 4)):
+            return None
+        
+        # (channels, T): landmark-major, x then y
+        signals = landmarks.reshape(frame_count, -1).T
+        mean = signals.mean(axis=1, keepdims=True)
+        std = signals.std(axis=1, keepdims=True)
+        signals = np.clip(signals, mean - 3 * std, mean + 3 * std)
+        
+        filtered = dsp.bandpass(signals - signals.mean(axis=1, keepdims=True), low, high, self.fps, order=4, axis=-1)
+        
+        spectrum = np.abs(rfft(filtered * dsp.window('hann', frame_count, symmetric=True), axis=-1)) ** 2
+        frequencies = dsp.rfft_frequencies(frame_count, self.fps)
+        nperseg = min(256, frame_count // 2)
+        freqs_welch, psd_welch = welch(
+            filtered, fs=self.fps, window=dsp.window('hann', nperseg), nperseg=nperseg,
+            scaling='spectrum', axis=-1
+        )
+        
+        band_top = min(self.FILTER_HIGH, self.max_frequency)
+        shape = (landmark_count, 2, -1)
+        return {
+            'positions': signals.reshape(shape),
+            'filtered': filtered.reshape(shape),
+            'std': std.reshape(landmark_count, 2),
+            # Combine x and y per landmark
+            'spectrum': spectrum.reshape(shape).sum(axis=1),
+            'frequencies': frequencies,
+            'band': (frequencies >= self.FILTER_LOW) & (frequencies <= band_top),
+            'psd': psd_welch.reshape(shape).sum(axis=1),
+            'welch_frequencies': freqs_welch,
+            'welch_band': (freqs_welch >= self.FILTER_LOW) & (freqs_welch <= band_top)
+        }
 
+    def _analyze_landmark(self, spectra: Dict, index: int) -> Dict:
+        """Headline tremor metrics of one landmark (the index fingertip) from the batched spectra."""
         try:
-            # Extract the primary landmark (index fingertip) for main analysis
-            positions = []
-            for frame_data in data:
-                # Try both direct position tuples and dictionary formats
-                if isinstance(frame_data, tuple) and len(frame_data) >= 2:
-                    positions.append(frame_data)
-                elif isinstance(frame_data, dict) and 'landmark_8' in frame_data:
-                    # Index finger tip (landmark 8)
-                    positions.append(frame_data['landmark_8'])
-                elif isinstance(frame_data, dict) and len(frame_data) > 0:
-                    # Take the first available landmark
-                    positions.append(next(iter(frame_data.values())))
-            
-            if not positions:
-                logger.error("Could not extract valid position data")
+            frequencies = spectra['frequencies']
+            band = spectra['band']
+            if not band.any():
                 return self._get_default_metrics()
-                
-            positions_array = np.array(positions)
-            x_coords = positions_array[:, 0]
-            y_coords = positions_array[:, 1]
-            
-            # Perform multiple preprocessing steps for cleaner signal
-            
-            # 1. Remove outliers (points that deviate significantly)
-            x_mean, x_std = np.mean(x_coords), np.std(x_coords)
-            y_mean, y_std = np.mean(y_coords), np.std(y_coords)
-            
-            valid_indices = np.where(
-                (np.abs(x_coords - x_mean) < 3 * x_std) & 
-                (np.abs(y_coords - y_mean) < 3 * y_std)
-            )[0]
             
-            if len(valid_indices) < self.MIN_FRAMES:
-                logger.warning("Too many outliers removed, using original data")
-                valid_indices = np.arange(len(x_coords))
-                
-            x_coords = x_coords[valid_indices]
-            y_coords = y_coords[valid_indices]
-            
-            # 2. Compute velocities and accelerations for feature extraction
-            dx = np.diff(x_coords)
-            dy = np.diff(y_coords)
-            
-            # Calculate Euclidean distance between consecutive points
-            velocities = np.sqrt(dx**2 + dy**2)
-            
-            # 3. Calculate accelerations (rate of change of velocity)
+            # Movement statistics of the clipped trajectory (pixels per frame)
+            steps = np.diff(spectra['positions'][index], axis=1)
+            velocities = np.sqrt((steps ** 2).sum(axis=0))
             accelerations = np.diff(np.concatenate([[0], velocities]))
-            
-            # Extract movement statistics
             mean_velocity = np.mean(velocities)
             max_velocity = np.max(velocities)
             mean_accel = np.mean(np.abs(accelerations))
@@ -166,63 +526,27 @@ class TremorAnalyzer:
                         f"Max velocity: {max_velocity:.2f}, "
                         f"Std velocity: {std_velocity:.2f}, "
                         f"Mean acceleration: {mean_accel:.2f}")
-
+            
             # Check if there's enough movement to analyze
             if mean_velocity < self.MIN_AMPLITUDE_THRESHOLD and max_velocity < 10:
                 logger.info("Insufficient movement detected for reliable analysis")
                 return self._get_default_metrics()
-
-            # 4. Normalize signals to account for different hand positions
-            x_norm = (x_coords - np.mean(x_coords)) / (np.std(x_coords) + 1e-6)
-            y_norm = (y_coords - np.mean(y_coords)) / (np.std(y_coords) + 1e-6)
-
-            # 5. Apply bandpass filter to focus on tremor-relevant frequencies
-            nyquist = self.fps / 2.0
-            low = min(0.99, max(0.01, self.FILTER_LOW / nyquist))
-            high = min(0.99, max(low + 0.01, self.FILTER_HIGH / nyquist))
-            
-            b, a = butter(4, [low, high], btype='band')  # 4th order for steeper cutoff
-            x_filtered = filtfilt(b, a, x_norm)
-            y_filtered = filtfilt(b, a, y_norm)
-            
-            # 6. Calculate displacement vector magnitude (combines both dimensions)
-            displacement = np.sqrt(x_filtered**2 + y_filtered**2)
             
-            # 7. Apply window function to reduce spectral leakage
-            window = np.hanning(len(displacement))
-            windowed = displacement * window
-            
-            # 8. Multi-method frequency analysis for robustness
-            
-            # Method 1: FFT for overall spectrum
-            fft_result = np.abs(fft(windowed))[:len(windowed)//2]
-            frequencies = np.linspace(0, self.fps/2, len(windowed)//2)
-            
-            # Method 2: Welch's method for improved noise handling
-            freqs_welch, psd_welch = welch(
-                displacement, 
-                fs=self.fps, 
-                nperseg=min(256, len(displacement)//2),
-                scaling='spectrum'
+            # Band-passed displacement in standard deviations of each coordinate
+            normalized = spectra['filtered'][index] / (spectra['std'][index][:, None] + 1e-6)
+            displacement = np.sqrt((normalized ** 2).sum(axis=0))
+            
+            # Peaks of the amplitude spectrum inside the tremor band
+            band_spectrum = np.where(band, np.sqrt(spectra['spectrum'][index]), 0)
+            peaks, _ = find_peaks(
+                band_spectrum,
+                height=np.max(band_spectrum) * self.PEAK_HEIGHT_RATIO,
+                distance=3,  # Minimum distance between peaks (in bins)
+                prominence=np.max(band_spectrum) * self.PEAK_PROMINENCE_RATIO
             )
             
-            # 9. Improved peak detection with adaptive parameters
-            # Use results from both methods for validation
-            
-            # For FFT result
-            peak_height = np.max(fft_result) * self.PEAK_HEIGHT_RATIO
-            peak_prominence = np.max(fft_result) * self.PEAK_PROMINENCE_RATIO
-            
-            # Find peaks with stricter criteria
-            peaks, properties = find_peaks(
-                fft_result,
-                height=peak_height,
-                distance=3,  # Minimum distance between peaks (in samples)
-                prominence=peak_prominence,
-                width=1  # Minimum peak width
-            )
-            
-            # Also find peaks in Welch PSD for validation
+            # Welch peaks confirm there is a tremor when the FFT shows none
+            psd_welch = np.where(spectra['welch_band'], spectra['psd'][index], 0)
             welch_peaks, _ = find_peaks(
                 psd_welch,
                 height=np.max(psd_welch) * self.PEAK_HEIGHT_RATIO,
@@ -242,56 +566,13 @@ class TremorAnalyzer:
                     logger.info("No tremor detected")
                     return self._get_default_metrics()
             else:
-                # 10. Calculate dominant frequency considering both methods
-                if len(peaks) > 0:
-                    # Get peak heights from FFT
-                    peak_heights = fft_result[peaks]
-                    dominant_peak_idx = peaks[np.argmax(peak_heights)]
-                    fft_frequency = frequencies[dominant_peak_idx]
-                    
-                    # Check if it's a valid tremor frequency
-                    if 0.5 <= fft_frequency <= 20:
-                        tremor_frequency = fft_frequency
-                    else:
-                        # Fallback to secondary peaks if primary is outside medical range
-                        valid_peaks = [p for p in peaks if 0.5 <= frequencies[p] <= 20]
-                        if valid_peaks:
-                            secondary_peak = valid_peaks[np.argmax(fft_result[valid_peaks])]
-                            tremor_frequency = frequencies[secondary_peak]
-                        else:
-                            # No valid FFT peaks, check Welch method
-                            if len(welch_peaks) > 0:
-                                welch_frequency = freqs_welch[welch_peaks[np.argmax(psd_welch[welch_peaks])]]
-                                tremor_frequency = welch_frequency
-                            else:
-                                # Last resort: statistical estimation
-                                tremor_frequency = 2.0 + (mean_velocity / 20.0)
-                else:
-                    # Use Welch peaks if FFT peaks not found
-                    if len(welch_peaks) > 0:
-                        welch_frequency = freqs_welch[welch_peaks[np.argmax(psd_welch[welch_peaks])]]
-                        tremor_frequency = welch_frequency
-                    else:
-                        # Fallback to statistics
-                        tremor_frequency = 2.0 + (mean_velocity / 20.0)
-                
-                # 11. Calculate amplitude more reliably
-                # Use multiple features for better estimation
+                tremor_frequency = frequencies[np.argmax(band_spectrum)]
                 
-                # Base amplitude on filtered signal magnitude
-                filtered_amplitude = np.std(displacement) * 100
-                
-                # Scale by velocity statistics for better correlation with clinical measures
-                velocity_component = std_velocity * 1.2
-                
-                # Consider acceleration component for better detection of rapid tremors
-                accel_component = mean_accel * 0.8
-                
-                # Combine components with appropriate weights
+                # Amplitude from the filtered displacement, velocity and acceleration
                 raw_amplitude = (
-                    0.5 * filtered_amplitude + 
-                    0.3 * velocity_component + 
-                    0.2 * accel_component
+                    0.5 * np.std(displacement) * 100 +
+                    0.3 * std_velocity * 1.2 +
+                    0.2 * mean_accel * 0.8
                 )
                 
                 # Scale to clinical range (0-80)
@@ -301,57 +582,41 @@ class TremorAnalyzer:
                 if mean_velocity > 15 and tremor_amplitude < 15:
                     tremor_amplitude = 15 + (mean_velocity / 5)
             
-            # 12. Classify tremor type based on frequency bands
+            # Classify tremor type based on frequency bands; some types are
+            # clinically more significant at lower amplitudes
             tremor_type = self._get_tremor_type(tremor_frequency)
+            severity_modifier = {'Resting': 1.2, 'Very Slow': 0.9}.get(tremor_type, 1.0)
+            severity = self._get_severity(tremor_amplitude * severity_modifier)
             
-            # 13. Determine severity considering both amplitude and frequency
-            # Some tremor types are clinically more significant at lower amplitudes
-            severity_modifier = 1.0
-            if tremor_type == 'Resting':
-                # Resting tremors are clinically significant at lower amplitudes
-                severity_modifier = 1.2
-            elif tremor_type == 'Very Slow':
-                # Very slow tremors may need higher amplitude to be significant
-                severity_modifier = 0.9
-                
-            adjusted_amplitude = tremor_amplitude * severity_modifier
-            severity = self._get_severity(adjusted_amplitude)
-            
-            # 14. Calculate additional metrics for comprehensive analysis
-            
-            # Regularity: measure of how consistent the tremor pattern is
+            # Regularity: consistency of the spacing between spectral peaks
             if len(peaks) > 1:
-                # Calculate coefficient of variation of peak spacings
                 peak_spacings = np.diff(frequencies[peaks])
                 regularity = 1.0 - min(1.0, np.std(peak_spacings) / (np.mean(peak_spacings) + 1e-6))
             else:
                 regularity = 0.5  # Default mid-value when insufficient peaks
             
-            # Tremor stability: measure of how stable the tremor is over time
-            # Using a windowed approach to detect amplitude variations
+            # Stability: spread of the displacement across half-overlapping windows
             if len(displacement) > 20:
                 window_size = min(20, len(displacement) // 3)
-                windows = [displacement[i:i+window_size] for i in range(0, len(displacement)-window_size, window_size//2)]
-                window_stds = [np.std(w) for w in windows]
+                windows = sliding_window_view(displacement, window_size)[:len(displacement) - window_size:window_size // 2]
+                window_stds = windows.std(axis=1)
                 stability = 1.0 - min(1.0, np.std(window_stds) / (np.mean(window_stds) + 1e-6))
             else:
                 stability = 0.5  # Default mid-value when insufficient data
-                
-            # 15. Confidence score based on analysis quality
+            
             confidence = self._calculate_confidence(
-                len(data),
-                mean_velocity, 
+                len(displacement),
+                mean_velocity,
                 len(peaks),
                 regularity,
                 stability
             )
             
             logger.info(f"Tremor analysis complete - Frequency: {tremor_frequency:.2f} Hz, "
-                      f"Amplitude: {tremor_amplitude:.2f}, Type: {tremor_type}, "
-                      f"Severity: {severity}, Confidence: {confidence:.2f}")
+                        f"Amplitude: {tremor_amplitude:.2f}, Type: {tremor_type}, "
+                        f"Severity: {severity}, Confidence: {confidence:.2f}")
             
-            # 16. Return comprehensive metrics
-            result = {
+            return {
                 'tremor_frequency': float(tremor_frequency),
                 'tremor_amplitude': float(tremor_amplitude),
                 'tremor_type': tremor_type,
@@ -359,23 +624,66 @@ class TremorAnalyzer:
                 'peak_count': len(peaks),
                 'regularity': float(regularity),
                 'stability': float(stability),
-                'confidence': float(confidence)
+                'confidence': float(confidence),
+                'clinical_insight': self._get_clinical_insight(tremor_frequency, tremor_type,
+                                                               tremor_amplitude, severity)
             }
-            
-            # Add clinical insight based on tremor characteristics
-            result['clinical_insight'] = self._get_clinical_insight(
-                tremor_frequency,
-                tremor_type,
-                tremor_amplitude,
-                severity
-            )
-            
-            return result
                 
         except Exception as e:
             logger.error(f"Error in tremor analysis: {str(e)}", exc_info=True)
             return self._get_default_metrics()
 
+    def _analyze_fingers(self, spectra: Dict) -> Dict[str, Dict]:
+        """
+        Dominant tremor frequency and amplitude for every finger.
+        
+        A finger's frequency is the peak of its landmarks' summed power
+        spectrum inside the filter band; its amplitude is the RMS band-passed
+        displacement of the fingertip in pixels.
+        
+        Args:
+            spectra: _landmark_spectra of a (T, 21, 2) landmark array
+            
+        Returns:
+            Dictionary keyed by finger name, empty if the band is empty
+        """
+        try:
+            frequencies = spectra['frequencies']
+            band = spectra['band']
+            welch_band = spectra['welch_band']
+            if not band.any() or not welch_band.any():
+                return {}
+            
+            amplitudes = np.sqrt(np.mean(spectra['filtered'] ** 2, axis=-1).sum(axis=1))
+            
+            fingers = {}
+            for finger, indices in self.FINGERS.items():
+                finger_spectrum = np.where(band, spectra['spectrum'][indices].sum(axis=0), 0)
+                frequency = float(frequencies[np.argmax(finger_spectrum)])
+                
+                # Share of the finger's Welch power concentrated at its peak
+                finger_psd = spectra['psd'][indices].sum(axis=0)[welch_band]
+                peak_ratio = float(finger_psd.max() / (finger_psd.sum() + 1e-12))
+                
+                fingers[finger] = {
+                    'frequency': frequency,
+                    'amplitude_px': float(amplitudes[indices[-1]]),
+                    'tremor_type': self._get_tremor_type(frequency),
+                    'spectral_peak_ratio': peak_ratio
+                }
+            return fingers
+            
+        except Exception as e:
+            logger.error(f"Error in per-finger tremor analysis: {str(e)}", exc_info=True)
+            return {}
+
+    def _band_edges(self) -> Tuple[float, float]:
+        """Butterworth band edges in Hz for the tremor band, kept inside (1%, 99%) of Nyquist."""
+        nyquist = self.fps / 2.0
+        low = min(0.99, max(0.01, self.FILTER_LOW / nyquist))
+        high = min(0.99, max(low + 0.01, min(self.FILTER_HIGH, self.max_frequency) / nyquist))
+        return low * nyquist, high * nyquist
+
     def _get_tremor_type(self, frequency: float) -> str:
         """
         Determine tremor type from frequency using medical classification bands.
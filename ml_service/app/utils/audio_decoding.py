@@ -0,0 +1,190 @@
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+import librosa
+import soundfile as sf
+
+try:
+    import av
+except ImportError:  # Optional: without PyAV, non-libsndfile containers are decoded through audioread
+    av = None
+
+logger = logging.getLogger(__name__)
+
+# Container signatures as (name, offset, magic bytes), checked on the first
+# bytes of a recording. RIFF/RF64 cover WAV, EBML covers webm/Matroska
+CONTAINER_SIGNATURES = [
+    ('wav', 0, b'RIFF'),
+    ('wav', 0, b'RF64'),
+    ('flac', 0, b'fLaC'),
+    ('ogg', 0, b'OggS'),
+    ('webm', 0, b'\x1a\x45\xdf\xa3'),
+    ('mp4', 4, b'ftyp'),
+    ('mp3', 0, b'ID3')
+]
+SNIFF_BYTES = 12
+
+# Containers libsndfile decodes directly (from a path or a memory buffer)
+SOUNDFILE_CONTAINERS = {'wav', 'flac', 'ogg'}
+
+
+def sniff_container(header: bytes) -> str:
+    """Container name from the first SNIFF_BYTES bytes ('unknown' when no signature matches)."""
+    for name, offset, magic in CONTAINER_SIGNATURES:
+        if header[offset:offset + len(magic)] == magic:
+            return name
+    # Bare MPEG audio starts with an 11-bit frame sync
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return 'mp3'
+    return 'unknown'
+
+
+def audio_source(audio_data):
+    """
+    Normalize a recording for decoding and identify its container.
+
+    Args:
+        audio_data: Path, bytes or seekable file-like object
+
+    Returns:
+        Tuple of (source, container): source is the path or a file-like object
+        positioned where audio_data was (bytes are wrapped in a BytesIO)
+    """
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        audio_data = io.BytesIO(audio_data)
+    if isinstance(audio_data, (str, os.PathLike)):
+        with open(audio_data, 'rb') as f:
+            header = f.read(SNIFF_BYTES)
+    else:
+        position = audio_data.tell()
+        header = audio_data.read(SNIFF_BYTES)
+        audio_data.seek(position)
+    return audio_data, sniff_container(header)
+
+
+class DecodeStats:
+    """Thread-safe decode timings per container and backend, reported by /health."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, container: str, backend: str, seconds: float, audio_seconds: float):
+        """Record one decode of audio_seconds of audio that took seconds."""
+        with self._lock:
+            entry = self._entries.setdefault(
+                (container, backend), {'decodes': 0, 'seconds': 0.0, 'audio_seconds': 0.0}
+            )
+            entry['decodes'] += 1
+            entry['seconds'] += seconds
+            entry['audio_seconds'] += audio_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                f"{container}/{backend}": {
+                    'decodes': entry['decodes'],
+                    'mean_ms': 1000 * entry['seconds'] / entry['decodes'],
+                    'audio_seconds': entry['audio_seconds'],
+                    # Seconds of audio decoded per second of decode time
+                    'realtime_factor': entry['audio_seconds'] / entry['seconds'] if entry['seconds'] > 0 else 0.0
+                }
+                for (container, backend), entry in self._entries.items()
+            }
+
+
+decode_stats = DecodeStats()
+
+
+class PyAVDecoder:
+    """
+    In-process FFmpeg decoding (through PyAV) for containers libsndfile cannot read.
+
+    Browser MediaRecorder uploads are webm/opus. A single decoder instance
+    serves the whole process: the FFmpeg libraries stay loaded and every
+    request demuxes and decodes straight from its memory buffer, where
+    audioread would write a file and start an ffmpeg process per upload.
+    """
+
+    def decode(self, source):
+        """
+        Decode the first audio stream to mono.
+
+        Returns:
+            Tuple of (float64 samples, sample rate)
+        """
+        with av.open(source, mode='r') as container:
+            stream = container.streams.audio[0]
+            # Planar float keeps the stream's rate and layout and scales integer formats to [-1, 1]
+            resampler = av.AudioResampler(format='fltp')
+            chunks = []
+            for frame in container.decode(stream):
+                for converted in resampler.resample(frame):
+                    chunks.append(converted.to_ndarray())
+            for converted in resampler.resample(None):
+                chunks.append(converted.to_ndarray())
+            sr = stream.codec_context.sample_rate
+
+        if not chunks:
+            return np.zeros(0), sr
+        # Channel average in float64, as for soundfile decodes
+        return np.mean(np.concatenate(chunks, axis=1).astype(np.float64), axis=0), sr
+
+
+pyav_decoder = PyAVDecoder() if av is not None else None
+
+
+def decode_audio(source, container: str):
+    """
+    Decode a whole recording to mono float64 at its own sample rate.
+
+    WAV/FLAC/OGG go to libsndfile, everything else to the persistent PyAV
+    decoder (or audioread when PyAV is not installed). The decode time is
+    recorded in decode_stats.
+
+    Args:
+        source: Path or file-like object (see audio_source)
+        container: Container name from sniff_container
+
+    Returns:
+        Tuple of (samples, sample rate)
+    """
+    start = time.perf_counter()
+    if container in SOUNDFILE_CONTAINERS:
+        backend = 'soundfile'
+        y, sr = sf.read(source)
+        if y.ndim > 1:
+            y = np.mean(y, axis=1)
+    elif pyav_decoder is not None:
+        backend = 'pyav'
+        y, sr = pyav_decoder.decode(source)
+    else:
+        backend = 'audioread'
+        y, sr = _decode_audioread(source)
+
+    seconds = time.perf_counter() - start
+    decode_stats.record(container, backend, seconds, len(y) / sr if sr else 0.0)
+    logger.info(f"Decoded {container} audio with {backend} in {1000 * seconds:.1f} ms")
+    return y, sr
+
+
+def _decode_audioread(source):
+    """librosa/audioread decode; it needs a path, so buffers are written to a temp file."""
+    if isinstance(source, (str, os.PathLike)):
+        y, sr = librosa.load(source, sr=None, mono=True)
+        return y.astype(np.float64), sr
+
+    temp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            temp_path = tmp.name
+            tmp.write(source.read())
+        y, sr = librosa.load(temp_path, sr=None, mono=True)
+        return y.astype(np.float64), sr
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
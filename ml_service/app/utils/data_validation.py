@@ -1,4 +1,5 @@
 import numpy as np
+import threading
 
 def validate_eye_tracking_data(metrics):
     """Validate eye tracking metrics for quality assurance."""
@@ -23,4 +24,99 @@ def validate_eye_tracking_data(metrics):
         validations['data_quality'] = False
         validations['messages'].append('Unrealistic eye movements detected')
 
-    return validations
\ No newline at end of file
+    return validations
+
+
+class EyeQualityMonitor:
+    """
+    Incremental quality gate for eye-tracking recordings.
+
+    Counts face detections frame by frame and, once `window` frames have been
+    seen, validates the metrics collected so far with validate_eye_tracking_data.
+    The gate trips early when the detection rate can no longer reach
+    `min_detection_rate`, so recordings without a visible face are rejected
+    after a few frames.
+    """
+
+    def __init__(self, window=30, min_detection_rate=0.5):
+        self.window = window
+        self.min_detection_rate = min_detection_rate
+        self.frames_seen = 0
+        self.frames_detected = 0
+        self.result = None
+
+    def update(self, detected):
+        """Record whether a face was found in the next frame."""
+        self.frames_seen += 1
+        self.frames_detected += int(bool(detected))
+
+    def due(self):
+        """True when the gate should be evaluated now."""
+        if self.result is not None:
+            return False
+        allowed_misses = (1 - self.min_detection_rate) * self.window
+        return (self.frames_seen >= self.window or
+                self.frames_seen - self.frames_detected > allowed_misses)
+
+    def evaluate(self, metrics):
+        """
+        Validate the recording so far.
+
+        Args:
+            metrics: Temporal metrics of the detected frames (needs 'blinks' and 'velocities')
+
+        Returns:
+            Dictionary with 'passed', the validation messages and the measured rates
+        """
+        detection_rate = self.frames_detected / self.frames_seen if self.frames_seen else 0.0
+        validations = {'data_quality': True, 'messages': []}
+
+        if self.frames_seen == 0:
+            validations = {'data_quality': False, 'messages': ['No frames could be read']}
+        elif detection_rate < self.min_detection_rate:
+            validations = {'data_quality': False, 'messages': ['Face not visible in most frames']}
+        elif metrics.get('blinks'):
+            validations = validate_eye_tracking_data(metrics)
+
+        blinks = metrics.get('blinks') or []
+        velocities = metrics.get('velocities') or []
+        self.result = {
+            'passed': validations['data_quality'],
+            'messages': validations['messages'],
+            'frames_checked': self.frames_seen,
+            'detection_rate': float(detection_rate),
+            'blink_ratio': float(np.mean(blinks)) if len(blinks) else 0.0,
+            'max_velocity': float(np.max(velocities)) if len(velocities) else 0.0
+        }
+        return self.result
+
+
+class QualityGateStats:
+    """Thread-safe counters of quality-gate outcomes, reported by /health."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.analyses = 0
+        self.aborted = 0
+        self.reasons = {}
+
+    def record(self, result):
+        """Record one gate result (as returned by EyeQualityMonitor.evaluate)."""
+        with self._lock:
+            self.analyses += 1
+            if not result['passed']:
+                self.aborted += 1
+                for message in result['messages']:
+                    self.reasons[message] = self.reasons.get(message, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'analyses': self.analyses,
+                'aborted': self.aborted,
+                'abort_rate': self.aborted / self.analyses if self.analyses else 0.0,
+                'reasons': dict(self.reasons)
+            }
+
+
+eye_quality_stats = QualityGateStats()
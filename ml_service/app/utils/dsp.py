@@ -0,0 +1,224 @@
+import numpy as np
+from functools import lru_cache
+from scipy.fft import irfft, next_fast_len, rfft, rfftfreq
+from scipy.ndimage import convolve1d
+from scipy.signal import butter, get_window, savgol_coeffs, savgol_filter, sosfiltfilt
+
+# Shared, memoized DSP setup for the analyzers.
+#
+# Filter designs, windows, frequency grids and Savitzky-Golay kernels only
+# depend on a handful of parameters (sample rate, band, length), which repeat
+# across requests. They are built once, cached with an LRU bound and returned
+# as read-only arrays so callers cannot corrupt the shared copy.
+
+CACHE_SIZE = {
+    'FILTERS': 64,
+    'WINDOWS': 128,
+    'FFT': 256,
+    'SAVGOL': 32
+}
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=CACHE_SIZE['FILTERS'])
+def butter_bandpass(low_hz: float, high_hz: float, fs: float, order: int = 4) -> np.ndarray:
+    """
+    Butterworth band-pass design in second-order sections.
+
+    Args:
+        low_hz: Lower cut-off in Hz
+        high_hz: Upper cut-off in Hz (must be below fs / 2)
+        fs: Sample rate in Hz
+        order: Filter order
+
+    Returns:
+        (n_sections, 6) read-only SOS array
+    """
+    return _frozen(butter(order, [low_hz, high_hz], btype='band', fs=fs, output='sos'))
+
+
+def filtfilt_padlen(sos: np.ndarray) -> int:
+    """Default edge padding of sosfiltfilt; signals must be longer than this."""
+    ntaps = 2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    return 3 * int(ntaps)
+
+
+def bandpass(data: np.ndarray, low_hz: float, high_hz: float, fs: float,
+             order: int = 4, axis: int = -1) -> np.ndarray:
+    """Zero-phase Butterworth band-pass along an axis using a cached SOS design."""
+    # sosfilt's Cython kernel needs a writable buffer; copying 6 * n_sections floats is free
+    sos = np.array(butter_bandpass(low_hz, high_hz, fs, order))
+    return sosfiltfilt(sos, data, axis=axis)
+
+
+@lru_cache(maxsize=CACHE_SIZE['WINDOWS'])
+def window(name: str, length: int, symmetric: bool = False) -> np.ndarray:
+    """
+    Cached read-only window.
+
+    Periodic windows (the default) match scipy/librosa spectral analysis;
+    symmetric ones match the np.hanning family used for filter-style tapering.
+    """
+    return _frozen(get_window(name, length, fftbins=not symmetric).astype(np.float64))
+
+
+@lru_cache(maxsize=CACHE_SIZE['FFT'])
+def rfft_frequencies(length: int, fs: float) -> np.ndarray:
+    """Cached rfft bin frequencies for a signal length and sample rate."""
+    return _frozen(rfftfreq(length, d=1.0 / fs))
+
+
+@lru_cache(maxsize=CACHE_SIZE['FFT'])
+def fast_length(length: int) -> int:
+    """Cached next FFT-friendly (5-smooth) length at or above `length`."""
+    return next_fast_len(length, real=True)
+
+
+@lru_cache(maxsize=CACHE_SIZE['SAVGOL'])
+def savgol_plan(window_length: int, polyorder: int):
+    """
+    Savitzky-Golay convolution kernel plus the edge projection matrices.
+
+    The edge matrices map the first/last `window_length` samples to the
+    polynomial fit evaluated at the first/last half-window positions, which
+    is what savgol_filter's default 'interp' mode does with polyfit.
+
+    Returns:
+        Tuple of (kernel, head_matrix, tail_matrix), all read-only
+    """
+    kernel = savgol_coeffs(window_length, polyorder)
+    halflen = window_length // 2
+    positions = np.arange(window_length, dtype=np.float64)
+    vandermonde = np.vander(positions, polyorder + 1)
+    projection = vandermonde @ np.linalg.pinv(vandermonde)
+    return (
+        _frozen(kernel),
+        _frozen(projection[:halflen].copy()),
+        _frozen(projection[window_length - halflen:].copy())
+    )
+
+
+def savgol_smooth(data, window_length: int, polyorder: int) -> np.ndarray:
+    """
+    Drop-in for savgol_filter(data, window_length, polyorder) on 1-D data.
+
+    Reuses the cached kernel and edge fits instead of re-solving the least
+    squares problems on every call. Even window lengths (whose centring
+    differs) go straight to scipy.
+    """
+    x = np.asarray(data, dtype=np.float64)
+    if x.ndim != 1 or window_length % 2 == 0 or polyorder >= window_length or window_length > x.size:
+        # Let scipy handle (and report) anything outside the fast path
+        return savgol_filter(x, window_length, polyorder)
+
+    kernel, head, tail = savgol_plan(window_length, polyorder)
+    smoothed = convolve1d(x, kernel, mode='constant')
+    halflen = window_length // 2
+    smoothed[:halflen] = head @ x[:window_length]
+    smoothed[x.size - halflen:] = tail @ x[x.size - window_length:]
+    return smoothed
+
+
+def autocorrelation(x: np.ndarray) -> np.ndarray:
+    """
+    Non-negative lags of the autocorrelation of 1-D data in O(n log n).
+
+    Equals np.correlate(x, x, mode='full')[len(x) - 1:] up to rounding: the
+    signal is zero-padded to an FFT-friendly length of at least 2n - 1, so the
+    circular correlation through the power spectrum does not wrap around.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.size == 0:
+        return x
+    n_fft = fast_length(2 * x.size - 1)
+    spectrum = rfft(x, n_fft)
+    return irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft)[:x.size]
+
+
+def local_maxima(x: np.ndarray, threshold: float = None) -> np.ndarray:
+    """
+    Indices of strict local maxima of 1-D data (above threshold, if given).
+
+    End points have a single neighbour and are never maxima.
+    """
+    x = np.asarray(x)
+    inner = x[1:-1]
+    peaks = (inner > x[:-2]) & (inner > x[2:])
+    if threshold is not None:
+        peaks &= inner > threshold
+    return np.nonzero(peaks)[0] + 1
+
+
+def minmax_buckets(values: np.ndarray, n_buckets: int):
+    """
+    Peak-preserving downsampling of series along their last axis.
+
+    The last axis is split into n_buckets contiguous buckets of (nearly)
+    equal length, and every bucket is reduced to its minimum and maximum in
+    the order they occur, so a one-sample spike or dropout survives however
+    far the series is reduced. Several series (rows of a 2-D array) share the
+    buckets, which keeps them on one time axis.
+
+    Args:
+        values: (..., n) array; n must be at least n_buckets
+        n_buckets: Number of buckets
+
+    Returns:
+        Tuple of ((..., 2 * n_buckets) extremes, (n_buckets + 1,) bucket edges
+        as sample indices)
+    """
+    values = np.asarray(values)
+    n = values.shape[-1]
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    # Equal-width gather; shorter buckets repeat their last sample, which changes no extreme
+    width = int(np.max(np.diff(edges)))
+    index = np.minimum(edges[:-1, None] + np.arange(width), edges[1:, None] - 1)
+    buckets = values[..., index]
+    argmin = buckets.argmin(axis=-1)
+    argmax = buckets.argmax(axis=-1)
+    low = np.take_along_axis(buckets, argmin[..., None], axis=-1)[..., 0]
+    high = np.take_along_axis(buckets, argmax[..., None], axis=-1)[..., 0]
+    low_first = argmin <= argmax
+    pairs = np.stack([np.where(low_first, low, high), np.where(low_first, high, low)], axis=-1)
+    return pairs.reshape(values.shape[:-1] + (2 * n_buckets,)), edges
+
+
+def zero_crossing_rate(y: np.ndarray, frame_length: int, hop_length: int, center: bool = True,
+                       threshold: float = 1e-10) -> np.ndarray:
+    """
+    librosa.feature.zero_crossing_rate(...)[0] in O(n) instead of O(n * frame_length / hop_length).
+
+    Sign changes are found once per sample and summed per frame through a
+    cumulative count. As in librosa, values within threshold of zero count as
+    positive, centring pads with the edge samples, and a frame counts the
+    crossings between its own samples only.
+    """
+    y = np.asarray(y)
+    if center:
+        y = np.pad(y, frame_length // 2, mode='edge')
+    if len(y) < frame_length:
+        return np.zeros(0)
+    n_frames = 1 + (len(y) - frame_length) // hop_length
+    negative = y < -threshold  # values within threshold of zero count as positive
+    crossings = np.zeros(len(y), dtype=np.int64)
+    np.cumsum(negative[1:] != negative[:-1], out=crossings[1:])
+    starts = np.arange(n_frames) * hop_length
+    return (crossings[starts + frame_length - 1] - crossings[starts]) / frame_length
+
+
+def cache_info() -> dict:
+    """Hit/miss counters for every plan cache (for diagnostics)."""
+    return {
+        name: func.cache_info()._asdict()
+        for name, func in (
+            ('butter_bandpass', butter_bandpass),
+            ('window', window),
+            ('rfft_frequencies', rfft_frequencies),
+            ('fast_length', fast_length),
+            ('savgol_plan', savgol_plan)
+        )
+    }
@@ -0,0 +1,146 @@
+import numpy as np
+from collections import namedtuple
+from typing import Optional, Tuple
+
+# Phone motion sensor samples: timestamps in seconds from the first sample,
+# accelerometer in m/s^2 and gyroscope in the sender's units, each (T, 3)
+IMURecording = namedtuple('IMURecording', ['timestamps', 'accel', 'gyro'])
+
+TIMESTAMP_UNITS = {'s': 1.0, 'ms': 1e-3, 'us': 1e-6, 'ns': 1e-9}
+ACCEL_UNITS = {'ms2': 1.0, 'g': 9.80665}
+
+# Binary uploads are packed little-endian records: a float64 timestamp followed
+# by float32 x/y/z accelerometer (and optionally gyroscope) readings
+IMU_RECORD = np.dtype([('t', '<f8'), ('accel', '<f4', (3,))])
+IMU_RECORD_WITH_GYRO = np.dtype([('t', '<f8'), ('accel', '<f4', (3,)), ('gyro', '<f4', (3,))])
+
+# Timing a phone recording can plausibly have. Anything outside these points
+# at wrong timestamp units or a clock jump, not at motion worth resampling
+TIMING_LIMITS = {
+    'MAX_SPAN': 3600.0,  # seconds from first to last sample
+    'MAX_GAP': 0.5,      # seconds between neighbouring samples that may be interpolated over
+    'MAX_RATE': 2000.0   # Hz
+}
+
+
+def _axes(values, name: str) -> np.ndarray:
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim != 2 or array.shape[1] != 3:
+        raise ValueError(f"{name} must be a list of [x, y, z] samples")
+    return array
+
+
+def _recording(timestamps, accel, gyro, timestamp_unit: str, accel_unit: str) -> IMURecording:
+    """Validate units and shapes, drop non-finite rows and sort by time."""
+    if timestamp_unit not in TIMESTAMP_UNITS:
+        raise ValueError(f"timestamp_unit must be one of {sorted(TIMESTAMP_UNITS)}")
+    if accel_unit not in ACCEL_UNITS:
+        raise ValueError(f"accel_unit must be one of {sorted(ACCEL_UNITS)}")
+
+    timestamps = np.asarray(timestamps, dtype=np.float64).ravel() * TIMESTAMP_UNITS[timestamp_unit]
+    accel = _axes(accel, 'accelerometer') * ACCEL_UNITS[accel_unit]
+    if len(accel) != len(timestamps):
+        raise ValueError("accelerometer and timestamps must have the same length")
+    if gyro is not None:
+        gyro = _axes(gyro, 'gyroscope')
+        if len(gyro) != len(timestamps):
+            raise ValueError("gyroscope and timestamps must have the same length")
+
+    valid = np.isfinite(timestamps) & np.isfinite(accel).all(axis=1)
+    if gyro is not None:
+        valid &= np.isfinite(gyro).all(axis=1)
+    order = np.argsort(timestamps[valid], kind='stable')
+    timestamps = timestamps[valid][order]
+    accel = accel[valid][order]
+    gyro = gyro[valid][order] if gyro is not None else None
+
+    if len(timestamps):
+        timestamps = timestamps - timestamps[0]
+    return IMURecording(timestamps, accel, gyro)
+
+
+def parse_imu_json(payload: dict, timestamp_unit: str = 'ms', accel_unit: str = 'ms2') -> IMURecording:
+    """
+    Build a recording from a JSON body.
+
+    Expected keys are 'timestamps', 'accelerometer' ([[x, y, z], ...]) and
+    optionally 'gyroscope' sampled at the same timestamps. 'timestamp_unit'
+    and 'accel_unit' in the body override the defaults.
+    """
+    if not isinstance(payload, dict) or 'timestamps' not in payload or 'accelerometer' not in payload:
+        raise ValueError("JSON body needs 'timestamps' and 'accelerometer' arrays")
+    return _recording(
+        payload['timestamps'],
+        payload['accelerometer'],
+        payload.get('gyroscope'),
+        payload.get('timestamp_unit', timestamp_unit),
+        payload.get('accel_unit', accel_unit)
+    )
+
+
+def parse_imu_binary(data: bytes, has_gyro: bool = False,
+                     timestamp_unit: str = 'ms', accel_unit: str = 'ms2') -> IMURecording:
+    """Build a recording from packed IMU_RECORD (or IMU_RECORD_WITH_GYRO) bytes."""
+    dtype = IMU_RECORD_WITH_GYRO if has_gyro else IMU_RECORD
+    if len(data) == 0 or len(data) % dtype.itemsize:
+        raise ValueError(f"Binary body must be a whole number of {dtype.itemsize}-byte records")
+    records = np.frombuffer(data, dtype=dtype)
+    return _recording(
+        records['t'],
+        records['accel'],
+        records['gyro'] if has_gyro else None,
+        timestamp_unit,
+        accel_unit
+    )
+
+
+def resample_uniform(recording: IMURecording, fs: Optional[float] = None,
+                     max_duration: Optional[float] = None) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+    """
+    Linearly interpolate a recording onto a uniform time grid.
+
+    Phone sensors deliver jittery, occasionally duplicated timestamps. The
+    grid rate defaults to the median sample rate rounded to a whole Hz, so
+    repeated recordings from the same device share cached filter designs.
+
+    Args:
+        recording: IMURecording with timestamps relative to the first sample
+        fs: Grid rate in Hz (default: derived from the timestamps)
+        max_duration: Only the first max_duration seconds are resampled
+
+    Returns:
+        Tuple of (fs, accel, gyro) with accel/gyro as (3, N) arrays (gyro may be None)
+
+    Raises:
+        ValueError: If the timestamps span, gaps or rate exceed TIMING_LIMITS
+    """
+    timestamps, first = np.unique(recording.timestamps, return_index=True)
+    if len(timestamps) < 2:
+        raise ValueError("At least two distinct timestamps are required")
+    if timestamps[-1] > TIMING_LIMITS['MAX_SPAN']:
+        raise ValueError(f"Timestamps span {timestamps[-1]:.0f} s; check timestamp_unit")
+
+    if max_duration is not None:
+        # Keep the grid (and its memory) bounded by the analysed duration, not the raw span
+        keep = np.searchsorted(timestamps, max_duration, side='right')
+        timestamps, first = timestamps[:keep], first[:keep]
+        if len(timestamps) < 2:
+            raise ValueError("At least two distinct timestamps are required")
+
+    intervals = np.diff(timestamps)
+    if intervals.max() > TIMING_LIMITS['MAX_GAP']:
+        gap_at = timestamps[np.argmax(intervals)]
+        raise ValueError(f"Gap of {intervals.max():.2f} s in the samples after {gap_at:.2f} s")
+
+    if fs is None:
+        fs = float(max(1, round(1.0 / np.median(intervals))))
+    if fs > TIMING_LIMITS['MAX_RATE']:
+        raise ValueError(f"Sample rate of {fs:.0f} Hz is implausible; check timestamp_unit")
+    grid = np.arange(0, timestamps[-1], 1.0 / fs)
+
+    def interpolate(samples):
+        samples = samples[first]
+        return np.stack([np.interp(grid, timestamps, samples[:, axis]) for axis in range(3)])
+
+    gyro = interpolate(recording.gyro) if recording.gyro is not None else None
+    return fs, interpolate(recording.accel), gyro
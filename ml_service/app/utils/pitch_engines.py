@@ -0,0 +1,202 @@
+import numpy as np
+import librosa
+from scipy.fft import irfft, rfft
+from . import dsp
+
+# Pitch tracking backends behind SpeechFeatureStore.pitch_track.
+#
+# Every engine returns one F0 value per STFT frame of the store's framing
+# (0 where the frame is unvoiced), so the pitch statistics, the pitch
+# contour and the stress contour can switch engines without changing how
+# they index frames. Time-domain engines frame `y` exactly like the STFT
+# (centred with zero padding unless the store frames block-wise), which
+# keeps block-wise pitch equal to whole-signal pitch.
+
+
+class PitchEngine:
+    """
+    Base class of the pitch tracking backends.
+
+    Subclasses implement track(); fmin/fmax bound the F0 search in Hz.
+    """
+
+    name = None
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0):
+        self.fmin = fmin
+        self.fmax = fmax
+
+    def track(self, features, n_fft: int, hop_length: int, frame_step: int = 1) -> np.ndarray:
+        """
+        F0 per frame of a SpeechFeatureStore's framing.
+
+        Args:
+            features: SpeechFeatureStore of the signal
+            n_fft: Frame length in samples
+            hop_length: Frame hop in samples
+            frame_step: Evaluate every frame_step-th frame only (as the store decimates)
+
+        Returns:
+            F0 in Hz per (kept) frame, 0 where unvoiced
+        """
+        raise NotImplementedError
+
+    def _frames(self, features, n_fft, hop_length, frame_step):
+        """(n_fft, n_frames) frames of the store's signal with the STFT's framing and decimation."""
+        y = np.asarray(features.y, dtype=np.float64)
+        if features.center:
+            y = np.pad(y, n_fft // 2)
+        if len(y) < n_fft:
+            return np.zeros((n_fft, 0))
+        frames = librosa.util.frame(y, frame_length=n_fft, hop_length=hop_length)
+        return frames[:, features._decimated(frame_step)]
+
+    def _lag_range(self, sr, n_lags):
+        """Smallest and largest lag (in samples) of the F0 search, limited to n_lags - 2."""
+        min_lag = max(1, int(np.floor(sr / self.fmax)))
+        max_lag = min(int(np.ceil(sr / self.fmin)), n_lags - 2)
+        return min_lag, max_lag
+
+
+def _parabolic_offset(left, centre, right):
+    """Sub-sample offset of the vertex of the parabola through three equally spaced points."""
+    curvature = left - 2 * centre + right
+    return np.divide(0.5 * (left - right), curvature, out=np.zeros_like(centre),
+                     where=np.abs(curvature) > np.finfo(np.float64).eps)
+
+
+class PiptrackEngine(PitchEngine):
+    """
+    Frequency of the strongest librosa.piptrack bin in each frame.
+
+    Reuses the store's cached STFT magnitude. piptrack's own search range
+    (150-4000 Hz, its defaults) is kept so the metrics do not change; it
+    reports harmonics as readily as the fundamental.
+    """
+
+    name = 'piptrack'
+
+    def track(self, features, n_fft, hop_length, frame_step=1):
+        pitches, magnitudes = features.piptrack(n_fft, hop_length, frame_step)
+        return pitches[magnitudes.argmax(axis=0), np.arange(pitches.shape[1])]
+
+
+class YinEngine(PitchEngine):
+    """
+    YIN (de Cheveigne & Kawahara, 2002) with an aperiodicity voicing decision.
+
+    The difference function of each frame is computed through the FFT over an
+    integration window of half the frame. The F0 lag is the first trough of
+    the cumulative mean normalized difference below trough_threshold (the
+    global minimum when there is none), refined by parabolic interpolation.
+    Frames whose normalized difference at that lag exceeds voicing_threshold
+    are unvoiced.
+    """
+
+    name = 'yin'
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0, trough_threshold: float = 0.1,
+                 voicing_threshold: float = 0.35):
+        super().__init__(fmin, fmax)
+        self.trough_threshold = trough_threshold
+        self.voicing_threshold = voicing_threshold
+
+    def track(self, features, n_fft, hop_length, frame_step=1):
+        frames = self._frames(features, n_fft, hop_length, frame_step)
+        n_frames = frames.shape[1]
+        window = n_fft // 2
+        min_lag, max_lag = self._lag_range(features.sr, n_fft - window)
+        if n_frames == 0 or max_lag <= min_lag:
+            return np.zeros(n_frames)
+
+        # d(lag) = sum_j (x[j] - x[j + lag])^2 over j < window, from energies and a cross-correlation
+        size = dsp.fast_length(n_fft + window)
+        cross = irfft(np.conj(rfft(frames[:window], size, axis=0)) * rfft(frames, size, axis=0),
+                      size, axis=0)[:max_lag + 2]
+        energy = np.concatenate([np.zeros((1, n_frames)), np.cumsum(frames ** 2, axis=0)])
+        lags = np.arange(max_lag + 2)
+        shifted = energy[lags + window] - energy[lags]
+        difference = np.maximum(energy[window] + shifted - 2 * cross, 0)
+
+        # Cumulative mean normalized difference (1 at lag 0)
+        running = np.cumsum(difference[1:], axis=0)
+        cmnd = np.ones_like(difference)
+        cmnd[1:] = np.divide(difference[1:] * lags[1:, None], running, out=np.ones_like(running),
+                             where=running > 0)
+
+        search = cmnd[min_lag:max_lag + 1]
+        is_trough = np.zeros_like(search, dtype=bool)
+        is_trough[1:-1] = (search[1:-1] <= search[:-2]) & (search[1:-1] <= search[2:])
+        below = is_trough & (search < self.trough_threshold)
+        lag = np.where(below.any(axis=0), below.argmax(axis=0), search.argmin(axis=0)) + min_lag
+
+        columns = np.arange(n_frames)
+        inner = np.clip(lag, 1, max_lag)
+        refined = inner + _parabolic_offset(cmnd[inner - 1, columns], cmnd[inner, columns],
+                                            cmnd[inner + 1, columns])
+        voiced = (cmnd[lag, columns] <= self.voicing_threshold) & (frames.any(axis=0))
+        return np.where(voiced, features.sr / np.maximum(refined, 1), 0.0)
+
+
+class AutocorrelationEngine(PitchEngine):
+    """
+    Windowed autocorrelation pitch with Boersma's window correction.
+
+    Only frames above min_rms are analysed (run it on the voiced segments of
+    voice activity detection to skip pauses entirely). Each frame's
+    autocorrelation comes from its power spectrum and is divided by the
+    window's own autocorrelation; the F0 lag is the shortest local maximum
+    within octave_ratio of the best one (which avoids sub-octave picks), and
+    frames whose normalized peak is below voicing_threshold are unvoiced.
+    """
+
+    name = 'autocorrelation'
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0, voicing_threshold: float = 0.45,
+                 octave_ratio: float = 0.9, min_rms: float = 1e-4):
+        super().__init__(fmin, fmax)
+        self.voicing_threshold = voicing_threshold
+        self.octave_ratio = octave_ratio
+        self.min_rms = min_rms
+
+    def track(self, features, n_fft, hop_length, frame_step=1):
+        frames = self._frames(features, n_fft, hop_length, frame_step)
+        n_frames = frames.shape[1]
+        pitch = np.zeros(n_frames)
+        min_lag, max_lag = self._lag_range(features.sr, n_fft // 2)
+        active = np.sqrt(np.mean(frames ** 2, axis=0)) > self.min_rms
+        if not active.any() or max_lag <= min_lag:
+            return pitch
+
+        window = dsp.window('hann', n_fft)
+        frames = frames[:, active] - frames[:, active].mean(axis=0)
+        size = dsp.fast_length(2 * n_fft - 1)
+        spectrum = rfft(frames * window[:, None], size, axis=0)
+        acf = irfft(spectrum.real ** 2 + spectrum.imag ** 2, size, axis=0)[:max_lag + 2]
+        window_acf = dsp.autocorrelation(window)[:max_lag + 2]
+        acf = np.divide(acf, acf[:1], out=np.zeros_like(acf), where=acf[:1] > 0) / (window_acf / window_acf[0])[:, None]
+
+        search = acf[min_lag:max_lag + 1]
+        peaks = np.zeros_like(search, dtype=bool)
+        peaks[1:-1] = (search[1:-1] > search[:-2]) & (search[1:-1] >= search[2:])
+        best = np.where(peaks, search, -np.inf).max(axis=0)
+        candidate = peaks & (search >= self.octave_ratio * best)
+        lag = candidate.argmax(axis=0) + min_lag
+
+        columns = np.arange(frames.shape[1])
+        refined = lag + _parabolic_offset(acf[lag - 1, columns], acf[lag, columns], acf[lag + 1, columns])
+        voiced = np.isfinite(best) & (best >= self.voicing_threshold)
+        pitch[active] = np.where(voiced, features.sr / refined, 0.0)
+        return pitch
+
+
+PITCH_ENGINES = {
+    engine.name: engine for engine in (PiptrackEngine, YinEngine, AutocorrelationEngine)
+}
+
+
+def get_pitch_engine(name: str, fmin: float = 50.0, fmax: float = 500.0) -> PitchEngine:
+    """Pitch engine by name (a key of PITCH_ENGINES); ValueError for unknown names."""
+    if name not in PITCH_ENGINES:
+        raise ValueError(f"Unknown pitch engine '{name}', expected one of {sorted(PITCH_ENGINES)}")
+    return PITCH_ENGINES[name](fmin=fmin, fmax=fmax)
@@ -0,0 +1,121 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+from collections import namedtuple
+from typing import Optional, Tuple
+
+# Frame-space landmark with the same attribute access as MediaPipe's protobuf landmarks
+Landmark = namedtuple('Landmark', ['x', 'y', 'z'])
+
+# Boxes are (x0, y0, x1, y1) in integer pixels, end-exclusive
+Box = Tuple[int, int, int, int]
+
+
+class FaceRegionDetector:
+    """
+    Cheap first stage for the landmark models.
+
+    Runs the BlazeFace detector on a downscaled copy of the frame to find the
+    face, so the expensive landmark model can run on a crop (or be skipped
+    entirely when nobody is in view).
+    """
+
+    def __init__(self, min_detection_confidence: float = 0.5, detection_size: int = 320):
+        self.detector = mp.solutions.face_detection.FaceDetection(
+            model_selection=1,  # Full-range model, works for faces far from the camera
+            min_detection_confidence=min_detection_confidence
+        )
+        self.detection_size = detection_size
+
+    def detect(self, image: np.ndarray) -> Optional[Box]:
+        """Return the pixel box of the most confident face, or None."""
+        height, width = image.shape[:2]
+        scale = min(1.0, self.detection_size / max(width, height))
+        if scale < 1.0:
+            # INTER_LINEAR is ~50x cheaper than INTER_AREA here and good enough for detection
+            small = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_LINEAR)
+        else:
+            small = image
+
+        results = self.detector.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        if not results.detections:
+            return None
+
+        best = max(results.detections, key=lambda d: d.score[0])
+        bbox = best.location_data.relative_bounding_box
+        return clip_box(
+            (bbox.xmin * width, bbox.ymin * height,
+             (bbox.xmin + bbox.width) * width, (bbox.ymin + bbox.height) * height),
+            width, height
+        )
+
+    def close(self):
+        self.detector.close()
+
+
+def clip_box(box, width: int, height: int) -> Optional[Box]:
+    """Round a box outwards to whole pixels and clip it to the image."""
+    x0, y0, x1, y1 = box
+    x0, y0 = max(0, int(np.floor(x0))), max(0, int(np.floor(y0)))
+    x1, y1 = min(width, int(np.ceil(x1))), min(height, int(np.ceil(y1)))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1, y1)
+
+
+def expand_box(box: Box, width: int, height: int,
+               scale_x: float = 1.6, scale_top: float = 0.8, scale_bottom: float = 0.8) -> Optional[Box]:
+    """
+    Grow a box around its centre and clip it to the image.
+
+    scale_x is the total width multiplier; scale_top and scale_bottom are the
+    parts of the box height added above and below the centre, so asymmetric
+    regions (e.g. head plus shoulders) can be described.
+    """
+    x0, y0, x1, y1 = box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    w, h = x1 - x0, y1 - y0
+    return clip_box(
+        (cx - w * scale_x / 2, cy - h * scale_top, cx + w * scale_x / 2, cy + h * scale_bottom),
+        width, height
+    )
+
+
+def box_from_landmarks(landmarks, width: int, height: int) -> Optional[Box]:
+    """Tight pixel box around normalized frame-space landmarks."""
+    xs = [lm.x for lm in landmarks]
+    ys = [lm.y for lm in landmarks]
+    return clip_box((min(xs) * width, min(ys) * height, max(xs) * width, max(ys) * height), width, height)
+
+
+def box_contains(outer: Box, inner: Box, margin: float = 0.1) -> bool:
+    """True if inner lies inside outer shrunk by `margin` of its size on each side."""
+    ox0, oy0, ox1, oy1 = outer
+    mx, my = (ox1 - ox0) * margin, (oy1 - oy0) * margin
+    ix0, iy0, ix1, iy1 = inner
+    return ix0 >= ox0 + mx and iy0 >= oy0 + my and ix1 <= ox1 - mx and iy1 <= oy1 - my
+
+
+def crop(image: np.ndarray, box: Box) -> np.ndarray:
+    """View of the image inside the box (no copy)."""
+    x0, y0, x1, y1 = box
+    return image[y0:y1, x0:x1]
+
+
+def map_landmarks_to_frame(landmarks, box: Box, width: int, height: int):
+    """
+    Convert landmarks normalized to a crop back to normalized full-frame coordinates.
+
+    MediaPipe scales z like x (by the crop width), so z is rescaled by the
+    crop-to-frame width ratio to stay comparable with full-frame results.
+    """
+    x0, y0, x1, y1 = box
+    sx, sy = (x1 - x0) / width, (y1 - y0) / height
+    ox, oy = x0 / width, y0 / height
+    return [Landmark(lm.x * sx + ox, lm.y * sy + oy, lm.z * sx) for lm in landmarks]
+
+
+def crop_is_worthwhile(box: Box, width: int, height: int, max_area_ratio: float = 0.6) -> bool:
+    """Only crop when it removes a meaningful share of the frame."""
+    x0, y0, x1, y1 = box
+    return (x1 - x0) * (y1 - y0) < max_area_ratio * width * height
@@ -0,0 +1,232 @@
+import threading
+import numpy as np
+import librosa
+from . import dsp
+from .pitch_engines import PiptrackEngine
+
+
+class SpeechFeatureStore:
+    """
+    Lazily evaluated, memoized spectral features for one audio signal.
+
+    Every librosa feature call on `y` runs its own STFT. The store computes
+    the STFT magnitude once per (n_fft, hop_length) and derives the spectral
+    features from it through librosa's `S=` parameters, which gives the same
+    values as the `y=` calls. Time-domain features (RMS, zero-crossing rate)
+    are still computed from `y`, once per framing. Create one store per
+    request; it holds references to the signal and all derived arrays.
+
+    The store is thread-safe: analysis stages running concurrently share it,
+    and a feature requested by several of them is computed once while the
+    others wait for it.
+
+    `source_sr` is the rate the recording was decoded at, for metrics that are
+    normalized by the recording's bandwidth (it differs from `sr` after resampling).
+
+    For block-wise analysis, `center=False` frames `y` as given (the caller
+    supplies the centre padding) and `first_frame` is the index of its first
+    frame in the whole recording, so frame_step decimation keeps the same
+    frames as it would on the full signal. zero_crossing_rate always centres
+    with edge padding like librosa, so block-wise callers frame it themselves.
+
+    pitch_track comes from `pitch_engine` (a PitchEngine, piptrack by default).
+    """
+
+    def __init__(self, y: np.ndarray, sr: int, n_fft: int = 2048, hop_length: int = 512,
+                 source_sr: int = None, center: bool = True, first_frame: int = 0, pitch_engine=None):
+        self.y = y
+        self.sr = sr
+        self.pitch_engine = pitch_engine or PiptrackEngine()
+        self.source_sr = source_sr or sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.center = center
+        self.first_frame = first_frame
+        self._cache = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _memo(self, key, compute):
+        if key in self._cache:
+            return self._cache[key]
+        # One lock per feature: distinct features compute in parallel, and the
+        # dependency chains between features (magnitude -> mel -> MFCC) are acyclic
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    def _framing(self, n_fft, hop_length):
+        return (n_fft or self.n_fft, hop_length or self.hop_length)
+
+    def _decimated(self, frame_step):
+        """Slice keeping the frames whose recording-wide index is a multiple of frame_step."""
+        return slice((-self.first_frame) % frame_step, None, frame_step)
+
+    def magnitude(self, n_fft: int = None, hop_length: int = None) -> np.ndarray:
+        """|STFT| with a Hann window, centred and zero padded like librosa's defaults."""
+        n_fft, hop_length = self._framing(n_fft, hop_length)
+        return self._memo(('magnitude', n_fft, hop_length), lambda: np.abs(librosa.stft(
+            self.y, n_fft=n_fft, hop_length=hop_length, window=dsp.window('hann', n_fft), center=self.center
+        )))
+
+    def power(self, n_fft: int = None, hop_length: int = None) -> np.ndarray:
+        n_fft, hop_length = self._framing(n_fft, hop_length)
+        return self._memo(('power', n_fft, hop_length), lambda: self.magnitude(n_fft, hop_length) ** 2)
+
+    def mel_power(self, n_fft: int = None, hop_length: int = None) -> np.ndarray:
+        """Power mel spectrogram (128 bands), as librosa.feature.melspectrogram(y=...)."""
+        n_fft, hop_length = self._framing(n_fft, hop_length)
+        return self._memo(('mel_power', n_fft, hop_length), lambda: librosa.feature.melspectrogram(
+            S=self.power(n_fft, hop_length), sr=self.sr
+        ))
+
+    def log_mel(self, n_fft: int = None, hop_length: int = None) -> np.ndarray:
+        n_fft, hop_length = self._framing(n_fft, hop_length)
+        return self._memo(('log_mel', n_fft, hop_length),
+                          lambda: librosa.power_to_db(self.mel_power(n_fft, hop_length)))
+
+    def mfcc(self, n_mfcc: int = 20) -> np.ndarray:
+        return self._memo(('mfcc', n_mfcc), lambda: librosa.feature.mfcc(S=self.log_mel(), n_mfcc=n_mfcc))
+
+    def rms(self, frame_length: int = None, hop_length: int = None) -> np.ndarray:
+        """Frame RMS from the waveform (1-D)."""
+        frame_length, hop_length = self._framing(frame_length, hop_length)
+        return self._memo(('rms', frame_length, hop_length), lambda: librosa.feature.rms(
+            y=self.y, frame_length=frame_length, hop_length=hop_length, center=self.center
+        )[0])
+
+    def zero_crossing_rate(self, frame_step: int = 1) -> np.ndarray:
+        """Zero-crossing rate per frame; frame_step > 1 keeps every frame_step-th frame."""
+        return self._memo(('zcr', frame_step), lambda: dsp.zero_crossing_rate(
+            self.y, frame_length=self.n_fft, hop_length=self.hop_length * frame_step
+        ))
+
+    def spectral_centroid(self) -> np.ndarray:
+        return self._memo('centroid', lambda: librosa.feature.spectral_centroid(
+            S=self.magnitude(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )[0])
+
+    def spectral_bandwidth(self) -> np.ndarray:
+        return self._memo('bandwidth', lambda: librosa.feature.spectral_bandwidth(
+            S=self.magnitude(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )[0])
+
+    def spectral_rolloff(self) -> np.ndarray:
+        return self._memo('rolloff', lambda: librosa.feature.spectral_rolloff(
+            S=self.magnitude(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )[0])
+
+    def spectral_flatness(self) -> np.ndarray:
+        return self._memo('flatness', lambda: librosa.feature.spectral_flatness(
+            S=self.magnitude(), n_fft=self.n_fft, hop_length=self.hop_length
+        )[0])
+
+    def spectral_contrast(self, frame_step: int = 1) -> np.ndarray:
+        """Spectral contrast per frame; frame_step > 1 keeps every frame_step-th frame."""
+        return self._memo(('contrast', frame_step), lambda: librosa.feature.spectral_contrast(
+            S=self.magnitude()[:, self._decimated(frame_step)], sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        ))
+
+    def onset_envelope(self) -> np.ndarray:
+        return self._memo('onset', lambda: librosa.onset.onset_strength(
+            S=self.log_mel(), sr=self.sr, hop_length=self.hop_length
+        ))
+
+    def piptrack(self, n_fft: int = None, hop_length: int = None, frame_step: int = 1):
+        """(pitches, magnitudes) from librosa.piptrack on the cached magnitude (every frame_step-th frame)."""
+        n_fft, hop_length = self._framing(n_fft, hop_length)
+        return self._memo(('piptrack', n_fft, hop_length, frame_step), lambda: librosa.piptrack(
+            S=self.magnitude(n_fft, hop_length)[:, self._decimated(frame_step)], sr=self.sr,
+            n_fft=n_fft, hop_length=hop_length * frame_step
+        ))
+
+    def pitch_track(self, n_fft: int = None, hop_length: int = None, frame_step: int = 1) -> np.ndarray:
+        """F0 of every frame from the pitch engine (0 where unvoiced)."""
+        n_fft, hop_length = self._framing(n_fft, hop_length)
+        return self._memo(('pitch_track', self.pitch_engine.name, n_fft, hop_length, frame_step),
+                          lambda: self.pitch_engine.track(self, n_fft, hop_length, frame_step))
+
+
+class VoicedFeatureStore(SpeechFeatureStore):
+    """
+    Feature store of the voiced segments of a recording, spliced together.
+
+    Segment boundaries lie on the hop grid, so every STFT frame of the spliced
+    signal whose window stays inside one segment equals a frame of the whole
+    recording. The magnitude and mel spectrogram take those frames as columns
+    of the parent store's (computing the parent's if needed, which the
+    whole-recording analyses use anyway) and only the frames whose window
+    reaches across a join, or into padding the recording does not have, are
+    transformed again. Everything else is computed on the spliced signal as
+    usual.
+    """
+
+    def __init__(self, parent: SpeechFeatureStore, segments):
+        super().__init__(segments.extract(parent.y), parent.sr, n_fft=parent.n_fft, hop_length=parent.hop_length,
+                         source_sr=parent.source_sr, pitch_engine=parent.pitch_engine)
+        self.parent = parent
+        self.segments = segments
+
+    def _source_frames(self):
+        """Recording frame of every spliced frame, -1 where the spliced frame differs."""
+        return self._memo('source_frames', self._map_frames)
+
+    def _map_frames(self):
+        hop, half = self.hop_length, self.n_fft // 2
+        ranges = np.array(self.segments.sample_ranges())
+        lengths = ranges[:, 1] - ranges[:, 0]
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+
+        frames = np.arange(1 + len(self.y) // hop)
+        segment = np.minimum(np.searchsorted(ends, frames * hop, side='right'), len(ranges) - 1)
+        window_start = frames * hop - half
+        window_end = window_start + self.n_fft
+        # Zero padding before the first / after the last segment matches the
+        # recording's own only where that segment starts / ends the recording
+        inside = (((window_start >= starts[segment]) | ((segment == 0) & (ranges[0, 0] == 0))) &
+                  ((window_end <= ends[segment]) |
+                   ((segment == len(ranges) - 1) & (ranges[-1, 1] == self.segments.n_samples))))
+        source = self.segments.starts[segment] + frames - starts[segment] // hop
+        return np.where(inside, source, -1)
+
+    def _own_magnitude(self, frames):
+        """|STFT| of the given spliced frames, computed on the spliced signal."""
+        padded = np.pad(self.y, self.n_fft // 2)
+        window = dsp.window('hann', self.n_fft)
+        columns = []
+        # One transform per run of consecutive frames
+        for run in np.split(frames, np.nonzero(np.diff(frames) > 1)[0] + 1):
+            start = run[0] * self.hop_length
+            columns.append(np.abs(librosa.stft(
+                padded[start:start + (len(run) - 1) * self.hop_length + self.n_fft],
+                n_fft=self.n_fft, hop_length=self.hop_length, window=window, center=False
+            )))
+        return np.hstack(columns)
+
+    def _select(self, whole, recompute):
+        source = self._source_frames()
+        # Frame-major like librosa's STFT output, which the per-frame features scan fastest
+        selected = whole.T[np.maximum(source, 0)].T
+        own = np.nonzero(source < 0)[0]
+        if len(own):
+            selected[:, own] = recompute(own)
+        return selected
+
+    def magnitude(self, n_fft: int = None, hop_length: int = None) -> np.ndarray:
+        if self._framing(n_fft, hop_length) != (self.n_fft, self.hop_length):
+            return super().magnitude(n_fft, hop_length)
+        return self._memo(('magnitude', self.n_fft, self.hop_length),
+                          lambda: self._select(self.parent.magnitude(), self._own_magnitude))
+
+    def mel_power(self, n_fft: int = None, hop_length: int = None) -> np.ndarray:
+        if self._framing(n_fft, hop_length) != (self.n_fft, self.hop_length):
+            return super().mel_power(n_fft, hop_length)
+
+        def own_mel(frames):
+            return librosa.feature.melspectrogram(S=self.magnitude()[:, frames] ** 2, sr=self.sr)
+        return self._memo(('mel_power', self.n_fft, self.hop_length),
+                          lambda: self._select(self.parent.mel_power(), own_mel))
@@ -0,0 +1,406 @@
+import numpy as np
+import librosa
+from collections import namedtuple
+from . import dsp
+from .speech_features import SpeechFeatureStore
+
+# Block-wise speech analysis with memory bounded by the block size.
+#
+# BlockFramer cuts consecutive sample blocks into the frames librosa's centred
+# framing produces on the whole signal, so per-frame features of a block equal
+# the corresponding columns of the one-shot features. SpeechStreamStatistics
+# folds those frames into running moments and peak candidates; StreamingOnsets
+# finds onsets on its own, for passes that need nothing else.
+
+# Samples spanning `n_frames` complete frames, the first being frame `first_frame`
+# of the recording; `lead`/`trail` count centre-padding zeros at either end
+FrameChunk = namedtuple('FrameChunk', ['samples', 'first_frame', 'n_frames', 'lead', 'trail'])
+
+
+class BlockFramer:
+    """
+    Turns consecutive sample blocks into runs of complete frames.
+
+    Frame i covers samples [i * hop_length - frame_length // 2, ...) of the
+    recording, zero padded at both ends, as with librosa's center=True. Each
+    push returns the samples spanning every frame completed so far and keeps
+    the overlap (frame_length - hop_length samples) for the next block.
+    """
+
+    def __init__(self, frame_length: int, hop_length: int):
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.pad = frame_length // 2
+        self.frames = 0
+        self.first_sample = None
+        self.last_sample = None
+        self._buffer = np.zeros(self.pad)
+        self._lead = self.pad
+
+    def push(self, samples: np.ndarray, last: bool = False):
+        """
+        Append samples (last=True appends the closing padding).
+
+        Returns:
+            FrameChunk, or None while no new frame is complete
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.size:
+            if self.first_sample is None:
+                self.first_sample = samples[0]
+            self.last_sample = samples[-1]
+
+        parts = [self._buffer, samples]
+        if last:
+            parts.append(np.zeros(self.pad))
+        buffer = np.concatenate(parts)
+        if len(buffer) < self.frame_length:
+            self._buffer = buffer
+            return None
+
+        n_frames = 1 + (len(buffer) - self.frame_length) // self.hop_length
+        span = (n_frames - 1) * self.hop_length + self.frame_length
+        real_end = len(buffer) - (self.pad if last else 0)
+        chunk = FrameChunk(buffer[:span], self.frames, n_frames,
+                           min(self._lead, span), max(0, span - real_end))
+
+        consumed = n_frames * self.hop_length
+        self._buffer = buffer[consumed:].copy()
+        self._lead = max(0, self._lead - consumed)
+        self.frames += n_frames
+        return chunk
+
+    def edge_padded(self, chunk: FrameChunk) -> np.ndarray:
+        """Chunk samples with the centre padding replaced by the edge samples (librosa's ZCR padding)."""
+        samples = chunk.samples
+        if not chunk.lead and not chunk.trail:
+            return samples
+        samples = samples.copy()
+        samples[:chunk.lead] = self.first_sample or 0.0
+        if chunk.trail:
+            samples[len(samples) - chunk.trail:] = self.last_sample or 0.0
+        return samples
+
+
+class RunningMoments:
+    """Count, mean and population variance over batches of values (Chan's parallel update)."""
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def update(self, values, axis: int = -1):
+        values = np.asarray(values, dtype=np.float64)
+        n = values.shape[axis] if values.ndim else 1
+        if n == 0:
+            return
+        mean = values.mean(axis=axis)
+        m2 = ((values - np.expand_dims(mean, axis)) ** 2).sum(axis=axis)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self._m2 / self.count) if self.count else np.zeros_like(self._m2)
+
+
+class PeakClip:
+    """
+    Clips dB values top_db below a peak, as librosa's top_db does on a whole recording.
+
+    With the recording's loudest value as `reference` (from an earlier pass
+    over it) every block is clipped exactly as the whole recording would be.
+    Without one, blocks are clipped against the loudest value seen so far,
+    and `exact` tells whether that made a difference: it does when a block
+    that precedes the loudest value holds values more than top_db below it,
+    such as digital silence before the first syllable.
+    """
+
+    def __init__(self, top_db: float = 80.0, reference: float = None):
+        self.top_db = top_db
+        self.reference = reference
+        self.peak = -np.inf      # loudest value seen
+        self._lowest = np.inf    # quietest value seen
+        self._lowest_before_peak = np.inf
+
+    def __call__(self, db: np.ndarray) -> np.ndarray:
+        if db.size == 0:
+            return db
+        if db.max() > self.peak:
+            self._lowest_before_peak = self._lowest
+            self.peak = float(db.max())
+        self._lowest = min(self._lowest, float(db.min()))
+        reference = self.peak if self.reference is None else self.reference
+        return np.maximum(db, reference - self.top_db)
+
+    @property
+    def exact(self) -> bool:
+        """Whether every block was clipped as against the loudest value of all of them."""
+        if self.reference is None:
+            return self._lowest_before_peak >= self.peak - self.top_db
+        # Tolerate rounding of the reference taken from another pass
+        return (abs(self.reference - self.peak) <= 1e-9 * max(1.0, abs(self.peak)) or
+                self._lowest >= max(self.reference, self.peak) - self.top_db)
+
+
+def onset_peak_params(sr: float = 22050, hop_length: int = 512) -> dict:
+    """librosa.onset.onset_detect's default peak_pick windows (in frames) for a framing."""
+    return {
+        'pre_max': int(np.ceil(0.03 * sr // hop_length)),
+        'post_max': int(np.ceil(0.00 * sr // hop_length + 1)),
+        'pre_avg': int(np.ceil(0.10 * sr // hop_length)),
+        'post_avg': int(np.ceil(0.10 * sr // hop_length + 1)),
+        'wait': int(np.ceil(0.03 * sr // hop_length)),
+        'delta': 0.07
+    }
+
+
+class StreamingPeakPicker:
+    """
+    librosa.util.peak_pick on a normalized envelope that arrives in pieces.
+
+    onset_detect scales the envelope to [0, 1] before peak picking, which needs
+    its final minimum and maximum. On the raw envelope the threshold test
+    x[n] >= mean(window) + delta becomes x[n] - mean(window) >= delta * range,
+    so each local maximum is kept with its margin and the threshold is applied
+    in finish(). Candidates whose margin is already below delta times the range
+    seen so far can never pass (the range only grows) and are dropped.
+    """
+
+    def __init__(self, pre_max: int, post_max: int, pre_avg: int, post_avg: int, delta: float, wait: int):
+        self.pre_max, self.post_max = pre_max, post_max
+        self.pre_avg, self.post_avg = pre_avg, post_avg
+        self.delta = delta
+        self.wait = wait
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._history = np.zeros(0)   # values from index self._start on
+        self._start = 0
+        self._next = 0                # first index not evaluated yet
+        self._frames = []
+        self._margins = []
+
+    def push(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._history = np.concatenate([self._history, values])
+        self.count += values.size
+        self._evaluate(self.count - max(self.post_max, self.post_avg) + 1)
+
+    def _evaluate(self, stop: int):
+        """Evaluate indices [self._next, stop) whose windows are available."""
+        if stop <= self._next:
+            return
+        x = self._history
+        offset = self._start
+        n = np.arange(self._next, stop)
+
+        # Windows are truncated at the recording's edges, as peak_pick does
+        cumsum = np.concatenate([[0.0], np.cumsum(x)])
+        lo = np.maximum(n - self.pre_avg, 0) - offset
+        hi = np.minimum(n + self.post_avg, self.count) - offset
+        mean = (cumsum[hi] - cumsum[lo]) / (hi - lo)
+
+        values = x[n - offset]
+        is_max = np.ones(n.size, dtype=bool)
+        for shift in range(-self.pre_max, self.post_max):
+            if shift == 0:
+                continue
+            neighbour = n + shift
+            inside = (neighbour >= 0) & (neighbour < self.count)
+            is_max[inside] &= values[inside] >= x[neighbour[inside] - offset]
+
+        margin = values - mean
+        keep = is_max & (margin >= self.delta * (self.maximum - self.minimum))
+        self._frames.extend(n[keep].tolist())
+        self._margins.extend(margin[keep].tolist())
+
+        self._next = stop
+        drop = max(0, stop - max(self.pre_max, self.pre_avg) - self._start)
+        self._history = self._history[drop:]
+        self._start += drop
+
+    def finish(self) -> np.ndarray:
+        """Peak indices, as peak_pick returns them on the whole normalized envelope."""
+        self._evaluate(self.count)
+        value_range = self.maximum - self.minimum
+        if not self.count or value_range <= 0 or not np.isfinite(value_range):
+            return np.array([], dtype=int)
+        threshold = self.delta * (value_range + np.finfo(np.float64).tiny)
+
+        peaks = []
+        last_peak = -np.inf
+        for frame, margin in zip(self._frames, self._margins):
+            if margin >= threshold and frame > last_peak + self.wait:
+                peaks.append(frame)
+                last_peak = frame
+        return np.array(peaks, dtype=int)
+
+
+class StreamingOnsets:
+    """
+    librosa.onset.onset_detect on a recording's mel spectrogram, a run of frames at a time.
+
+    The onset strength is the mean positive log-mel flux. Log-mel is clipped
+    top_db below `mel_peak`, the recording's loudest log-mel value, or below
+    the loudest value so far when it is not known (see PeakClip), and the
+    envelope is delayed so the trailing frames can be trimmed.
+    """
+
+    def __init__(self, hop_length: int, top_db: float = 80.0, mel_peak: float = None):
+        self.clip = PeakClip(top_db, mel_peak)
+        self._last_log_mel = None
+        # onset_strength shifts its envelope by lag + n_fft // (2 * hop_length)
+        # frames with its own default n_fft of 2048, then trims to the frame count;
+        # the analyzer calls onset_detect with its default sr and hop_length
+        self._shift = 1 + 2048 // (2 * hop_length)
+        self._picker = StreamingPeakPicker(**onset_peak_params())
+        self._picker.push(np.zeros(self._shift))
+        self._pending = np.zeros(0)
+
+    def update(self, mel_power: np.ndarray) -> np.ndarray:
+        """Fold in the mel power of the next frames; returns their clipped log-mel."""
+        log_mel = self.clip(librosa.power_to_db(mel_power, top_db=None))
+
+        previous = log_mel if self._last_log_mel is None else np.hstack([self._last_log_mel, log_mel])
+        flux = np.maximum(0.0, previous[:, 1:] - previous[:, :-1]).mean(axis=0)
+        self._last_log_mel = log_mel[:, -1:]
+
+        pending = np.concatenate([self._pending, flux])
+        hold = self._shift - 1
+        self._picker.push(pending[:len(pending) - hold])
+        self._pending = pending[len(pending) - hold:]
+        return log_mel
+
+    def frames(self) -> np.ndarray:
+        """Onset frames as librosa.onset.onset_detect finds them on the whole envelope."""
+        return self._picker.finish()
+
+
+class SpeechStreamStatistics:
+    """
+    Incremental frame statistics behind SpeechPatternAnalyzer's core metrics.
+
+    update() takes the FrameChunks of one recording in order and folds every
+    frame into running moments (pitch, loudness, MFCCs, spectral shape, ZCR)
+    and peak candidates (energy peaks for rhythm, onsets for pauses). Apart
+    from those candidates, a few per second of speech, nothing grows with the
+    recording's length.
+
+    Loudness and log-mel are clipped top_db below `loudness_peak` and
+    `mel_peak`, the loudest values of the frames the statistics see, as
+    librosa clips them in memory. Without those (from an earlier pass) they
+    are clipped below the loudest value so far, which differs only for frames
+    that precede it and lie more than top_db below it; loudness_clip and
+    mel_clip tell whether that happened. Spectral contrast applies librosa's
+    own clip per block.
+    """
+
+    def __init__(self, framer: BlockFramer, sr: int, source_sr: int = None, n_mfcc: int = 13,
+                 pitch_frame_step: int = 1, clarity_frame_step: int = 1, top_db: float = 80.0,
+                 mel_peak: float = None, loudness_peak: float = None, pitch_engine=None):
+        self.framer = framer
+        self.pitch_engine = pitch_engine
+        self.sr = sr
+        self.source_sr = source_sr or sr
+        self.n_fft = framer.frame_length
+        self.hop_length = framer.hop_length
+        self.n_mfcc = n_mfcc
+        self.pitch_frame_step = pitch_frame_step
+        self.clarity_frame_step = clarity_frame_step
+        self.top_db = top_db
+
+        self.pitch = RunningMoments()
+        self.loudness = RunningMoments()
+        self.loudness_range = [np.inf, -np.inf]
+        self.rms = RunningMoments()
+        self.mfcc = RunningMoments(n_mfcc)
+        self.mfcc_magnitude = RunningMoments(n_mfcc)
+        self.mfcc_step = RunningMoments()
+        self.centroid = RunningMoments()
+        self.rolloff = RunningMoments()
+        self.contrast = RunningMoments()
+        self.zcr = RunningMoments()
+
+        self.loudness_clip = PeakClip(top_db, loudness_peak)
+        self._last_mfcc = None
+        self._rms_tail = np.zeros(0)
+        self._energy_frames = []
+        self._energy_values = []
+        self.onsets = StreamingOnsets(self.hop_length, top_db, mel_peak)
+        self.mel_clip = self.onsets.clip
+
+    def update(self, chunk: FrameChunk):
+        features = SpeechFeatureStore(chunk.samples, self.sr, n_fft=self.n_fft, hop_length=self.hop_length,
+                                      source_sr=self.source_sr, center=False, first_frame=chunk.first_frame,
+                                      pitch_engine=self.pitch_engine)
+
+        if self._keeps_frames(chunk, self.pitch_frame_step):
+            pitch = features.pitch_track(frame_step=self.pitch_frame_step)
+            self.pitch.update(pitch[pitch > 0])
+
+        rms = features.rms()
+        self.rms.update(rms)
+        self._update_energy_peaks(rms, chunk.first_frame)
+        loudness = self.loudness_clip(librosa.amplitude_to_db(rms, top_db=None))
+        self.loudness.update(loudness)
+        self.loudness_range = [min(self.loudness_range[0], float(loudness.min())),
+                               max(self.loudness_range[1], float(loudness.max()))]
+
+        log_mel = self.onsets.update(features.mel_power())
+
+        mfcc = librosa.feature.mfcc(S=log_mel, n_mfcc=self.n_mfcc)
+        self.mfcc.update(mfcc, axis=1)
+        self.mfcc_magnitude.update(np.abs(mfcc), axis=1)
+        steps = np.diff(mfcc if self._last_mfcc is None else np.hstack([self._last_mfcc, mfcc]), axis=1)
+        self.mfcc_step.update(np.abs(steps).ravel())
+        self._last_mfcc = mfcc[:, -1:]
+
+        self.centroid.update(features.spectral_centroid())
+        self.rolloff.update(features.spectral_rolloff())
+        if self._keeps_frames(chunk, self.clarity_frame_step):
+            self.contrast.update(features.spectral_contrast(frame_step=self.clarity_frame_step).ravel())
+            self.zcr.update(self._zero_crossing_rate(chunk))
+
+    @staticmethod
+    def _keeps_frames(chunk, frame_step):
+        """Whether frame_step decimation keeps any frame of the chunk."""
+        return (-chunk.first_frame) % frame_step < chunk.n_frames
+
+    def _update_energy_peaks(self, rms, first_frame):
+        """Keep strict local maxima of the RMS envelope; their threshold needs the final mean."""
+        values = np.concatenate([self._rms_tail, rms])
+        start = first_frame - len(self._rms_tail)
+        peaks = dsp.local_maxima(values)
+        self._energy_frames.extend((peaks + start).tolist())
+        self._energy_values.extend(values[peaks].tolist())
+        self._rms_tail = values[-2:]
+
+    def _zero_crossing_rate(self, chunk):
+        step = self.clarity_frame_step
+        first = (-chunk.first_frame) % step
+        samples = self.framer.edge_padded(chunk)[first * self.hop_length:]
+        return dsp.zero_crossing_rate(
+            samples, frame_length=self.n_fft, hop_length=self.hop_length * step, center=False
+        )
+
+    @property
+    def frames(self) -> int:
+        return self.framer.frames
+
+    def energy_peaks(self) -> list:
+        """Frames of RMS peaks above half the mean RMS (the rhythm analysis' syllable peaks)."""
+        threshold = 0.5 * self.rms.mean
+        return [frame for frame, value in zip(self._energy_frames, self._energy_values) if value > threshold]
+
+    def onset_frames(self) -> np.ndarray:
+        """Onset frames as librosa.onset.onset_detect finds them on the whole envelope."""
+        return self.onsets.frames()
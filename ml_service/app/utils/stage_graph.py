@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# A unit of work in a stage graph: a no-argument callable and the names of
+# the stages that must finish before it starts
+Stage = namedtuple('Stage', ['func', 'after'])
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+
+
+def get_thread_pool(workers=None):
+    """
+    Shared thread pool for GIL-releasing analysis stages, created on first use.
+
+    NumPy, the FFT and most of librosa's kernels release the GIL, so
+    independent stages of one request run in parallel on threads without
+    the pickling cost of the process pool. The pool is shared by all
+    requests; `workers` (default: CPU count) only applies to the first call,
+    since requests may still be submitting to it.
+    """
+    global _thread_pool
+    with _thread_pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                              thread_name_prefix='analysis-stage')
+        return _thread_pool
+
+
+def _topological_order(stages):
+    """Stage names with every stage after its dependencies; ValueError on unknown names or cycles."""
+    order = []
+    state = {}  # name -> 'visiting' | 'done'
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Stage graph has a cycle: {' -> '.join(path + [name])}")
+        if name not in stages:
+            raise ValueError(f"Unknown stage '{name}' (needed by '{path[-1]}')")
+        state[name] = 'visiting'
+        for dependency in stages[name].after:
+            visit(dependency, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in stages:
+        visit(name, [])
+    return order
+
+
+def run_stages(stages: dict, pool=None):
+    """
+    Run a dependency graph of stages, each as soon as its dependencies finish.
+
+    Without a pool the stages run one after another on the calling thread in
+    dependency order. With one, every stage whose dependencies are done is
+    submitted at once, so independent stages overlap. The first exception
+    raised by a stage is re-raised once the running stages have finished.
+
+    Args:
+        stages: {name: Stage(func, after)}
+        pool: Executor to run stages on (None runs them inline)
+
+    Returns:
+        Tuple of (results, timings): the value each stage returned and its
+        wall time in milliseconds, both keyed by stage name
+    """
+    order = _topological_order(stages)
+    results, timings = {}, {}
+
+    def timed(name):
+        start = time.perf_counter()
+        value = stages[name].func()
+        timings[name] = 1000 * (time.perf_counter() - start)
+        return value
+
+    if pool is None:
+        for name in order:
+            results[name] = timed(name)
+        return results, timings
+
+    waiting = {name: set(stages[name].after) for name in order}
+    running = {}
+    error = None
+    while waiting or running:
+        if error is None:
+            for name in [name for name, after in waiting.items() if not after]:
+                del waiting[name]
+                running[pool.submit(timed, name)] = name
+        if not running:
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            for after in waiting.values():
+                after.discard(name)
+    if error is not None:
+        raise error
+    return results, {name: timings[name] for name in order}
@@ -2,6 +2,11 @@ import cv2
 import numpy as np
 import tempfile
 import os
+import math
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 def save_video_to_temp(video_bytes):
     """Save video bytes to a temporary file."""
@@ -28,4 +33,177 @@ def extract_frames(video_path, max_frames=90):
     # Clean up the temporary file
     os.unlink(video_path)
     
-    return frames
\ No newline at end of file
+    return frames
+
+def get_sampling_step(video_path, target_fps=15):
+    """Return (step, effective_fps) for sampling a video at roughly target_fps."""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    
+    if fps and fps > 0:
+        step = max(1, round(fps / min(target_fps, fps)))
+        return step, fps / step
+    return 1, float(target_fps)
+
+def get_video_info(video_path):
+    """
+    Return (frame_count, fps) for a video.
+    
+    Containers without a frame count in their header (typically browser-recorded
+    WebM) are counted by grabbing every frame.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if frame_count <= 0:
+            frame_count = 0
+            while cap.grab():
+                frame_count += 1
+    finally:
+        cap.release()
+    return frame_count, (fps if fps and fps > 0 else 30.0)
+
+def get_frame_rate(video_path, probe_frames=15):
+    """
+    Native frame rate of a video.
+    
+    Uses the container's rate when it is plausible; otherwise (some browser
+    recordings report 1000 fps or nothing) it is measured from the timestamps
+    of the first `probe_frames` frames.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps and 1 <= fps <= 240:
+            return fps
+        timestamps = []
+        while len(timestamps) < probe_frames and cap.grab():
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+    finally:
+        cap.release()
+    return estimate_frame_rate(timestamps) or 30.0
+
+def estimate_frame_rate(timestamps_ms):
+    """Sample rate of a frame sequence from its timestamps (median spacing), or None."""
+    if len(timestamps_ms) < 2:
+        return None
+    spacing = np.median(np.diff(timestamps_ms))
+    return 1000.0 / spacing if spacing > 0 else None
+
+def plan_chunks(frame_count, chunk_count, overlap=0):
+    """
+    Split frames [0, frame_count) into contiguous chunks for parallel processing.
+    
+    Returns a list of (read_start, start, stop): each chunk owns frames
+    [start, stop) but is read from `overlap` frames earlier so trackers can warm
+    up and neighbouring chunks can be aligned on the shared frames.
+    """
+    if frame_count <= 0:
+        return []
+    size = math.ceil(frame_count / max(1, chunk_count))
+    return [(max(0, start - overlap), start, min(frame_count, start + size))
+            for start in range(0, frame_count, size)]
+
+_process_pool = None
+_process_pool_size = 0
+_process_pool_lock = threading.Lock()
+
+def get_process_pool(workers=None):
+    """
+    Shared process pool for CPU-bound video work, created on first use.
+    
+    Workers are spawned rather than forked so they do not inherit the parent's
+    MediaPipe graphs and their threads.
+    """
+    global _process_pool, _process_pool_size
+    workers = workers or os.cpu_count() or 1
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_size < workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _process_pool_size = workers
+        return _process_pool
+
+def discard_process_pool():
+    """Drop the shared pool (e.g. after a worker crashed) so the next call starts a fresh one."""
+    global _process_pool, _process_pool_size
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        _process_pool_size = 0
+
+def iter_frames(video_path, step=1, max_frames=None, start=0, timestamps=False):
+    """
+    Yield every `step`-th frame of a video without holding the clip in memory.
+    
+    Skipped frames are only grabbed, never retrieved, so they are not converted
+    to BGR images. `start` seeks to a frame index before reading. With
+    `timestamps`, (frame, timestamp_ms) pairs are yielded instead.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    try:
+        frame_idx = 0
+        yielded = 0
+        while cap.isOpened():
+            if frame_idx % step == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield (frame, cap.get(cv2.CAP_PROP_POS_MSEC)) if timestamps else frame
+                yielded += 1
+                if max_frames is not None and yielded >= max_frames:
+                    break
+            elif not cap.grab():
+                break
+            frame_idx += 1
+    finally:
+        cap.release()
+
+def prefetch(iterable, depth=8):
+    """
+    Run an iterator on a background thread, buffering up to `depth` items.
+    
+    Used to overlap video decoding with landmark inference; both release the
+    GIL for most of their work, so the two stages run concurrently.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+    
+    def producer():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    break
+                buffer.put(item)
+        except Exception as e:
+            buffer.put(e)
+        finally:
+            buffer.put(done)
+    
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Drain so a blocked producer can observe the stop flag and exit
+        while thread.is_alive():
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                thread.join(timeout=0.01)
@@ -0,0 +1,130 @@
+import numpy as np
+
+# Energy/zero-crossing voice activity detection on STFT frames.
+#
+# The detector works on the per-frame RMS and zero-crossing rate of the
+# analysis framing (which the in-memory and the streamed analysis both
+# produce exactly), so either path finds the same segments. Segment
+# boundaries lie on the hop grid, so the concatenated voiced signal is cut
+# at frame boundaries of the recording.
+
+
+class VoicedSegments:
+    """
+    Segment index of the voiced parts of a recording.
+
+    Segments are half-open frame ranges [start, end) of the analysis framing;
+    segment k covers samples [start * hop_length, end * hop_length) clipped to
+    the recording. extract() concatenates those samples into the voiced
+    signal.
+    """
+
+    def __init__(self, starts, ends, hop_length: int, n_samples: int):
+        self.starts = np.asarray(starts, dtype=int)
+        self.ends = np.asarray(ends, dtype=int)
+        self.hop_length = hop_length
+        self.n_samples = n_samples
+        lengths = np.minimum(self.ends * hop_length, n_samples) - self.starts * hop_length
+        self.voiced_samples = int(lengths.sum())
+
+    @classmethod
+    def whole(cls, hop_length: int, n_samples: int):
+        """A single segment spanning the recording (no trimming)."""
+        return cls([0], [-(-n_samples // hop_length)], hop_length, n_samples)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def voiced_ratio(self) -> float:
+        return self.voiced_samples / self.n_samples if self.n_samples else 0.0
+
+    @property
+    def trims(self) -> bool:
+        """Whether any sample is dropped."""
+        return self.voiced_samples < self.n_samples
+
+    def sample_ranges(self):
+        """(start, stop) sample ranges of the segments."""
+        return [(start * self.hop_length, min(end * self.hop_length, self.n_samples))
+                for start, end in zip(self.starts, self.ends)]
+
+    def extract(self, y: np.ndarray) -> np.ndarray:
+        """The voiced signal: the segments of y, concatenated."""
+        if not self.trims:
+            return y
+        return np.concatenate([y[start:stop] for start, stop in self.sample_ranges()])
+
+    def select(self, block: np.ndarray, offset: int) -> np.ndarray:
+        """The voiced samples of a block starting at sample `offset` of the recording."""
+        end = offset + len(block)
+        parts = [block[max(start, offset) - offset:min(stop, end) - offset]
+                 for start, stop in self.sample_ranges() if start < end and stop > offset]
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else block[:0]
+
+    def summary(self, sr: int) -> dict:
+        return {
+            'segments': len(self),
+            'voiced_ratio': float(self.voiced_ratio),
+            'voiced_duration': self.voiced_samples / sr
+        }
+
+
+def detect_voice_activity(rms: np.ndarray, zcr: np.ndarray, sr: int, hop_length: int, n_samples: int,
+                          floor_percentile: float = 10, energy_margin_db: float = 12,
+                          peak_range_db: float = 20, zcr_margin_db: float = 8, zcr_threshold: float = 0.3,
+                          min_silence: float = 0.4, padding: float = 0.1,
+                          min_padding_frames: int = 0) -> VoicedSegments:
+    """
+    Voiced segments from frame energy and zero-crossing rate.
+
+    A frame is voiced when its level is energy_margin_db above the noise floor
+    (the floor_percentile level) or within peak_range_db of the loudest frame,
+    whichever threshold is lower. Frames up to zcr_margin_db below that
+    threshold also count when their zero-crossing rate exceeds zcr_threshold
+    (unvoiced fricatives are quiet but noisy). Silences shorter than
+    min_silence are bridged, and every segment is widened by `padding` on
+    either side (at least min_padding_frames, e.g. half an STFT window).
+
+    Args:
+        rms: Per-frame RMS of the whole recording
+        zcr: Per-frame zero-crossing rate (same framing)
+        sr: Sample rate
+        hop_length: Frame hop in samples
+        n_samples: Length of the recording
+
+    Returns:
+        VoicedSegments; the whole recording when no frame is voiced
+    """
+    n_frames = len(rms)
+    if n_frames == 0:
+        return VoicedSegments.whole(hop_length, n_samples)
+
+    level = 20 * np.log10(np.maximum(rms, 1e-10))
+    floor = np.percentile(level, floor_percentile)
+    threshold = min(floor + energy_margin_db, level.max() - peak_range_db)
+    voiced = (level > threshold) | ((level > threshold - zcr_margin_db) & (zcr[:n_frames] > zcr_threshold))
+    if not voiced.any():
+        return VoicedSegments.whole(hop_length, n_samples)
+
+    # Runs of voiced frames as [start, end)
+    edges = np.diff(np.concatenate([[0], voiced.astype(np.int8), [0]]))
+    starts = np.nonzero(edges == 1)[0]
+    ends = np.nonzero(edges == -1)[0]
+
+    # Bridge short silences, then pad (padding never re-opens a bridged gap)
+    bridge = int(np.ceil(min_silence * sr / hop_length))
+    keep = np.concatenate([[True], starts[1:] - ends[:-1] >= bridge])
+    starts = starts[keep]
+    ends = np.concatenate([ends[np.nonzero(keep)[0][1:] - 1], ends[-1:]])
+
+    pad = max(int(np.ceil(padding * sr / hop_length)), min_padding_frames)
+    starts = np.maximum(starts - pad, 0)
+    ends = np.minimum(ends + pad, n_frames)
+
+    # Padding may make neighbours touch or overlap; merge them
+    keep = np.concatenate([[True], starts[1:] > ends[:-1]])
+    merged_ends = np.concatenate([ends[np.nonzero(keep)[0][1:] - 1], ends[-1:]])
+    return VoicedSegments(starts[keep], merged_ends, hop_length, n_samples)
@@ -0,0 +1,538 @@
+"""
+Deterministic per-stage microbenchmarks of every analyzer, checked against a stored baseline.
+
+Every case runs one analysis stage on a synthetic input generated from a
+fixed seed, so runs on the same machine see identical data:
+
+  speech.<signal>.*  SpeechPatternAnalyzer on a harmonic tone at a constant
+                     F0 ('sine') and on a 100-300 Hz glide ('chirp'): decode,
+                     resampling, each shared feature (STFT, RMS, MFCC, ZCR,
+                     pitch track), voice activity detection, each analysis
+                     stage of the stage graph, and the whole analysis
+  tremor.<band>.*    TremorAnalyzer.analyze_tremor on (T, 21, 2) hand
+                     trajectories with a known tremor frequency
+  eye.*              EyeTracker post-processing of eye landmark sequences
+                     with known saccades and blinks
+  face.*             FaceAnalyzer scoring of Face Mesh landmark sets with a
+                     growing one-sided droop
+
+Each stage is timed on its own: inputs it depends on are prepared outside
+the timed region (a fresh feature store with its prerequisites cached, for
+the speech stages). The report lists per case
+
+  ns_per_op   fastest of --repeat samples of the mean time per call (other
+              load only ever adds time, so the minimum is the stable estimate)
+  peak_bytes  peak traced allocation of one call (tracemalloc, separate run)
+  value       scalar summary of the output, a change detector with no
+              right or wrong value
+  error       where the input has a known truth, the output's error against
+              it (pitch track: median cents; tremor: Hz; blinks: missed or
+              extra blink frames), and whether it exceeds the tolerance a
+              correct result stays within ('known_bad')
+
+and compares them with the baseline file: a case is flagged when it is more
+than --threshold slower, uses more than --memory-threshold (and 64 KiB)
+more memory, its value changed, or its error grew beyond both its
+tolerance and the baseline's error ('accuracy'). A case that comes out
+slower is measured again (up to --confirm times) before it is flagged.
+Flagged cases make the exit status 1. Known-bad cases are listed apart
+from the flags: they record an accuracy problem the baseline already has,
+not a change, and do not affect the exit status.
+
+The stored baseline.json holds the timings of the machine in its
+'environment' entry and does not transfer. Re-record it on each machine
+before comparing against it:
+
+    python -m benchmarks.microbench --update-baseline
+
+(with --filter, only the selected cases are replaced).
+
+Usage (from ml_service/):
+    python -m benchmarks.microbench [--filter speech.sine tremor] [--repeat 5]
+                                    [--baseline benchmarks/baseline.json]
+                                    [--update-baseline] [--threshold 0.25] [--json]
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.audio_decoding import audio_source, decode_audio  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SEED = 0
+
+# A benchmark case: setup() builds the untimed input of one call, func(input)
+# is the timed call, check(output) reduces its output to a scalar. Cases with
+# a known truth add error(output), the error against it, and the tolerance a
+# correct result stays within
+Case = namedtuple('Case', ['name', 'setup', 'func', 'check', 'error', 'tolerance'], defaults=(None, None))
+
+
+def fingerprint(value):
+    """Sum of the absolute numeric leaves of a (nested) result, as a change detector."""
+    if isinstance(value, dict):
+        return sum(fingerprint(item) for item in value.values())
+    if isinstance(value, (list, tuple, np.ndarray)):
+        array = np.asarray(value)
+        if array.dtype.kind in 'biuf':
+            return float(np.abs(array.astype(np.float64)).sum())
+        return sum(fingerprint(item) for item in value)
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_)):
+        return abs(float(value))
+    return 0.0
+
+
+# --- speech -----------------------------------------------------------------
+
+SPEECH = {
+    'DURATION': 4.0,     # seconds
+    'SAMPLE_RATE': 44100,
+    'SINE_F0': 150.0,    # Hz
+    'CHIRP_F0': (100.0, 300.0),
+    'PITCH_TOLERANCE': 50.0  # cents of median pitch track error
+}
+SPEECH_STAGES = ['pitch', 'volume', 'rhythm', 'fluency', 'articulation', 'clarity', 'voice_quality', 'time_series']
+
+
+def speech_signal(kind, sr=SPEECH['SAMPLE_RATE'], duration=SPEECH['DURATION'], seed=SEED):
+    """
+    Harmonic voice (-12 dB/octave) at a known F0 with syllable-rate modulation and noise.
+
+    Returns:
+        Tuple of (signal, per-sample F0 in Hz)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sr)) / sr
+    if kind == 'sine':
+        f0 = np.full(t.size, SPEECH['SINE_F0'])
+    else:
+        low, high = SPEECH['CHIRP_F0']
+        f0 = low * (high / low) ** (t / duration)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.where(k * f0 < sr / 2, np.sin(k * phase) / k ** 2, 0) for k in range(1, 16))
+    envelope = 0.4 + 0.6 * np.clip(np.sin(2 * np.pi * 3 * t), 0, None)
+    return 0.3 * voice * envelope + 0.002 * rng.normal(size=t.size), f0
+
+
+def speech_signal_cases(analyzer, kind):
+    """Cases of every speech stage on one synthetic signal."""
+    settings = analyzer.PROFILES['standard']
+    sections = {'voice_quality', 'time_series'}
+    y_source, f0 = speech_signal(kind)
+    buffer = io.BytesIO()
+    sf.write(buffer, y_source.astype(np.float32), SPEECH['SAMPLE_RATE'], format='WAV')
+    wav = buffer.getvalue()
+    y, sr = analyzer._resample(*decode_audio(*audio_source(wav)))
+
+    def store(*cached):
+        features = analyzer._feature_store(y, sr)
+        for name in cached:
+            getattr(features, name)()
+        return features
+
+    def stage(name):
+        features = store('magnitude', 'rms')
+        features.mfcc(n_mfcc=13)
+        return analyzer._analysis_stages(y, sr, features, settings, sections)[name].func
+
+    def pitch_error(track):
+        # Median |error| in cents over voiced frames against the F0 at each frame centre
+        hop = analyzer._feature_store(y, sr).hop_length
+        centres = np.minimum(np.arange(len(track)) * hop * SPEECH['SAMPLE_RATE'] // sr, len(f0) - 1)
+        voiced = track > 0
+        if not voiced.any():
+            return float('nan')
+        return float(np.median(np.abs(1200 * np.log2(track[voiced] / f0[centres][voiced]))))
+
+    prefix = f'speech.{kind}.'
+    cases = [
+        Case(prefix + 'decode', lambda: wav, lambda data: decode_audio(*audio_source(data)),
+             lambda out: fingerprint(out[0])),
+        Case(prefix + 'resample', lambda: y_source, lambda data: analyzer._resample(data, SPEECH['SAMPLE_RATE']),
+             lambda out: fingerprint(out[0])),
+        Case(prefix + 'stft', store, lambda features: features.magnitude(), fingerprint),
+        Case(prefix + 'rms', store, lambda features: features.rms(), fingerprint),
+        Case(prefix + 'mfcc', lambda: store('magnitude'), lambda features: features.mfcc(n_mfcc=13), fingerprint),
+        Case(prefix + 'zcr', store, lambda features: features.zero_crossing_rate(), fingerprint),
+        Case(prefix + 'pitch_track', lambda: store('magnitude'), lambda features: features.pitch_track(),
+             fingerprint, pitch_error, SPEECH['PITCH_TOLERANCE']),
+        Case(prefix + 'voice_activity', lambda: store('rms', 'zero_crossing_rate'),
+             lambda features: analyzer._voice_activity(features.rms(), features.zero_crossing_rate(), sr, len(y)),
+             lambda segments: segments.voiced_ratio)
+    ]
+    cases += [Case(prefix + name, lambda name=name: stage(name), lambda func: func(), fingerprint)
+              for name in SPEECH_STAGES]
+    cases.append(Case(prefix + 'analyze', lambda: wav,
+                      lambda data: analyzer.analyze_speech_pattern(data, profile='standard', streaming=False),
+                      lambda result: fingerprint(result['metrics'])))
+    return cases
+
+
+def speech_cases():
+    from app.models.speech_pattern import SpeechPatternAnalyzer
+
+    # Resampled like an opted-in service, so the resample stage is covered
+    analyzer = SpeechPatternAnalyzer(analysis_rate=16000, parallel=False)
+    return speech_signal_cases(analyzer, 'sine') + speech_signal_cases(analyzer, 'chirp')
+
+
+# --- tremor -----------------------------------------------------------------
+
+TREMOR = {
+    'FPS': 30.0,
+    'DURATION': 10.0,       # seconds
+    'AMPLITUDE': 6.0,       # pixels at the fingertips
+    'FREQUENCIES': {'resting': 5.0, 'postural': 9.0},  # Hz
+    'TOLERANCE': 0.5        # Hz of tremor frequency error
+}
+
+
+def hand_trajectory(frequency, fps=TREMOR['FPS'], duration=TREMOR['DURATION'], seed=SEED):
+    """(T, 21, 2) hand landmarks oscillating at `frequency`, stronger towards the fingertips, with drift and noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * fps)) / fps
+    hand = np.array([320.0, 240.0]) + rng.uniform(-60, 60, size=(21, 2))
+    reach = np.tile([0.25, 0.5, 0.75, 1.0], 5)  # knuckle .. tip of every finger
+    gain = np.concatenate([[0.1], reach])[:, None]
+    direction = np.array([0.8, 0.6])
+    tremor = TREMOR['AMPLITUDE'] * np.sin(2 * np.pi * frequency * t + rng.uniform(0, 2 * np.pi))
+    drift = 3.0 * np.sin(2 * np.pi * 0.1 * t)
+    return (hand + (tremor[:, None, None] * gain) * direction + drift[:, None, None]
+            + rng.normal(scale=0.3, size=(t.size, 21, 2)))
+
+
+def tremor_cases():
+    from app.models.tremor_analysis import TremorAnalyzer
+
+    analyzer = TremorAnalyzer(fps=TREMOR['FPS'])
+    frequency_error = lambda result, frequency: abs(result['tremor_frequency'] - frequency)
+    cases = []
+    for band, frequency in TREMOR['FREQUENCIES'].items():
+        landmarks = hand_trajectory(frequency)
+        spectra = analyzer._landmark_spectra(landmarks)
+        prefix = f'tremor.{band}.'
+        cases += [
+            Case(prefix + 'spectra', lambda landmarks=landmarks: landmarks, analyzer._landmark_spectra, fingerprint),
+            Case(prefix + 'primary', lambda spectra=spectra: spectra,
+                 lambda spectra: analyzer._analyze_landmark(spectra, analyzer.PRIMARY_LANDMARK), fingerprint,
+                 lambda result, frequency=frequency: frequency_error(result, frequency), TREMOR['TOLERANCE']),
+            Case(prefix + 'fingers', lambda spectra=spectra: spectra, analyzer._analyze_fingers, fingerprint,
+                 lambda fingers, frequency=frequency: max(abs(finger['frequency'] - frequency)
+                                                          for finger in fingers.values()),
+                 TREMOR['TOLERANCE']),
+            Case(prefix + 'analyze', lambda landmarks=landmarks: landmarks, analyzer.analyze_tremor, fingerprint,
+                 lambda result, frequency=frequency: frequency_error(result, frequency), TREMOR['TOLERANCE'])
+        ]
+    return cases
+
+
+# --- eye tracking -------------------------------------------------------------
+
+EYE = {
+    'FRAMES': 600,
+    'SACCADE_INTERVAL': 40,  # frames between gaze jumps
+    'SACCADE_SIZE': 25.0,    # pixels
+    'BLINKS': (100, 310, 505),
+    'BLINK_FRAMES': 3,
+    'BLINK_TOLERANCE': 3     # blink frames missed or extra (one per blink)
+}
+
+
+def eye_ring(center, width=30.0, height=9.0):
+    """16 points around one eye in Face Mesh order: corner, upper lid, other corner, lower lid."""
+    angles = np.pi - 2 * np.pi * np.arange(16) / 16
+    return center + np.stack([width * np.cos(angles), height * np.sin(angles)], axis=1)
+
+
+def eye_sequence(seed=SEED):
+    """(T, 32, 2) eye landmarks, left eye first: fixations, saccades and blinks at known frames."""
+    rng = np.random.default_rng(seed)
+    frames = EYE['FRAMES']
+    jumps = np.arange(frames) // EYE['SACCADE_INTERVAL']
+    gaze = np.stack([EYE['SACCADE_SIZE'] * (jumps % 2), 5.0 * (jumps % 3)], axis=1)
+    gaze = gaze + rng.normal(scale=0.2, size=(frames, 2))
+    openness = np.ones(frames)
+    for start in EYE['BLINKS']:
+        openness[start:start + EYE['BLINK_FRAMES']] = 0.1
+    eyes = np.concatenate([eye_ring(np.array([280.0, 240.0])), eye_ring(np.array([360.0, 240.0]))])
+    centres = np.repeat([[280.0, 240.0], [360.0, 240.0]], 16, axis=0)
+    shape = centres + (eyes - centres) * np.stack([np.ones(frames), openness], axis=1)[:, None, :]
+    return shape + gaze[:, None, :]
+
+
+def eye_cases():
+    from app.models.eye_tracking import EyeTracker
+
+    tracker = EyeTracker(fps=30.0)
+    points = eye_sequence()
+    blink_frames = len(EYE['BLINKS']) * EYE['BLINK_FRAMES']
+    return [
+        Case('eye.temporal_metrics', lambda: points, tracker.calculate_temporal_metrics, fingerprint,
+             lambda metrics: abs(sum(metrics['blinks']) - blink_frames), EYE['BLINK_TOLERANCE']),
+        Case('eye.summary_metrics', lambda: tracker.calculate_temporal_metrics(points),
+             tracker.calculate_summary_metrics, fingerprint),
+        Case('eye.neurological_indicators', lambda: tracker.calculate_temporal_metrics(points),
+             tracker.analyze_neurological_indicators, fingerprint)
+    ]
+
+
+# --- face -------------------------------------------------------------------
+
+FACE = {
+    'BATCH': 256,
+    'WIDTH': 640,
+    'HEIGHT': 480,
+    'MAX_DROOP': 0.03  # normalized height the right mouth corner and eyebrow sag by
+}
+
+
+def face_landmarks(analyzer, droop=0.0, seed=SEED):
+    """(478, 3) normalized Face Mesh landmarks: feature rings and arcs around a vertical midline."""
+    rng = np.random.default_rng(seed)
+    points = np.column_stack([rng.uniform(0.35, 0.65, 478), rng.uniform(0.25, 0.8, 478), rng.normal(0, 0.02, 478)])
+
+    def ring(indices, cx, cy, rx, ry):
+        angles = np.pi - 2 * np.pi * np.arange(len(indices)) / len(indices)
+        points[indices, 0] = cx + rx * np.cos(angles)
+        points[indices, 1] = cy - ry * np.sin(angles)
+
+    def arc(indices, cx, cy, rx, ry, start, stop):
+        angles = np.linspace(start, stop, len(indices))
+        points[indices, 0] = cx + rx * np.cos(angles)
+        points[indices, 1] = cy - ry * np.sin(angles)
+
+    ring(analyzer.LEFT_EYE, 0.42, 0.42, 0.04, 0.012)
+    ring(analyzer.RIGHT_EYE, 0.58, 0.42, 0.04, 0.012)
+    ring(analyzer.MOUTH, 0.5, 0.66, 0.07, 0.02)
+    arc(analyzer.JAWLINE, 0.5, 0.5, 0.2, 0.28, np.pi * 0.9, np.pi * 0.1)
+    arc(analyzer.LEFT_EYEBROW, 0.42, 0.38, 0.05, 0.02, np.pi * 0.9, np.pi * 0.1)
+    arc(analyzer.RIGHT_EYEBROW, 0.58, 0.38, 0.05, 0.02, np.pi * 0.9, np.pi * 0.1)
+    points[analyzer.MIDLINE_POINTS, 0] = 0.5
+    points[analyzer.MIDLINE_POINTS, 1] = np.linspace(0.36, 0.6, len(analyzer.MIDLINE_POINTS))
+
+    # One-sided droop of the mouth and eyebrow (right of the midline)
+    for indices in (analyzer.MOUTH, analyzer.RIGHT_EYEBROW):
+        right = [idx for idx in indices if points[idx, 0] > 0.5]
+        points[right, 1] += droop
+    return points
+
+
+def face_cases():
+    from app.models.face_analysis import FaceAnalyzer
+
+    analyzer = FaceAnalyzer()
+    droops = np.linspace(0, FACE['MAX_DROOP'], FACE['BATCH'])
+    batch = np.stack([face_landmarks(analyzer, droop, seed=SEED + k) for k, droop in enumerate(droops)])
+    single = [SimpleNamespace(x=x, y=y, z=z) for x, y, z in batch[0]]
+    image = np.zeros((FACE['HEIGHT'], FACE['WIDTH'], 3), dtype=np.uint8)
+    return [
+        Case('face.score', lambda: single,
+             lambda landmarks: analyzer._score_landmarks(image, landmarks, FACE['WIDTH'], FACE['HEIGHT']),
+             lambda result: result['symmetry_score']),
+        Case('face.score_batch', lambda: batch,
+             lambda landmarks: analyzer.score_landmark_batch(landmarks, FACE['WIDTH'], FACE['HEIGHT']),
+             lambda result: float(np.mean(result['symmetry_score'])))
+    ]
+
+
+GROUPS = {
+    'speech': speech_cases,
+    'tremor': tremor_cases,
+    'eye': eye_cases,
+    'face': face_cases
+}
+
+
+# --- measurement ------------------------------------------------------------
+
+def measure(case, repeat, min_time):
+    """
+    Time and trace one case.
+
+    Each sample runs enough calls to last at least min_time (setup excluded)
+    and reports the mean time per call; the peak allocation is traced in a
+    separate call, so tracing does not slow the timed ones.
+    """
+    output = case.func(case.setup())  # warm-up (caches, JIT)
+    value = case.check(output)
+    error = float(case.error(output)) if case.error is not None else None
+
+    start = time.perf_counter()
+    case.func(case.setup())
+    single = time.perf_counter() - start
+    loops = max(1, min(1000, math.ceil(min_time / max(single, 1e-9))))
+
+    samples = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(loops):
+            state = case.setup()
+            start = time.perf_counter()
+            case.func(state)
+            elapsed += time.perf_counter() - start
+        samples.append(elapsed / loops)
+
+    state = case.setup()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        case.func(state)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ns_per_op': 1e9 * min(samples),
+        'peak_bytes': int(peak),
+        'value': float(value) if value is not None else None,
+        'error': error,
+        'tolerance': case.tolerance,
+        # nan (no usable output) is as bad as an error beyond the tolerance
+        'known_bad': error is not None and not error <= case.tolerance
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(report, baseline, threshold, memory_threshold, min_memory=64 * 1024):
+    """
+    Flags per case against the baseline cases.
+
+    Returns:
+        Dictionary of case name -> list of flags ('slower', 'memory', 'value',
+        'accuracy') for cases with at least one flag; a known-bad error that
+        did not grow is not flagged
+    """
+    flags = {}
+    for name, row in report.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        case_flags = []
+        if row['ns_per_op'] > (1 + threshold) * reference['ns_per_op']:
+            case_flags.append('slower')
+        if row['peak_bytes'] > max((1 + memory_threshold) * reference['peak_bytes'], reference['peak_bytes'] + min_memory):
+            case_flags.append('memory')
+        old, new = reference.get('value'), row['value']
+        if (old is None) != (new is None) or (old is not None and not (
+                math.isclose(old, new, rel_tol=1e-6, abs_tol=1e-9) or (math.isnan(old) and math.isnan(new)))):
+            case_flags.append('value')
+        old_error = reference.get('error')
+        if row['known_bad'] and not (old_error is not None and row['error'] <= old_error * (1 + 1e-6)):
+            # nan compares false, so a newly unusable output is flagged as well
+            case_flags.append('accuracy')
+        if case_flags:
+            flags[name] = case_flags
+    return flags
+
+
+def select_cases(filters):
+    """Cases whose names start with one of the filters (all cases without filters)."""
+    cases = []
+    for group, build in GROUPS.items():
+        if filters and not any(pattern.split('.')[0] == group for pattern in filters):
+            continue
+        cases += [case for case in build() if not filters or any(case.name.startswith(pattern) for pattern in filters)]
+    return cases
+
+
+def run(cases, repeat, min_time, baseline=None, threshold=0.25, confirm=2):
+    """
+    Measure every case; cases that come out slower than the baseline are
+    measured again up to `confirm` times and keep their fastest timing, so a
+    burst of load from elsewhere on the machine does not flag them.
+    """
+    report = {case.name: measure(case, repeat, min_time) for case in cases}
+    for case in cases:
+        reference = (baseline or {}).get(case.name)
+        for _ in range(confirm):
+            if reference is None or report[case.name]['ns_per_op'] <= (1 + threshold) * reference['ns_per_op']:
+                break
+            again = measure(case, repeat, min_time)
+            report[case.name]['ns_per_op'] = min(report[case.name]['ns_per_op'], again['ns_per_op'])
+    return report
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', nargs='+', default=[], help='Case name prefixes to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed samples per case (the fastest is reported)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Minimum seconds of timed calls per sample')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file to compare with')
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Relative slowdown that is flagged')
+    parser.add_argument('--memory-threshold', type=float, default=0.10, help='Relative memory growth that is flagged')
+    parser.add_argument('--confirm', type=int, default=2, help='Re-measurements of a case before it is flagged slower')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    reference = baseline['cases'] if baseline and not args.update_baseline else {}
+    report = run(select_cases(args.filter), args.repeat, args.min_time, reference, args.threshold, args.confirm)
+
+    if args.update_baseline:
+        cases = dict(baseline['cases']) if baseline and args.filter else {}
+        cases.update(report)
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': environment(), 'cases': dict(sorted(cases.items()))}, f, indent=2)
+            f.write('\n')
+        print(f"Stored {len(report)} cases in {args.baseline}")
+        return
+
+    flags = compare(report, reference, args.threshold, args.memory_threshold)
+    if args.json:
+        print(json.dumps({'environment': environment(), 'cases': report, 'flags': flags}, indent=2))
+    else:
+        if baseline is None:
+            print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        elif baseline.get('environment') != environment():
+            print(f"Baseline was recorded on {baseline.get('environment')}, timings may not be comparable")
+        print(f"  {'case':<36}{'ns/op':>16}{'vs base':>9}{'peak KiB':>11}{'value':>14}{'error':>10}  flags")
+        for name, row in report.items():
+            base = reference.get(name)
+            ratio = f"{row['ns_per_op'] / base['ns_per_op']:>8.2f}x" if base else f"{'-':>9}"
+            value = f"{row['value']:>14.6g}" if row['value'] is not None else f"{'-':>14}"
+            error = f"{row['error']:>10.4g}" if row['error'] is not None else f"{'-':>10}"
+            print(f"  {name:<36}{row['ns_per_op']:>16,.0f}{ratio}{row['peak_bytes'] / 1024:>11.1f}{value}{error}"
+                  f"  {','.join(flags.get(name, []))}")
+        known_bad = [name for name, row in report.items() if row['known_bad']]
+        if known_bad:
+            print("Known-bad (error beyond tolerance; not a regression unless flagged 'accuracy'):")
+            for name in known_bad:
+                print(f"  {name:<36}error {report[name]['error']:.4g} > tolerance {report[name]['tolerance']:g}")
+        if flags:
+            print(f"{len(flags)} of {len(report)} cases regressed against {args.baseline}")
+    if flags:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
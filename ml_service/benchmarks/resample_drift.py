@@ -0,0 +1,103 @@
+"""
+Metric drift of resampled speech analysis against full-rate analysis.
+
+Every recording is analyzed at its decoded rate (analysis_rate=None, the
+unscaled framing constants) and at each requested analysis rate. For every
+numeric output metric the report lists the deviation from full rate, using
+the same |value - reference| / max(|reference|, 1) measure as
+speech_profiles, plus the latency of each configuration.
+
+Usage (from ml_service/):
+    python -m benchmarks.resample_drift [audio ...] [--rates 16000 22050]
+                                        [--profile standard] [--repeat N] [--json]
+
+Without audio files a synthetic 30 s recording at 44.1 kHz is generated.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.speech_pattern import SpeechPatternAnalyzer  # noqa: E402
+from benchmarks.speech_profiles import numeric_leaves, synthetic_speech  # noqa: E402
+
+
+def analyze(analyzer, path, profile, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = analyzer.analyze_speech_pattern(path, profile=profile)
+        timings.append(time.perf_counter() - start)
+    if not result['success']:
+        raise RuntimeError(f"Analysis of {path} failed: {result['error']}")
+    return statistics.median(timings), numeric_leaves(result['metrics'])
+
+
+def run(paths, rates, profile, repeat):
+    analyzers = {None: SpeechPatternAnalyzer(analysis_rate=None)}
+    analyzers.update({rate: SpeechPatternAnalyzer(analysis_rate=rate) for rate in rates})
+    for analyzer in analyzers.values():
+        analyzer.analyze_speech_pattern(paths[0], profile='triage')  # JIT warm-up
+
+    report = {}
+    for path in paths:
+        latency, reference = analyze(analyzers[None], path, profile, repeat)
+        entry = {'full_rate': {'latency_s': latency}}
+        for rate in rates:
+            latency, metrics = analyze(analyzers[rate], path, profile, repeat)
+            drift = {
+                name: abs(metrics[name] - value) / max(abs(value), 1.0)
+                for name, value in reference.items() if name in metrics
+            }
+            entry[str(rate)] = {
+                'latency_s': latency,
+                'speedup': entry['full_rate']['latency_s'] / latency,
+                'max_drift': max(drift.values()) if drift else 0.0,
+                'drift': dict(sorted(drift.items(), key=lambda item: -item[1]))
+            }
+        report[path] = entry
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='*', help='Recordings to analyze')
+    parser.add_argument('--rates', type=int, nargs='+', default=[16000, 22050], help='Analysis rates to compare')
+    parser.add_argument('--profile', default='standard', help='Analysis profile')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (median is reported)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    paths = args.audio
+    temp_path = None
+    if not paths:
+        temp_path = synthetic_speech(tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name)
+        paths = [temp_path]
+
+    try:
+        report = run(paths, args.rates, args.profile, args.repeat)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for path, entry in report.items():
+        print(os.path.basename(path) if not temp_path else 'synthetic 30 s speech (44.1 kHz)')
+        print(f"  full rate: {entry['full_rate']['latency_s']:.3f}s")
+        for rate in args.rates:
+            row = entry[str(rate)]
+            print(f"  {rate} Hz: {row['latency_s']:.3f}s ({row['speedup']:.1f}x), max drift {row['max_drift']:.4f}")
+            for name, drift in row['drift'].items():
+                print(f"      {name:<40}{drift:.4f}")
+
+
+if __name__ == '__main__':
+    main()
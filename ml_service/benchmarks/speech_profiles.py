@@ -0,0 +1,125 @@
+"""
+Latency and metric deviation of the SpeechPatternAnalyzer profiles.
+
+Each profile analyzes the same recordings; deviations are measured against
+the 'standard' profile (the exact core metrics) over every numeric metric
+both profiles report. Most metrics are 0-1 scores that can sit near zero, so
+a deviation is |value - reference| / max(|reference|, 1): absolute for scores,
+relative for rates such as words per minute.
+
+Usage (from ml_service/):
+    python -m benchmarks.speech_profiles [audio ...] [--repeat N] [--json]
+
+Without audio files a synthetic 30 s voiced recording is generated.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.speech_pattern import SpeechPatternAnalyzer  # noqa: E402
+
+
+def synthetic_speech(path, duration=30.0, sr=44100, seed=0):
+    """Harmonic voice with syllable-rate amplitude modulation, pauses and noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sr)) / sr
+    f0 = 120 + 30 * np.sin(2 * np.pi * 0.3 * t) + 5 * np.sin(2 * np.pi * 5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 2.2 * t + np.sin(2 * np.pi * 0.2 * t)), 0, None) ** 2
+    pauses = np.sin(2 * np.pi * 0.1 * t) > -0.8
+    y = 0.2 * voice * envelope * pauses + 0.003 * rng.normal(size=t.size)
+    sf.write(path, y.astype(np.float32), sr)
+    return path
+
+
+def numeric_leaves(metrics, prefix=''):
+    """Flatten nested metric dicts to {dotted.path: float} for numeric values."""
+    leaves = {}
+    for key, value in metrics.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            leaves.update(numeric_leaves(value, path + '.'))
+        elif isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+            leaves[path] = float(value)
+    return leaves
+
+
+def run(paths, repeat):
+    analyzer = SpeechPatternAnalyzer()
+    # Warm up librosa/numba so the first profile is not charged for JIT compilation
+    analyzer.analyze_speech_pattern(paths[0], profile='triage')
+
+    report = {}
+    for path in paths:
+        results = {}
+        for profile in analyzer.PROFILES:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = analyzer.analyze_speech_pattern(path, profile=profile)
+                timings.append(time.perf_counter() - start)
+            if not result['success']:
+                raise RuntimeError(f"{profile} failed on {path}: {result['error']}")
+            results[profile] = {'latency': statistics.median(timings), 'metrics': numeric_leaves(result['metrics'])}
+
+        reference = results['standard']['metrics']
+        report[path] = {}
+        for profile, result in results.items():
+            deviations = {
+                name: abs(value - reference[name]) / max(abs(reference[name]), 1.0)
+                for name, value in result['metrics'].items() if name in reference
+            }
+            worst = max(deviations, key=deviations.get) if any(deviations.values()) else None
+            report[path][profile] = {
+                'latency_s': result['latency'],
+                'speedup_vs_full': results['full']['latency'] / result['latency'],
+                'mean_deviation': float(np.mean(list(deviations.values()))) if deviations else 0.0,
+                'max_deviation': deviations.get(worst, 0.0),
+                'worst_metric': worst
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='*', help='Recordings to analyze')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per profile (median is reported)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    paths = args.audio
+    temp_path = None
+    if not paths:
+        temp_path = synthetic_speech(tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name)
+        paths = [temp_path]
+
+    try:
+        report = run(paths, args.repeat)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for path, profiles in report.items():
+        print(os.path.basename(path) if not temp_path else 'synthetic 30 s speech')
+        print(f"  {'profile':<10}{'latency':>10}{'vs full':>9}{'mean dev':>10}{'max dev':>10}  worst metric")
+        for profile, row in profiles.items():
+            print(f"  {profile:<10}{row['latency_s']:>9.3f}s{row['speedup_vs_full']:>8.1f}x"
+                  f"{row['mean_deviation']:>10.4f}{row['max_deviation']:>10.4f}  {row['worst_metric'] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Scaling of the envelope kernels and of speech analysis with recording length.
+
+For synthetic recordings of each --durations length the report times, on the
+analysis-rate RMS envelope:
+  - palilalia autocorrelation: np.correlate (quadratic) vs dsp.autocorrelation
+  - rhythm energy peaks: the per-frame Python loop vs dsp.local_maxima
+and the whole in-memory analysis with the given profile. The last row is the
+log-log slope of time against length between the shortest and the longest
+recording (1 is linear, 2 quadratic).
+
+Usage (from ml_service/):
+    python -m benchmarks.speech_scaling [--durations 10 30 60 120 300 600]
+                                        [--profile standard] [--repeat N] [--json]
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.speech_pattern import SpeechPatternAnalyzer  # noqa: E402
+from app.utils import dsp  # noqa: E402
+from app.utils.audio_decoding import audio_source, decode_audio  # noqa: E402
+from benchmarks.speech_profiles import synthetic_speech  # noqa: E402
+
+COLUMNS = ['correlate', 'fft_autocorrelation', 'loop_peaks', 'local_maxima', 'analysis']
+
+
+def loop_peaks(rms, threshold):
+    """The original per-frame energy peak loop of _analyze_rhythm."""
+    peaks = []
+    for i in range(1, len(rms) - 1):
+        if rms[i] > threshold and rms[i] > rms[i - 1] and rms[i] > rms[i + 1]:
+            peaks.append(i)
+    return peaks
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), value
+
+
+def measure(analyzer, path, profile, repeat):
+    y, sr = analyzer._resample(*decode_audio(*audio_source(path)))
+    rms = analyzer._feature_store(y, sr).rms()
+    threshold = 0.5 * np.mean(rms)
+
+    row = {'frames': len(rms)}
+    row['correlate'], reference = timed(lambda: np.correlate(rms, rms, mode='full')[len(rms) - 1:], 1)
+    row['fft_autocorrelation'], corr = timed(lambda: dsp.autocorrelation(rms), repeat)
+    row['loop_peaks'], loop = timed(lambda: loop_peaks(rms, threshold), repeat)
+    row['local_maxima'], peaks = timed(lambda: dsp.local_maxima(rms, threshold), repeat)
+    row['analysis'], result = timed(
+        lambda: analyzer.analyze_speech_pattern(path, profile=profile, streaming=False), repeat
+    )
+    if not result['success']:
+        raise RuntimeError(f"Analysis of {path} failed: {result['error']}")
+    if list(peaks) != loop:
+        raise RuntimeError(f"Vectorized peaks differ from the loop on {path}")
+    # Deviation of the normalized autocorrelation, as the palilalia score uses it
+    row['autocorrelation_error'] = float(np.max(np.abs(corr / corr[0] - reference / reference[0])))
+    return row
+
+
+def run(durations, profile, repeat):
+    analyzer = SpeechPatternAnalyzer()
+    report = {}
+    for duration in durations:
+        path = synthetic_speech(tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name, duration=duration)
+        try:
+            if not report:
+                analyzer.analyze_speech_pattern(path, profile='triage', streaming=False)  # JIT warm-up
+            report[duration] = measure(analyzer, path, profile, repeat)
+        finally:
+            os.unlink(path)
+
+    shortest, longest = min(report), max(report)
+    if longest > shortest:
+        report['slope'] = {
+            column: math.log(report[longest][column] / report[shortest][column]) / math.log(longest / shortest)
+            for column in COLUMNS
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--durations', type=float, nargs='+', default=[10, 30, 60, 120, 300, 600],
+                        help='Synthetic recording lengths in seconds')
+    parser.add_argument('--profile', default='standard', help='Analysis profile')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median is reported)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = run(sorted(args.durations), args.profile, args.repeat)
+    if args.json:
+        print(json.dumps({str(key): row for key, row in report.items()}, indent=2))
+        return
+
+    print(f"  {'length':>8}{'frames':>8}" + ''.join(f"{column:>21}" for column in COLUMNS) + f"{'max error':>12}")
+    for duration, row in report.items():
+        if duration == 'slope':
+            continue
+        cells = ''.join(f"{1000 * row[column]:>18.2f} ms" for column in COLUMNS)
+        print(f"  {duration:>7.0f}s{row['frames']:>8}{cells}{row['autocorrelation_error']:>12.1e}")
+    if 'slope' in report:
+        print(f"  {'slope':>16}" + ''.join(f"{report['slope'][column]:>21.2f}" for column in COLUMNS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Latency of sequential vs concurrent feature stages in speech analysis.
+
+Every recording is analyzed in memory with the stages run one after another
+(inline) and as a dependency graph on the shared thread pool. The report has
+the median total latency of each mode, the speedup, and the median wall time
+of every stage in the concurrent run. Stages overlap only on multi-core hosts;
+on one CPU the comparison measures the scheduling overhead.
+
+Usage (from ml_service/):
+    python -m benchmarks.speech_stages [audio ...] [--profile standard]
+                                       [--workers N] [--repeat N] [--json]
+
+Without audio files a synthetic 30 s recording at 44.1 kHz is generated.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.speech_pattern import SpeechPatternAnalyzer  # noqa: E402
+from app.utils.stage_graph import get_thread_pool  # noqa: E402
+from benchmarks.speech_profiles import synthetic_speech  # noqa: E402
+
+
+def analyze(analyzer, path, profile, repeat):
+    latencies, stage_timings = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = analyzer.analyze_speech_pattern(path, profile=profile, streaming=False)
+        latencies.append(time.perf_counter() - start)
+        if not result['success']:
+            raise RuntimeError(f"Analysis of {path} failed: {result['error']}")
+        for stage, ms in result['timings'].items():
+            stage_timings.setdefault(stage, []).append(ms)
+    return statistics.median(latencies), {stage: statistics.median(ms) for stage, ms in stage_timings.items()}
+
+
+def run(paths, profile, workers, repeat):
+    get_thread_pool(workers)  # size the shared pool before the first request
+    sequential = SpeechPatternAnalyzer(parallel=False)
+    concurrent = SpeechPatternAnalyzer()
+    # Force the graph onto the pool even on one CPU, to measure its overhead there
+    concurrent.PARALLEL_STAGES = True
+    for analyzer in (sequential, concurrent):
+        analyzer.analyze_speech_pattern(paths[0], profile='triage', streaming=False)  # JIT warm-up
+
+    report = {}
+    for path in paths:
+        sequential_s, _ = analyze(sequential, path, profile, repeat)
+        concurrent_s, stages = analyze(concurrent, path, profile, repeat)
+        report[path] = {
+            'sequential_s': sequential_s,
+            'concurrent_s': concurrent_s,
+            'speedup': sequential_s / concurrent_s,
+            'stages_ms': stages
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='*', help='Recordings to analyze')
+    parser.add_argument('--profile', default='standard', help='Analysis profile')
+    parser.add_argument('--workers', type=int, default=None, help='Thread pool size (default: CPU count)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per mode (median is reported)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    paths = args.audio
+    temp_path = None
+    if not paths:
+        temp_path = synthetic_speech(tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name)
+        paths = [temp_path]
+
+    try:
+        report = run(paths, args.profile, args.workers, args.repeat)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{os.cpu_count()} CPU(s), profile {args.profile}")
+    for path, row in report.items():
+        print(os.path.basename(path) if not temp_path else 'synthetic 30 s speech (44.1 kHz)')
+        print(f"  sequential {row['sequential_s']:.3f}s, concurrent {row['concurrent_s']:.3f}s "
+              f"({row['speedup']:.2f}x)")
+        for stage, ms in row['stages_ms'].items():
+            print(f"      {stage:<16}{ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
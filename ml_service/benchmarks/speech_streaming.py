@@ -0,0 +1,99 @@
+"""
+Peak memory, latency and metric drift of streamed speech analysis.
+
+Every recording is analyzed in memory (streaming=False) and block by block
+(streaming=True) with the same profile. Peak memory is the tracemalloc peak
+(numpy allocations included); drift uses the same
+|value - reference| / max(|reference|, 1) measure as speech_profiles.
+
+Usage (from ml_service/):
+    python -m benchmarks.speech_streaming [audio ...] [--durations 60 300]
+                                          [--profile standard] [--json]
+
+Without audio files, synthetic 44.1 kHz recordings of each --durations length
+are generated.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.speech_pattern import SpeechPatternAnalyzer  # noqa: E402
+from benchmarks.speech_profiles import numeric_leaves, synthetic_speech  # noqa: E402
+
+
+def measure(analyzer, path, profile, streaming):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = analyzer.analyze_speech_pattern(path, profile=profile, streaming=streaming)
+    latency = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if not result['success']:
+        raise RuntimeError(f"Analysis of {path} failed: {result['error']}")
+    return {'latency_s': latency, 'peak_mb': peak / 1e6}, numeric_leaves(result['metrics'])
+
+
+def run(paths, profile):
+    analyzer = SpeechPatternAnalyzer()
+    analyzer.analyze_speech_pattern(paths[0], profile='triage', streaming=False)  # JIT warm-up
+
+    report = {}
+    for path in paths:
+        in_memory, reference = measure(analyzer, path, profile, streaming=False)
+        streamed, metrics = measure(analyzer, path, profile, streaming=True)
+        drift = {
+            name: abs(metrics[name] - value) / max(abs(value), 1.0)
+            for name, value in reference.items() if name in metrics
+        }
+        worst = max(drift, key=drift.get) if drift else None
+        report[path] = {
+            'in_memory': in_memory,
+            'streamed': streamed,
+            'max_drift': drift.get(worst, 0.0),
+            'worst_metric': worst
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='*', help='Recordings to analyze')
+    parser.add_argument('--durations', type=float, nargs='+', default=[60, 300],
+                        help='Synthetic recording lengths in seconds (without audio files)')
+    parser.add_argument('--profile', default='standard', help='Analysis profile (must support streaming)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    paths = args.audio
+    temp_paths = []
+    if not paths:
+        for duration in args.durations:
+            temp_path = tempfile.NamedTemporaryFile(suffix=f'_{int(duration)}s.wav', delete=False).name
+            temp_paths.append(synthetic_speech(temp_path, duration=duration))
+        paths = temp_paths
+
+    try:
+        report = run(paths, args.profile)
+    finally:
+        for temp_path in temp_paths:
+            os.unlink(temp_path)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"  {'recording':<28}{'in memory':>20}{'streamed':>20}{'max drift':>12}  worst metric")
+    for path, row in report.items():
+        cells = [f"{row[mode]['latency_s']:.2f}s {row[mode]['peak_mb']:7.1f} MB" for mode in ('in_memory', 'streamed')]
+        print(f"  {os.path.basename(path):<28}{cells[0]:>20}{cells[1]:>20}"
+              f"{row['max_drift']:>12.2e}  {row['worst_metric'] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Latency and metric drift of voice-activity trimming against silence ratio.
+
+Synthetic speech (--speech seconds) is interleaved with low-level noise
+gaps and leading/trailing silence so that silence makes up each --silence
+fraction of the recording. Every recording is analyzed in memory with voice
+activity detection on (the profile default) and off; the report lists the
+detected voiced ratio, both latencies, the speedup and the largest metric
+change, using the same |value - reference| / max(|reference|, 1) measure
+as speech_profiles.
+
+Usage (from ml_service/):
+    python -m benchmarks.voice_activity [--silence 0 0.2 0.4 0.6] [--speech 30]
+                                        [--profile standard] [--repeat N] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.speech_pattern import SpeechPatternAnalyzer  # noqa: E402
+from benchmarks.speech_profiles import numeric_leaves, synthetic_speech  # noqa: E402
+
+
+def speech_with_silence(path, speech_duration=30.0, silence_ratio=0.4, noise_db=-55.0, seed=0):
+    """Synthetic speech cut into 2.5-6 s phrases separated by noise-only gaps."""
+    rng = np.random.default_rng(seed)
+    synthetic_speech(path, duration=speech_duration, seed=seed)
+    speech, sr = sf.read(path)
+
+    phrases = []
+    position = 0
+    while position < len(speech):
+        length = int(rng.uniform(2.5, 6.0) * sr)
+        phrases.append(speech[position:position + length])
+        position += length
+
+    # Leading, trailing and between-phrase silences share the silence budget
+    total_silence = speech_duration * silence_ratio / (1 - silence_ratio)
+    weights = rng.uniform(0.5, 1.5, len(phrases) + 1)
+    gaps = (total_silence * weights / weights.sum() * sr).astype(int)
+
+    noise_level = 10 ** (noise_db / 20)
+    parts = []
+    for gap, phrase in zip(gaps, phrases + [None]):
+        parts.append(rng.normal(scale=noise_level, size=gap))
+        if phrase is not None:
+            parts.append(phrase + rng.normal(scale=noise_level, size=len(phrase)))
+    sf.write(path, np.concatenate(parts), sr)
+    return path
+
+
+def analyze(analyzer, path, profile, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = analyzer.analyze_speech_pattern(path, profile=profile, streaming=False)
+        timings.append(time.perf_counter() - start)
+    if not result['success']:
+        raise RuntimeError(f"Analysis of {path} failed: {result['error']}")
+    return statistics.median(timings), result
+
+
+def run(silence_ratios, speech_duration, profile, repeat):
+    trimmed = SpeechPatternAnalyzer()
+    whole = SpeechPatternAnalyzer()
+    whole.PROFILES[profile]['voice_activity'] = False
+
+    report = {}
+    for ratio in silence_ratios:
+        path = speech_with_silence(tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name,
+                                   speech_duration, ratio)
+        try:
+            if not report:
+                trimmed.analyze_speech_pattern(path, profile='triage', streaming=False)  # JIT warm-up
+            whole_s, reference = analyze(whole, path, profile, repeat)
+            trimmed_s, result = analyze(trimmed, path, profile, repeat)
+        finally:
+            os.unlink(path)
+
+        metrics = numeric_leaves(result['metrics'])
+        drift = {
+            name: abs(metrics[name] - value) / max(abs(value), 1.0)
+            for name, value in numeric_leaves(reference['metrics']).items() if name in metrics
+        }
+        worst = max(drift, key=drift.get) if drift else None
+        report[ratio] = {
+            'voiced_ratio': result['voice_activity']['voiced_ratio'],
+            'segments': result['voice_activity']['segments'],
+            'whole_s': whole_s,
+            'trimmed_s': trimmed_s,
+            'speedup': whole_s / trimmed_s,
+            'max_drift': drift.get(worst, 0.0),
+            'worst_metric': worst
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--silence', type=float, nargs='+', default=[0.0, 0.2, 0.4, 0.6],
+                        help='Fractions of the recording that are silence')
+    parser.add_argument('--speech', type=float, default=30.0, help='Seconds of speech per recording')
+    parser.add_argument('--profile', default='standard', help='Analysis profile')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (median is reported)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = run(args.silence, args.speech, args.profile, args.repeat)
+    if args.json:
+        print(json.dumps({str(ratio): row for ratio, row in report.items()}, indent=2))
+        return
+
+    print(f"  {'silence':>8}{'voiced':>8}{'segments':>10}{'whole':>10}{'trimmed':>10}{'speedup':>9}"
+          f"{'max drift':>11}  worst metric")
+    for ratio, row in report.items():
+        print(f"  {ratio:>8.0%}{row['voiced_ratio']:>8.0%}{row['segments']:>10}{row['whole_s']:>9.3f}s"
+              f"{row['trimmed_s']:>9.3f}s{row['speedup']:>8.2f}x{row['max_drift']:>11.4f}  {row['worst_metric'] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def speech_like(duration: float = 8.0, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    Phrases of harmonic 'syllables' separated by pauses, over a room-noise floor.
+
+    Syllables last 150-250 ms at a gliding 110-190 Hz pitch; phrases of three
+    to five syllables are followed by 0.5-1.2 s of silence, so voice activity
+    detection has pauses to trim (and onset detection has noise to reject).
+    """
+    rng = np.random.default_rng(seed)
+    y = 3e-3 * rng.standard_normal(int(duration * sr))
+    position = int(0.3 * sr)
+    while position < len(y):
+        for _ in range(rng.integers(3, 6)):
+            length = int(rng.uniform(0.15, 0.25) * sr)
+            if position + length > len(y):
+                break
+            t = np.arange(length) / sr
+            f0 = rng.uniform(110, 190) * (1 + 0.05 * t / t[-1])
+            phase = 2 * np.pi * np.cumsum(f0) / sr
+            syllable = sum(np.sin(k * phase) / k for k in range(1, 8))
+            y[position:position + length] += 0.3 * np.hanning(length) * syllable
+            position += length + int(rng.uniform(0.03, 0.08) * sr)
+        position += int(rng.uniform(0.5, 1.2) * sr)
+    return y.astype(np.float32)
+
+
+@pytest.fixture(scope='session')
+def speech_wav() -> bytes:
+    """speech_like() as 16 kHz WAV bytes."""
+    buffer = io.BytesIO()
+    sf.write(buffer, speech_like(), 16000, format='WAV')
+    return buffer.getvalue()
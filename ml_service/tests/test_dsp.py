@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.utils import dsp
+
+
+@pytest.mark.parametrize('length', [1, 2, 7, 64, 97, 1000, 4099])
+def test_autocorrelation_matches_np_correlate(length):
+    x = np.random.default_rng(length).standard_normal(length)
+    expected = np.correlate(x, x, mode='full')[length - 1:]
+    np.testing.assert_allclose(dsp.autocorrelation(x), expected, rtol=1e-9, atol=1e-9 * length)
+
+
+def test_autocorrelation_does_not_wrap_around():
+    # A single impulse at either end only correlates with itself at lag 0
+    x = np.zeros(50)
+    x[0] = x[-1] = 1.0
+    result = dsp.autocorrelation(x)
+    assert result[0] == pytest.approx(2.0)
+    assert result[-1] == pytest.approx(1.0)
+    np.testing.assert_allclose(result[1:-1], 0.0, atol=1e-12)
+
+
+def test_autocorrelation_of_empty_input():
+    assert dsp.autocorrelation(np.zeros(0)).size == 0
+
+
+def reference_minmax_buckets(values, n_buckets):
+    edges = np.linspace(0, values.shape[-1], n_buckets + 1).astype(int)
+    out = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        bucket = values[..., start:stop]
+        low, high = bucket.argmin(axis=-1), bucket.argmax(axis=-1)
+        first = np.where(low <= high, bucket.min(axis=-1), bucket.max(axis=-1))
+        second = np.where(low <= high, bucket.max(axis=-1), bucket.min(axis=-1))
+        out.extend([first, second])
+    return np.stack(out, axis=-1), edges
+
+
+@pytest.mark.parametrize('n, n_buckets', [(1000, 100), (1003, 100), (37, 5), (50, 50)])
+def test_minmax_buckets_matches_per_bucket_extremes(n, n_buckets):
+    values = np.random.default_rng(n).standard_normal((3, n))
+    extremes, edges = dsp.minmax_buckets(values, n_buckets)
+    expected, expected_edges = reference_minmax_buckets(values, n_buckets)
+
+    assert extremes.shape == (3, 2 * n_buckets)
+    np.testing.assert_array_equal(edges, expected_edges)
+    np.testing.assert_array_equal(extremes, expected)
+
+
+def test_minmax_buckets_keeps_single_sample_spikes():
+    values = np.zeros(10000)
+    values[1234] = 5.0
+    values[8765] = -3.0
+    extremes, edges = dsp.minmax_buckets(values, 20)
+
+    assert extremes.max() == 5.0
+    assert extremes.min() == -3.0
+    assert (edges[0], edges[-1]) == (0, values.size)
+    # The spike stays in the bucket holding its sample
+    bucket = np.searchsorted(edges, 1234, side='right') - 1
+    assert 5.0 in extremes[2 * bucket:2 * bucket + 2]
+
+
+def test_minmax_buckets_keeps_order_of_occurrence():
+    rising = np.arange(100.0)
+    extremes, _ = dsp.minmax_buckets(np.stack([rising, rising[::-1]]), 10)
+    assert np.all(np.diff(extremes[0]) >= 0)
+    assert np.all(np.diff(extremes[1]) <= 0)
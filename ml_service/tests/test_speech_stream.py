@@ -0,0 +1,143 @@
+import io
+
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.models.speech_pattern import SpeechPatternAnalyzer
+from app.utils import dsp
+from app.utils.speech_features import SpeechFeatureStore
+from app.utils.speech_stream import (BlockFramer, PeakClip, SpeechStreamStatistics, StreamingPeakPicker,
+                                     onset_peak_params)
+from conftest import speech_like
+
+N_FFT, HOP_LENGTH = 512, 128
+
+
+def blocks(y, seed=0):
+    """y cut into blocks of random length (some shorter than a frame), with the last flag."""
+    rng = np.random.default_rng(seed)
+    cuts = np.cumsum(rng.integers(1, 3 * N_FFT, size=len(y)))
+    cuts = cuts[cuts < len(y)]
+    parts = np.split(y, cuts)
+    return [(part, i == len(parts) - 1) for i, part in enumerate(parts)]
+
+
+def framed_chunks(y, seed=0):
+    framer = BlockFramer(N_FFT, HOP_LENGTH)
+    chunks = [framer.push(part, last=last) for part, last in blocks(y, seed)]
+    return framer, [chunk for chunk in chunks if chunk is not None]
+
+
+def test_block_framer_matches_centred_framing():
+    y = np.random.default_rng(1).standard_normal(20000)
+    framer, chunks = framed_chunks(y)
+
+    streamed = np.hstack([librosa.util.frame(chunk.samples, frame_length=N_FFT, hop_length=HOP_LENGTH)
+                          for chunk in chunks])
+    padded = np.pad(y, N_FFT // 2)
+    np.testing.assert_array_equal(streamed, librosa.util.frame(padded, frame_length=N_FFT, hop_length=HOP_LENGTH))
+    starts = np.cumsum([0] + [chunk.n_frames for chunk in chunks])
+    assert [chunk.first_frame for chunk in chunks] == starts[:-1].tolist()
+    assert framer.frames == starts[-1] == streamed.shape[1]
+
+
+def test_block_framer_edge_padding_matches_librosa_zcr():
+    y = np.random.default_rng(2).standard_normal(20000)
+    framer, chunks = framed_chunks(y)
+
+    streamed = np.concatenate([
+        dsp.zero_crossing_rate(framer.edge_padded(chunk), frame_length=N_FFT, hop_length=HOP_LENGTH, center=False)
+        for chunk in chunks
+    ])
+    expected = librosa.feature.zero_crossing_rate(y, frame_length=N_FFT, hop_length=HOP_LENGTH)[0]
+    np.testing.assert_array_equal(streamed, expected)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_streaming_peak_picker_matches_onset_detect(seed):
+    rng = np.random.default_rng(seed)
+    envelope = np.convolve(rng.exponential(size=3000), np.hanning(7), mode='same')
+    picker = StreamingPeakPicker(**onset_peak_params())
+    for piece in np.split(envelope, np.sort(rng.integers(0, len(envelope), size=40))):
+        picker.push(piece)
+
+    expected = librosa.onset.onset_detect(onset_envelope=envelope, backtrack=False)
+    np.testing.assert_array_equal(picker.finish(), expected)
+
+
+def test_peak_clip_flags_blocks_clipped_before_the_peak():
+    quiet, loud = np.array([-100.0, -20.0]), np.array([0.0, -10.0])
+
+    running = PeakClip(80.0)
+    np.testing.assert_array_equal(running(quiet), quiet)
+    running(loud)
+    assert not running.exact  # -100 dB should have been clipped to -80 dB
+
+    known = PeakClip(80.0, reference=0.0)
+    np.testing.assert_array_equal(known(quiet), [-80.0, -20.0])
+    known(loud)
+    assert known.exact
+
+    peak_first = PeakClip(80.0)
+    peak_first(loud)
+    np.testing.assert_array_equal(peak_first(quiet), [-80.0, -20.0])
+    assert peak_first.exact
+
+
+def test_stream_statistics_match_in_memory_features():
+    sr = 16000
+    y = speech_like(sr=sr).astype(np.float64)
+    framer = BlockFramer(N_FFT, HOP_LENGTH)
+    stats = SpeechStreamStatistics(framer, sr)
+    for part, last in blocks(y):
+        chunk = framer.push(part, last=last)
+        if chunk is not None:
+            stats.update(chunk)
+
+    features = SpeechFeatureStore(y, sr, n_fft=N_FFT, hop_length=HOP_LENGTH)
+    rms = features.rms()
+    assert stats.frames == len(rms)
+    np.testing.assert_allclose([stats.rms.mean, stats.rms.std], [rms.mean(), rms.std()], rtol=1e-6)
+    np.testing.assert_allclose(stats.centroid.mean, features.spectral_centroid().mean(), rtol=1e-6)
+    expected_onsets = librosa.onset.onset_detect(onset_envelope=features.onset_envelope(), backtrack=False)
+    np.testing.assert_array_equal(stats.onset_frames(), expected_onsets)
+
+
+def flatten(metrics, prefix=''):
+    flat = {}
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + '.'))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def assert_streamed_matches_in_memory(wav, voice_activity):
+    analyzer = SpeechPatternAnalyzer(parallel=False)
+    analyzer.PROFILES['standard']['voice_activity'] = voice_activity
+    in_memory = analyzer.analyze_speech_pattern(wav, streaming=False)
+    streamed = analyzer.analyze_speech_pattern(wav, streaming=True)
+
+    assert in_memory['success'] and streamed['success']
+    assert streamed['streamed'] and not in_memory['streamed']
+    expected = flatten(in_memory['metrics'])
+    actual = flatten(streamed['metrics'])
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        assert actual[key] == pytest.approx(expected[key], rel=1e-6, abs=1e-9), key
+
+
+@pytest.mark.parametrize('voice_activity', [True, False])
+def test_streamed_analysis_matches_in_memory(speech_wav, voice_activity):
+    assert_streamed_matches_in_memory(speech_wav, voice_activity)
+
+
+def test_streamed_analysis_matches_in_memory_after_digital_silence():
+    # 12 s of zeros lie far more than top_db below the speech and fill the first
+    # block, so log-mel and loudness must be clipped against the whole recording's peak
+    buffer = io.BytesIO()
+    sf.write(buffer, np.concatenate([np.zeros(12 * 16000, dtype=np.float32), speech_like()]), 16000, format='WAV')
+    assert_streamed_matches_in_memory(buffer.getvalue(), voice_activity=True)
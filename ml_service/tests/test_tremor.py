@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.models.tremor_analysis import TremorAnalyzer
+from app.utils.imu import parse_imu_json
+
+DURATION = 10.0  # seconds
+AMPLITUDE = 2e-3  # metres of fingertip displacement
+
+
+def displacement(frequency, t):
+    """Fingertip displacement along one direction: a sinusoidal tremor on a slow drift."""
+    return AMPLITUDE * np.sin(2 * np.pi * frequency * t + 0.3) + 1e-3 * np.sin(2 * np.pi * 0.1 * t)
+
+
+def hand_landmarks(frequency, fps=30.0, pixels_per_metre=3000.0, seed=0):
+    """(T, 21, 2) landmarks following displacement(), stronger towards the fingertips."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(DURATION * fps)) / fps
+    hand = np.array([320.0, 240.0]) + rng.uniform(-60, 60, size=(21, 2))
+    gain = np.concatenate([[0.1], np.tile([0.25, 0.5, 0.75, 1.0], 5)])[:, None]
+    motion = pixels_per_metre * displacement(frequency, t)
+    return (hand + motion[:, None, None] * gain * np.array([0.8, 0.6])
+            + rng.normal(scale=0.3, size=(t.size, 21, 2)))
+
+
+def imu_payload(frequency, fs=100.0, seed=0):
+    """Phone accelerometer samples of the same motion: the second derivative of displacement() plus gravity."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(DURATION * fs)) / fs
+    acceleration = -(2 * np.pi * frequency) ** 2 * AMPLITUDE * np.sin(2 * np.pi * frequency * t + 0.3)
+    accel = np.stack([0.8 * acceleration, 0.6 * acceleration, np.full_like(t, 9.81)], axis=1)
+    accel += rng.normal(scale=0.01, size=accel.shape)
+    return {'timestamps': (t * 1000).tolist(), 'accelerometer': accel.tolist()}
+
+
+@pytest.mark.parametrize('frequency, tremor_type', [(3.0, 'Slow Tremor'), (5.0, 'Resting'), (9.0, 'Postural')])
+def test_video_and_imu_paths_agree(frequency, tremor_type):
+    video = TremorAnalyzer(fps=30.0).analyze_tremor(hand_landmarks(frequency))
+    imu = TremorAnalyzer().analyze_imu(parse_imu_json(imu_payload(frequency)))
+
+    # Both spectra have 0.1 Hz bins over 10 s
+    assert video['tremor_frequency'] == pytest.approx(frequency, abs=0.1)
+    assert imu['tremor_frequency'] == pytest.approx(video['tremor_frequency'], abs=0.1)
+    assert video['tremor_type'] == imu['tremor_type'] == tremor_type
+    assert video['fingers']['index']['frequency'] == video['tremor_frequency']
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from app.models.speech_pattern import SpeechPatternAnalyzer
+from app.utils.speech_features import VoicedFeatureStore
+from conftest import speech_like
+
+
+def analyze(wav, voice_activity, streaming):
+    """Analysis result plus the fluency features it was built from."""
+    analyzer = SpeechPatternAnalyzer(parallel=False)
+    analyzer.PROFILES['standard']['voice_activity'] = voice_activity
+    captured = []
+    fluency_features = analyzer._fluency_features
+
+    def capture(*args, **kwargs):
+        captured.append(fluency_features(*args, **kwargs))
+        return captured[-1]
+
+    analyzer._fluency_features = capture
+    result = analyzer.analyze_speech_pattern(wav, streaming=streaming)
+    assert result['success'], result
+    return result, captured[-1]
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_fluency_does_not_depend_on_voice_activity(speech_wav, streaming):
+    trimmed, with_vad = analyze(speech_wav, True, streaming)
+    _, without_vad = analyze(speech_wav, False, streaming)
+
+    assert trimmed['voice_activity']['voiced_ratio'] < 0.9
+    assert with_vad == without_vad
+
+
+@pytest.mark.parametrize('analysis_rate, leading_silence', [(None, 0.0), (16000, 0.0), (16000, 1.0)])
+def test_voiced_store_matches_store_of_spliced_signal(analysis_rate, leading_silence):
+    analyzer = SpeechPatternAnalyzer(analysis_rate=analysis_rate, parallel=False)
+    y = np.concatenate([np.zeros(int(leading_silence * 44100)), speech_like(sr=44100).astype(np.float64)])
+    y, sr = analyzer._resample(y, 44100)
+    features = analyzer._feature_store(y, sr)
+    segments = analyzer._voice_activity(features.rms(), features.zero_crossing_rate(), sr, len(y))
+    assert segments.trims
+
+    voiced = VoicedFeatureStore(features, segments)
+    expected = analyzer._feature_store(segments.extract(y), sr)
+    # Most frames are reused from the whole recording
+    assert (voiced._source_frames() >= 0).mean() > 0.9
+    np.testing.assert_array_equal(voiced.magnitude(), expected.magnitude())
+    np.testing.assert_allclose(voiced.mel_power(), expected.mel_power(), rtol=1e-9, atol=1e-12)